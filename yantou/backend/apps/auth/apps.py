@@ -10,3 +10,7 @@ class AuthConfig(BaseAppConfig):
     label = 'apps_auth'  # 避免与 Django 内置的 auth 应用冲突
     verbose_name = '认证管理'
 
+
+    def ready(self):
+        """注册信号处理"""
+        from . import signals  # noqa: F401
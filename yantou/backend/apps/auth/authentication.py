@@ -0,0 +1,75 @@
+"""
+JWT 认证
+在 simplejwt JWTAuthentication 的基础上，从缓存的用户快照中解析用户，避免每个请求查询用户表，
+并通过进程内布隆过滤器检查 Access Token 是否已吊销
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .revocation import is_access_token_revoked
+from .sessions import TOKEN_REVOKED_MESSAGE, get_token_generation, is_token_revoked
+from .user_cache import get_user_snapshot, user_from_snapshot
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    基于用户快照缓存的 JWT 认证
+    返回的用户对象只加载了快照字段，访问其他字段时才查询数据库
+    """
+
+    def get_validated_token(self, raw_token):
+        """
+        验证 Token 并检查是否已吊销
+
+        Args:
+            raw_token: 原始 Token
+
+        Returns:
+            已验证的 Token
+
+        Raises:
+            InvalidToken: Token 无效或已吊销
+        """
+        validated_token = super().get_validated_token(raw_token)
+        if is_access_token_revoked(validated_token):
+            raise InvalidToken(_('Token 已被吊销'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        """
+        根据 Token 获取用户
+
+        Args:
+            validated_token: 已验证的 Token
+
+        Returns:
+            SnapshotUser: 用户对象
+
+        Raises:
+            InvalidToken: Token 中没有用户标识
+            AuthenticationFailed: 用户不存在、已禁用或会话已被吊销
+        """
+        # 校验密码修改需要完整的用户记录，交给父类处理
+        if api_settings.CHECK_REVOKE_TOKEN:
+            user = super().get_user(validated_token)
+            if is_token_revoked(validated_token, get_token_generation(user.pk)):
+                raise AuthenticationFailed(TOKEN_REVOKED_MESSAGE, code='token_revoked')
+            return user
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token 中不包含可识别的用户标识'))
+
+        snapshot = get_user_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed(_('用户不存在'), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not snapshot['is_active']:
+            raise AuthenticationFailed(_('用户已被禁用'), code='user_inactive')
+
+        if is_token_revoked(validated_token, snapshot['token_generation']):
+            raise AuthenticationFailed(TOKEN_REVOKED_MESSAGE, code='token_revoked')
+
+        return user_from_snapshot(snapshot)
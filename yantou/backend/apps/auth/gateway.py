@@ -0,0 +1,80 @@
+"""
+网关鉴权
+供 nginx auth_request（或 Envoy ext_authz 等）调用的轻量鉴权接口：
+校验请求中的 Bearer Token，按 X-Required-Permission 请求头检查权限，返回 200/401/403，
+并通过响应头返回用户身份，由网关转发给后端服务。
+
+该接口不经过 DRF，不包裹数据库事务，不记录请求日志和操作日志；
+用户和权限均从缓存读取（用户快照、按权限代数缓存的权限代码集合），缓存命中时不查询数据库。
+
+nginx 配置示例：
+    location = /_auth {
+        internal;
+        proxy_pass http://backend/gateway/auth/;
+        proxy_pass_request_body off;
+        proxy_set_header Content-Length "";
+        proxy_set_header X-Required-Permission $required_permission;
+    }
+    location /internal-service/ {
+        set $required_permission "report:read";
+        auth_request /_auth;
+        auth_request_set $auth_user_id $upstream_http_x_auth_user_id;
+        proxy_set_header X-User-Id $auth_user_id;
+        proxy_pass http://internal-service;
+    }
+"""
+from django.db import transaction
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from apps.permissions.utils import get_user_permission_codes
+from .authentication import CachedJWTAuthentication
+import logging
+
+logger = logging.getLogger('django.request')
+
+REQUIRED_PERMISSION_HEADER = 'HTTP_X_REQUIRED_PERMISSION'
+
+_authenticator = CachedJWTAuthentication()
+
+
+def unauthorized() -> HttpResponse:
+    """返回 401 响应"""
+    response = HttpResponse(status=401)
+    response['WWW-Authenticate'] = 'Bearer'
+    return response
+
+
+@csrf_exempt
+@transaction.non_atomic_requests
+def gateway_auth(request):
+    """
+    网关鉴权接口
+
+    Request Headers:
+        Authorization: Bearer <access_token>
+        X-Required-Permission: 需要的权限代码（可选，多个用逗号分隔，需全部满足）
+
+    Returns:
+        HttpResponse: 200 通过（带 X-Auth-User-Id、X-Auth-Username 响应头），
+            401 未认证或 Token 无效，403 权限不足
+    """
+    try:
+        result = _authenticator.authenticate(request)
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return unauthorized()
+    if result is None:
+        return unauthorized()
+    user, _token = result
+
+    required = request.META.get(REQUIRED_PERMISSION_HEADER, '')
+    codes = [code.strip() for code in required.split(',') if code.strip()]
+    if codes and not user.is_superuser:
+        granted = get_user_permission_codes(user)
+        if not granted.issuperset(codes):
+            return HttpResponse(status=403)
+
+    response = HttpResponse(status=200)
+    response['X-Auth-User-Id'] = str(user.pk)
+    response['X-Auth-Username'] = user.username
+    return response
@@ -0,0 +1,84 @@
+"""
+最后登录时间
+登录和刷新 Token 时不直接更新 auth_user，而是写入进程内缓冲区，按用户合并只保留最新时间，
+由后台线程定期批量更新。
+
+同一用户在 LAST_LOGIN_GRANULARITY 秒内的重复登录只记录第一次（通过缓存标记跨进程去重），
+LAST_LOGIN_FLUSH_INTERVAL 为 0 时同步写入（测试环境）。
+"""
+import threading
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from utils.background import PeriodicFlusher
+
+
+class LastLoginBuffer:
+    """
+    最后登录时间缓冲区
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def record(self, user_id, when=None):
+        """
+        记录用户登录时间
+
+        Args:
+            user_id: 用户 ID
+            when: 登录时间（默认当前时间）
+        """
+        granularity = getattr(settings, 'LAST_LOGIN_GRANULARITY', 60)
+        if granularity and not cache.add(f'last_login_recorded:{user_id}', 1, timeout=granularity):
+            # 粒度时间内已记录过，跳过
+            return
+
+        when = when or timezone.now()
+        with self._lock:
+            current = self._pending.get(user_id)
+            if current is None or when > current:
+                self._pending[user_id] = when
+
+        interval = getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 5)
+        if not interval:
+            self.flush()
+            return
+
+        if self._flusher is None:
+            self._flusher = PeriodicFlusher(self.flush, interval, name='last-login-flusher')
+        self._flusher.start()
+
+    def flush(self) -> int:
+        """
+        批量写入缓冲的登录时间
+
+        Returns:
+            int: 更新的用户数
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        User = get_user_model()
+        users = [User(pk=user_id, last_login=when) for user_id, when in pending.items()]
+        User.objects.bulk_update(users, ['last_login'], batch_size=500)
+        return len(users)
+
+
+last_login_buffer = LastLoginBuffer()
+
+
+def record_last_login(user_id, when=None):
+    """
+    记录用户登录时间（异步批量写入）
+
+    Args:
+        user_id: 用户 ID
+        when: 登录时间（默认当前时间）
+    """
+    last_login_buffer.record(user_id, when)
@@ -0,0 +1,163 @@
+"""
+生成泄露密码索引的管理命令
+从本地泄露密码库生成 BreachedPasswordValidator 使用的排序索引文件
+
+支持两种输入格式（默认按行自动识别）：
+- sha1: 每行为 40 位 SHA-1 十六进制，可带 :次数 后缀（如 Have I Been Pwned 导出的文件）
+- plain: 每行一个明文密码
+
+数据分块排序后写入临时文件，再多路归并去重，内存占用与分块大小相关而与库大小无关。
+"""
+import heapq
+import os
+import re
+import sys
+import tempfile
+from array import array
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.auth.password_validation import INDEX_MAGIC, RECORD_SIZE, RECORD_STRUCT, password_prefix
+
+SHA1_LINE = re.compile(r'^([0-9A-Fa-f]{40})(?::(\d+))?$')
+
+
+class Command(BaseCommand):
+    help = '从本地泄露密码库生成泄露密码索引文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sources',
+            nargs='+',
+            help='泄露密码库文件路径（可以有多个）'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='索引文件输出路径（默认为 BREACHED_PASSWORD_INDEX_PATH 配置）'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['auto', 'sha1', 'plain'],
+            default='auto',
+            help='输入格式（默认按行自动识别）'
+        )
+        parser.add_argument(
+            '--min-count',
+            type=int,
+            default=1,
+            help='sha1 格式中出现次数低于该值的记录不写入索引'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000000,
+            help='每个排序分块的记录数'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or getattr(settings, 'BREACHED_PASSWORD_INDEX_PATH', None)
+        if not output:
+            raise CommandError('未指定输出路径，请使用 --output 或配置 BREACHED_PASSWORD_INDEX_PATH')
+
+        output_dir = os.path.dirname(os.path.abspath(output))
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.stdout.write('开始读取泄露密码库...')
+        with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+            chunk_paths = []
+            total = 0
+            for chunk in self.read_chunks(options['sources'], options['format'], options['min_count'], options['chunk_size']):
+                chunk_path = os.path.join(tmp_dir, f'chunk_{len(chunk_paths)}.bin')
+                self.write_chunk(chunk_path, chunk)
+                chunk_paths.append(chunk_path)
+                total += len(chunk)
+                self.stdout.write(f'  已排序 {total} 条记录')
+
+            # 先写入临时文件再原子替换，正在映射旧文件的进程不受影响
+            tmp_output = os.path.join(tmp_dir, 'index.tmp')
+            count = self.merge_chunks(chunk_paths, tmp_output)
+            os.replace(tmp_output, output)
+
+        size_mb = (count * RECORD_SIZE) / 1024 / 1024
+        self.stdout.write(self.style.SUCCESS(f'✓ 索引生成完成：{output}（{count} 条记录，{size_mb:.1f} MB）'))
+
+    def read_chunks(self, sources, input_format, min_count, chunk_size):
+        """按分块读取记录值，每块排序后返回"""
+        chunk = []
+        for source in sources:
+            if not os.path.exists(source):
+                raise CommandError(f'文件不存在：{source}')
+            with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    prefix = self.parse_line(line.rstrip('\r\n'), input_format, min_count)
+                    if prefix is None:
+                        continue
+                    chunk.append(prefix)
+                    if len(chunk) >= chunk_size:
+                        chunk.sort()
+                        yield chunk
+                        chunk = []
+        if chunk:
+            chunk.sort()
+            yield chunk
+
+    def parse_line(self, line, input_format, min_count):
+        """
+        解析一行输入
+
+        Returns:
+            int: 记录值，空行或低于最小次数时返回 None
+        """
+        if not line:
+            return None
+
+        if input_format != 'plain':
+            match = SHA1_LINE.match(line.strip())
+            if match:
+                if match.group(2) and int(match.group(2)) < min_count:
+                    return None
+                return int(match.group(1)[:RECORD_SIZE * 2], 16)
+            if input_format == 'sha1':
+                return None
+
+        return password_prefix(line)
+
+    def write_chunk(self, path, chunk):
+        """将已排序的分块写入临时文件"""
+        data = array('Q', chunk)
+        if data.itemsize != RECORD_SIZE:
+            raise CommandError('当前平台不支持 64 位无符号整数数组')
+        # array 使用本机字节序，统一转换为大端
+        if sys.byteorder == 'little':
+            data.byteswap()
+        with open(path, 'wb') as f:
+            data.tofile(f)
+
+    def iter_chunk(self, path):
+        """逐条读取分块文件"""
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(RECORD_SIZE * 8192)
+                if not block:
+                    return
+                for (value,) in RECORD_STRUCT.iter_unpack(block):
+                    yield value
+
+    def merge_chunks(self, chunk_paths, output):
+        """多路归并分块并去重，返回写入的记录数"""
+        count = 0
+        previous = None
+        buffer = bytearray()
+        with open(output, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            for value in heapq.merge(*(self.iter_chunk(path) for path in chunk_paths)):
+                if value == previous:
+                    continue
+                previous = value
+                buffer += RECORD_STRUCT.pack(value)
+                count += 1
+                if len(buffer) >= RECORD_SIZE * 65536:
+                    f.write(buffer)
+                    buffer.clear()
+            f.write(buffer)
+        return count
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.27 on 2026-10-19 07:31
+
+import django.contrib.auth.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotUser',
+            fields=[
+            ],
+            options={
+                'verbose_name': '快照用户',
+                'verbose_name_plural': '快照用户',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('auth.user',),
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+    ]
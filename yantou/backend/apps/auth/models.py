@@ -0,0 +1,26 @@
+"""
+认证模型
+"""
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+
+
+class SnapshotUser(User):
+    """
+    快照用户（代理模型）
+    由缓存的用户快照构造，只加载了部分字段
+    """
+
+    class Meta:
+        proxy = True
+        verbose_name = _('快照用户')
+        verbose_name_plural = _('快照用户')
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        """
+        访问任一延迟字段时，一次性加载全部延迟字段，避免逐字段查询
+        """
+        deferred_fields = self.get_deferred_fields()
+        if fields is not None and deferred_fields.issuperset(fields):
+            fields = deferred_fields
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
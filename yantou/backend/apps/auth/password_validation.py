@@ -0,0 +1,173 @@
+"""
+泄露密码校验
+使用 build_breached_password_index 命令生成的索引文件，在本地检查密码是否出现在泄露密码库中
+
+索引文件格式：8 字节文件头（MAGIC）后跟按升序排列、去重的记录，每条记录为密码 SHA-1 的前 8 字节（大端）。
+文件通过 mmap 只读映射并二分查找，多个进程共享操作系统页缓存，进程常驻内存几乎为零。
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from typing import Optional
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+import logging
+
+logger = logging.getLogger('django.request')
+
+INDEX_MAGIC = b'BPWIDX1\x00'
+HEADER_SIZE = len(INDEX_MAGIC)
+RECORD_SIZE = 8
+RECORD_STRUCT = struct.Struct('>Q')
+
+
+def password_prefix(password: str) -> int:
+    """
+    计算密码的索引记录值（SHA-1 前 8 字节）
+
+    Args:
+        password: 密码
+
+    Returns:
+        int: 记录值
+    """
+    return int.from_bytes(hashlib.sha1(password.encode('utf-8')).digest()[:RECORD_SIZE], 'big')
+
+
+class BreachedPasswordIndex:
+    """
+    泄露密码索引（mmap 只读映射）
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 索引文件路径
+
+        Raises:
+            ValueError: 文件格式不正确
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if stat.st_size < HEADER_SIZE or (stat.st_size - HEADER_SIZE) % RECORD_SIZE:
+                raise ValueError(f'无效的泄露密码索引文件: {path}')
+            self.count = (stat.st_size - HEADER_SIZE) // RECORD_SIZE
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:HEADER_SIZE] != INDEX_MAGIC:
+            self._mmap.close()
+            raise ValueError(f'无效的泄露密码索引文件: {path}')
+
+    def contains_prefix(self, prefix: int) -> bool:
+        """
+        二分查找记录值
+
+        Args:
+            prefix: 记录值
+
+        Returns:
+            bool: True 表示存在
+        """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = RECORD_STRUCT.unpack_from(self._mmap, HEADER_SIZE + mid * RECORD_SIZE)[0]
+            if value < prefix:
+                lo = mid + 1
+            elif value > prefix:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_prefix(password_prefix(password))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        """关闭映射"""
+        self._mmap.close()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_breached_password_index(path: Optional[str]) -> Optional[BreachedPasswordIndex]:
+    """
+    获取泄露密码索引（按进程缓存，索引文件被替换后自动重新映射）
+
+    Args:
+        path: 索引文件路径
+
+    Returns:
+        BreachedPasswordIndex: 索引，文件不存在或格式不正确时返回 None
+    """
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    index = _indexes.get(path)
+    if index is not None and index.signature == signature:
+        return index
+
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None or index.signature != signature:
+            try:
+                index = BreachedPasswordIndex(path)
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load breached password index: {str(e)}")
+                return None
+            # 旧映射不主动关闭，可能仍有线程在读取，由垃圾回收释放
+            _indexes[path] = index
+    return index
+
+
+class BreachedPasswordValidator:
+    """
+    泄露密码校验器（Django AUTH_PASSWORD_VALIDATORS）
+    索引文件不存在时不做校验
+    """
+
+    def __init__(self, index_path: Optional[str] = None):
+        """
+        Args:
+            index_path: 索引文件路径（默认读取 BREACHED_PASSWORD_INDEX_PATH 配置）
+        """
+        self.index_path = index_path
+
+    def get_index_path(self) -> Optional[str]:
+        """获取索引文件路径"""
+        return self.index_path or getattr(settings, 'BREACHED_PASSWORD_INDEX_PATH', None)
+
+    def validate(self, password, user=None):
+        """
+        校验密码
+
+        Args:
+            password: 密码
+            user: 用户对象（可选）
+
+        Raises:
+            ValidationError: 密码出现在泄露密码库中
+        """
+        index = get_breached_password_index(self.get_index_path())
+        if index is not None and password in index:
+            raise ValidationError(
+                _('该密码已出现在公开泄露的密码库中，请更换其他密码'),
+                code='password_breached',
+            )
+
+    def get_help_text(self):
+        return _('密码不能是已公开泄露的密码')
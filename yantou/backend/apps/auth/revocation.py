@@ -0,0 +1,223 @@
+"""
+Access Token 吊销
+被吊销的 jti 写入缓存（TTL 为 Token 剩余有效期）作为权威数据，同时按版本号追加到吊销日志。
+
+每个 worker 维护一个进程内布隆过滤器，按版本号增量同步吊销日志：
+- 过滤器判断不存在：直接放行，无需任何 I/O
+- 过滤器判断可能存在：查询缓存确认，排除误判
+
+吊销时先递增版本号再写入日志条目，其他进程可能读到新版本号时条目还未写入。
+同步时已写入的条目全部加入过滤器，本地版本号停在最新 LOG_GAP_WINDOW 个版本内第一个缺失条目之前，
+下次同步从该处重试；缺失条目超过 LOG_GAP_TIMEOUT 仍未出现（吊销进程在两步之间崩溃）时一次全部跳过。
+更早的缺失条目是已过期的日志（版本号不过期，日志条目只保留一个 Token 有效期），直接跳过。
+
+过滤器分为当前、上一代两代，每经过一个 Access Token 有效期轮换一次，
+吊销记录至少保留一个有效期（之后 Token 本身已过期），内存占用固定。
+"""
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+from utils.bloom import BloomFilter
+from utils.helpers import incr_cache_counter
+
+REVOKED_KEY_PREFIX = 'revoked_access'
+VERSION_KEY = 'revoked_access_version'
+LOG_KEY_PREFIX = 'revoked_access_log'
+
+# 单次 get_many 拉取的吊销日志条数
+SYNC_BATCH_SIZE = 1000
+
+# 缺失的吊销日志条目等待多久后跳过（秒）
+LOG_GAP_TIMEOUT = 10
+
+# 只等待最新的这么多个版本中缺失的条目（可能仍在写入），更早的缺失条目已过期
+LOG_GAP_WINDOW = 1000
+
+
+def get_revoked_key(jti: str) -> str:
+    """获取吊销记录缓存键"""
+    return f'{REVOKED_KEY_PREFIX}:{jti}'
+
+
+def get_log_key(version: int) -> str:
+    """获取吊销日志缓存键"""
+    return f'{LOG_KEY_PREFIX}:{version}'
+
+
+def get_token_lifetime() -> int:
+    """获取 Access Token 有效期（秒）"""
+    return int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+class RevocationFilter:
+    """
+    进程内吊销过滤器
+    """
+
+    def __init__(self, capacity: int = None, error_rate: float = None, sync_interval: float = None):
+        """
+        Args:
+            capacity: 每代过滤器容量（一个 Access Token 有效期内的最大吊销数）
+            error_rate: 误判率
+            sync_interval: 同步吊销日志的最小间隔（秒）
+        """
+        self.capacity = capacity or getattr(settings, 'ACCESS_REVOCATION_FILTER_CAPACITY', 50000)
+        self.error_rate = error_rate or getattr(settings, 'ACCESS_REVOCATION_FILTER_ERROR_RATE', 0.001)
+        self.sync_interval = (
+            sync_interval if sync_interval is not None
+            else getattr(settings, 'ACCESS_REVOCATION_SYNC_INTERVAL', 1)
+        )
+        self.rotate_interval = get_token_lifetime()
+        self.current = BloomFilter(self.capacity, self.error_rate)
+        self.previous = BloomFilter(self.capacity, self.error_rate)
+        self.version = 0
+        # 等待中的缺失版本号 -> 首次发现的时间
+        self.gaps = {}
+        self.last_sync = 0.0
+        self.last_rotate = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, jti: str):
+        """
+        添加吊销的 jti
+
+        Args:
+            jti: Token ID
+        """
+        self.current.add(jti)
+
+    def might_contain(self, jti: str) -> bool:
+        """
+        判断 jti 是否可能已吊销（不产生 I/O）
+
+        Args:
+            jti: Token ID
+
+        Returns:
+            bool: False 表示一定未吊销
+        """
+        return jti in self.current or jti in self.previous
+
+    def maybe_rotate(self, now: float):
+        """超过一个 Token 有效期时轮换过滤器"""
+        if now - self.last_rotate >= self.rotate_interval:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+            self.last_rotate = now
+
+    def reset(self):
+        """清空过滤器（缓存被清空等导致版本号回退时使用）"""
+        self.current.clear()
+        self.previous.clear()
+        self.version = 0
+        self.gaps = {}
+
+    def sync(self):
+        """
+        增量同步吊销日志
+        读取最新版本号，拉取本地版本之后的日志条目加入过滤器；
+        最新版本附近有尚未写入的条目时，本地版本停在该条目之前，下次同步从该处继续
+        """
+        latest = cache.get(VERSION_KEY, 0)
+        if latest < self.version:
+            self.reset()
+        if latest == self.version:
+            return
+
+        now = time.monotonic()
+        window_start = latest - LOG_GAP_WINDOW + 1
+        pending = None
+        # 超出一代容量的旧日志对应的 Token 已过期，无需拉取
+        start = max(self.version + 1, latest - self.capacity + 1)
+        for batch_start in range(start, latest + 1, SYNC_BATCH_SIZE):
+            versions = range(batch_start, min(batch_start + SYNC_BATCH_SIZE, latest + 1))
+            entries = cache.get_many([get_log_key(version) for version in versions])
+            for version in versions:
+                jti = entries.get(get_log_key(version))
+                if jti is not None:
+                    self.current.add(jti)
+                elif version >= window_start:
+                    since = self.gaps.setdefault(version, now)
+                    if pending is None and now - since < LOG_GAP_TIMEOUT:
+                        pending = version
+        self.version = latest if pending is None else pending - 1
+        self.gaps = {version: since for version, since in self.gaps.items() if version > self.version}
+
+    def maybe_sync(self):
+        """距上次同步超过间隔时同步"""
+        now = time.monotonic()
+        if now - self.last_sync < self.sync_interval:
+            return
+        with self._lock:
+            if now - self.last_sync < self.sync_interval:
+                return
+            self.maybe_rotate(now)
+            self.sync()
+            self.last_sync = now
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        检查 jti 是否已吊销
+        过滤器命中时查询缓存确认
+
+        Args:
+            jti: Token ID
+
+        Returns:
+            bool: True 表示已吊销
+        """
+        self.maybe_sync()
+        if not self.might_contain(jti):
+            return False
+        return cache.get(get_revoked_key(jti)) is not None
+
+
+_revocation_filter = None
+_revocation_filter_lock = threading.Lock()
+
+
+def get_revocation_filter() -> RevocationFilter:
+    """获取当前进程的吊销过滤器"""
+    global _revocation_filter
+    if _revocation_filter is None:
+        with _revocation_filter_lock:
+            if _revocation_filter is None:
+                _revocation_filter = RevocationFilter()
+    return _revocation_filter
+
+
+def revoke_access_token(token):
+    """
+    吊销 Access Token
+
+    Args:
+        token: Access Token 对象
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    remaining = max(1, int(token['exp'] - time.time()))
+    cache.set(get_revoked_key(jti), 1, timeout=remaining)
+
+    # 版本号递增和日志写入之间其他进程可能已读到新版本号，同步时会等待该条目写入
+    version = incr_cache_counter(VERSION_KEY)
+    cache.set(get_log_key(version), jti, timeout=get_token_lifetime())
+
+    # 本进程立即生效，其他进程在下次同步时生效
+    get_revocation_filter().add(jti)
+
+
+def is_access_token_revoked(token) -> bool:
+    """
+    检查 Access Token 是否已吊销
+
+    Args:
+        token: Access Token 对象
+
+    Returns:
+        bool: True 表示已吊销
+    """
+    jti = token.get(api_settings.JTI_CLAIM)
+    if jti is None:
+        return False
+    return get_revocation_filter().is_revoked(jti)
@@ -12,6 +12,7 @@ from typing import Optional, Dict, Any, Tuple
 from django.core.cache import cache
 from django.conf import settings
 from apps.common.exceptions import RateLimitException, AuthenticationException
+from utils.cache import get_redis_client, make_cache_key
 from PIL import Image, ImageDraw, ImageFont
 import logging
 
@@ -155,6 +156,62 @@ class LoginAttemptLimiter:
         
         remaining = self.max_attempts - attempts_data['count']
         return max(0, remaining)
+    
+    def evaluate(self, attempts_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        根据已读取的失败记录计算限制状态（不访问缓存）
+        
+        Args:
+            attempts_data: 失败记录（缓存中的值，可为空）
+            
+        Returns:
+            dict: 包含是否锁定、剩余锁定时间、剩余尝试次数，
+                  expired 表示记录已超出时间窗口或锁定已过期，应视为无记录
+        """
+        now = time.time()
+        expired = (
+            not attempts_data
+            or now - attempts_data['first_attempt'] > self.window_duration
+            or (
+                attempts_data['count'] >= self.max_attempts
+                and now - attempts_data['last_attempt'] >= self.lockout_duration
+            )
+        )
+        if expired:
+            return {
+                'is_locked': False,
+                'remaining_lockout': 0,
+                'remaining_attempts': self.max_attempts,
+                'expired': True,
+            }
+        
+        is_locked = attempts_data['count'] >= self.max_attempts
+        remaining_lockout = self.lockout_duration - (now - attempts_data['last_attempt']) if is_locked else 0
+        return {
+            'is_locked': is_locked,
+            'remaining_lockout': max(0, int(remaining_lockout)),
+            'remaining_attempts': max(0, self.max_attempts - attempts_data['count']),
+            'expired': False,
+        }
+    
+    def next_failure(self, attempts_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        根据已读取的失败记录计算记录一次失败后的新记录（不访问缓存）
+        
+        Args:
+            attempts_data: 失败记录（缓存中的值，可为空）
+            
+        Returns:
+            dict: 新的失败记录，由调用方写入缓存（超时时间为 window_duration）
+        """
+        now = time.time()
+        if self.evaluate(attempts_data)['expired']:
+            return {'count': 1, 'first_attempt': now, 'last_attempt': now}
+        return {
+            'count': attempts_data['count'] + 1,
+            'first_attempt': attempts_data['first_attempt'],
+            'last_attempt': now,
+        }
 
 
 class IPWhitelistBlacklist:
@@ -321,6 +378,33 @@ class CaptchaGenerator:
         
         return captcha_text, f'data:image/png;base64,{base64_image}'
     
+    @staticmethod
+    def get_cache_key(identifier: str) -> str:
+        """
+        获取验证码缓存键
+        
+        Args:
+            identifier: 标识符（IP 或用户名）
+            
+        Returns:
+            str: 缓存键
+        """
+        return f'captcha:{identifier}'
+    
+    @staticmethod
+    def matches(captcha: str, stored_captcha: Optional[str]) -> bool:
+        """
+        比较用户输入的验证码与已读取的验证码（不访问缓存，调用方负责删除已使用的验证码）
+        
+        Args:
+            captcha: 用户输入的验证码
+            stored_captcha: 缓存中的验证码
+            
+        Returns:
+            bool: True 表示验证通过
+        """
+        return bool(stored_captcha) and captcha.lower() == stored_captcha
+    
     @staticmethod
     def store_captcha(captcha: str, identifier: str, duration: int = 300):
         """
@@ -331,7 +415,7 @@ class CaptchaGenerator:
             identifier: 标识符（IP 或用户名）
             duration: 过期时间（秒）
         """
-        cache_key = f'captcha:{identifier}'
+        cache_key = CaptchaGenerator.get_cache_key(identifier)
         cache.set(cache_key, captcha.lower(), timeout=duration)
     
     @staticmethod
@@ -346,7 +430,7 @@ class CaptchaGenerator:
         Returns:
             bool: True 表示验证通过
         """
-        cache_key = f'captcha:{identifier}'
+        cache_key = CaptchaGenerator.get_cache_key(identifier)
         stored_captcha = cache.get(cache_key)
         
         if not stored_captcha:
@@ -355,7 +439,7 @@ class CaptchaGenerator:
         # 验证后删除验证码（一次性使用）
         cache.delete(cache_key)
         
-        return captcha.lower() == stored_captcha
+        return CaptchaGenerator.matches(captcha, stored_captcha)
 
 
 class DeviceFingerprint:
@@ -418,22 +502,69 @@ class DeviceFingerprint:
         
         return fingerprint
     
+    @staticmethod
+    def get_cache_key(user_id: int) -> str:
+        """
+        获取用户设备缓存键
+        
+        Args:
+            user_id: 用户 ID
+            
+        Returns:
+            str: 缓存键
+        """
+        return f'user_devices:{user_id}'
+    
+    @staticmethod
+    def get_limits() -> Tuple[int, int]:
+        """
+        获取设备数量上限和设备过期时间（秒）
+        
+        Returns:
+            tuple: (最大设备数, 过期时间)
+        """
+        return (
+            getattr(settings, 'DEVICE_FINGERPRINT_MAX_DEVICES', 10),
+            getattr(settings, 'DEVICE_FINGERPRINT_TTL', 86400 * 30),
+        )
+    
     @staticmethod
     def store_device_fingerprint(user_id: int, fingerprint: str):
         """
         存储用户设备指纹
+        按最近使用时间记录设备，超过上限时淘汰最久未使用的设备，超过过期时间未使用的设备单独过期
+        
+        Redis 后端使用有序集合（score 为最近使用时间），添加、裁剪、续期在一个管道中原子完成；
+        其他缓存后端回退为 {指纹: 最近使用时间} 字典。
         
         Args:
             user_id: 用户 ID
             fingerprint: 设备指纹
         """
-        cache_key = f'user_device:{user_id}'
-        devices = cache.get(cache_key, set())
-        devices.add(fingerprint)
-        # 最多保存 10 个设备
-        if len(devices) > 10:
-            devices = set(list(devices)[-10:])
-        cache.set(cache_key, devices, timeout=86400 * 30)  # 30 天
+        max_devices, ttl = DeviceFingerprint.get_limits()
+        cache_key = DeviceFingerprint.get_cache_key(user_id)
+        now = time.time()
+        
+        client = get_redis_client()
+        if client is not None:
+            key = make_cache_key(cache_key)
+            try:
+                pipe = client.pipeline(transaction=True)
+                pipe.zadd(key, {fingerprint: now})
+                pipe.zremrangebyscore(key, '-inf', now - ttl)
+                pipe.zremrangebyrank(key, 0, -(max_devices + 1))
+                pipe.expire(key, ttl)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to store device fingerprint: {str(e)}", extra={'user_id': user_id})
+            return
+        
+        devices = cache.get(cache_key, {})
+        devices = {fp: seen for fp, seen in devices.items() if seen > now - ttl}
+        devices[fingerprint] = now
+        if len(devices) > max_devices:
+            devices = dict(sorted(devices.items(), key=lambda item: item[1])[-max_devices:])
+        cache.set(cache_key, devices, timeout=ttl)
     
     @staticmethod
     def is_known_device(user_id: int, fingerprint: str) -> bool:
@@ -445,9 +576,19 @@ class DeviceFingerprint:
             fingerprint: 设备指纹
             
         Returns:
-            bool: True 表示是已知设备
+            bool: True 表示是已知设备（且未过期）
         """
-        cache_key = f'user_device:{user_id}'
-        devices = cache.get(cache_key, set())
-        return fingerprint in devices
-
+        _, ttl = DeviceFingerprint.get_limits()
+        cache_key = DeviceFingerprint.get_cache_key(user_id)
+        
+        client = get_redis_client()
+        if client is not None:
+            try:
+                last_seen = client.zscore(make_cache_key(cache_key), fingerprint)
+            except Exception as e:
+                logger.warning(f"Failed to check device fingerprint: {str(e)}", extra={'user_id': user_id})
+                return False
+        else:
+            last_seen = cache.get(cache_key, {}).get(fingerprint)
+        
+        return last_seen is not None and last_seen > time.time() - ttl
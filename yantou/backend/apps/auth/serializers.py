@@ -5,10 +5,12 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.core.cache import cache
 from django.utils.translation import gettext_lazy as _
-from rest_framework_simplejwt.tokens import RefreshToken
 from apps.common.exceptions import ValidationException, AuthenticationException, RateLimitException
+from utils.cache import write_many
 from utils.validators import validate_username, validate_password_strength
+from .tokens import RefreshToken
 
 User = get_user_model()
 
@@ -151,6 +153,7 @@ class LoginSerializer(serializers.Serializer):
     def validate(self, attrs):
         """
         验证用户登录信息
+        认证前的缓存状态一次批量读取，认证失败后的状态一次批量写入
         
         Args:
             attrs: 序列化器数据
@@ -175,32 +178,42 @@ class LoginSerializer(serializers.Serializer):
         ip_manager = IPWhitelistBlacklist()
         client_ip = ip_manager.get_client_ip(request)
         
-        # 检查 IP 黑名单
-        if ip_manager.is_blacklisted(client_ip):
-            raise AuthenticationException(_('IP 地址已被封禁'), code='E002001')
-        
-        # 检查登录失败次数限制
         limiter = LoginAttemptLimiter()
         identifier = f"{client_ip}:{username}"  # 使用 IP+用户名作为标识符
+        attempts_key = limiter.get_cache_key(identifier)
+        captcha_key = CaptchaGenerator.get_cache_key(client_ip)
+        
+        # 一次批量读取认证前需要的全部状态（IP 黑名单、失败记录、验证码）
+        state = cache.get_many([ip_manager.blacklist_key, attempts_key, captcha_key])
+        blacklist = state.get(ip_manager.blacklist_key) or set()
+        attempts_data = state.get(attempts_key)
+        
+        # 检查 IP 黑名单
+        if client_ip in blacklist:
+            raise AuthenticationException(_('IP 地址已被封禁'), code='E002001')
         
         # 检查是否被锁定
-        if limiter.check_lockout(identifier):
-            remaining_lockout = limiter.get_remaining_attempts(identifier)
+        attempt_status = limiter.evaluate(attempts_data)
+        if attempt_status['is_locked']:
             raise RateLimitException(
-                _('登录失败次数过多，账户已被锁定，请 {minutes} 分钟后重试').format(minutes=remaining_lockout // 60),
+                _('登录失败次数过多，账户已被锁定，请 {minutes} 分钟后重试').format(
+                    minutes=max(1, attempt_status['remaining_lockout'] // 60)
+                ),
                 code='E005001'
             )
         
-        # 如果失败次数较多，需要验证码
-        remaining_attempts = limiter.get_remaining_attempts(identifier)
-        if remaining_attempts <= 2:  # 剩余 2 次或更少时需要验证码
+        # 如果失败次数较多，需要验证码（验证码一次性使用，随后续写入一起删除）
+        used_keys = []
+        if attempt_status['remaining_attempts'] <= 2:  # 剩余 2 次或更少时需要验证码
             if not captcha:
                 raise AuthenticationException(_('登录失败次数过多，请输入验证码'), code='E002001')
             
-            # 验证验证码
-            captcha_gen = CaptchaGenerator()
-            if not captcha_gen.verify_captcha(captcha, client_ip):
-                limiter.record_failure(identifier)
+            used_keys.append(captcha_key)
+            if not CaptchaGenerator.matches(captcha, state.get(captcha_key)):
+                write_many(
+                    {attempts_key: (limiter.next_failure(attempts_data), limiter.window_duration)},
+                    delete_keys=used_keys,
+                )
                 raise AuthenticationException(_('验证码错误'), code='E002001')
         
         # 尝试认证用户
@@ -211,13 +224,17 @@ class LoginSerializer(serializers.Serializer):
         )
         
         if not user:
-            # 记录登录失败
-            attempt_info = limiter.record_failure(identifier)
-            remaining_attempts = limiter.get_remaining_attempts(identifier)
+            # 记录登录失败，失败记录和黑名单在一次批量写入中完成
+            attempts_data = limiter.next_failure(attempts_data)
+            writes = {attempts_key: (attempts_data, limiter.window_duration)}
+            remaining_attempts = limiter.evaluate(attempts_data)['remaining_attempts']
             
             # 如果失败次数过多，自动加入黑名单（可选）
-            if attempt_info['count'] >= 10:  # 10 次失败后加入黑名单
-                ip_manager.add_to_blacklist(client_ip, duration=3600)  # 1 小时
+            if attempts_data['count'] >= 10:  # 10 次失败后加入黑名单
+                blacklist.add(client_ip)
+                writes[ip_manager.blacklist_key] = (blacklist, 3600)  # 1 小时
+            
+            write_many(writes, delete_keys=used_keys)
             
             if remaining_attempts <= 2:
                 error_msg = _('用户名或密码错误，剩余尝试次数：{count}，需要验证码').format(count=remaining_attempts)
@@ -230,8 +247,11 @@ class LoginSerializer(serializers.Serializer):
         if not user.is_active:
             raise AuthenticationException(_('用户已被禁用，请联系管理员'), code='E002001')
         
-        # 登录成功，清除失败记录
-        limiter.record_success(identifier)
+        # 登录成功，清除失败记录和已使用的验证码（一次批量删除，无记录时不访问缓存）
+        if attempts_data is not None:
+            used_keys.append(attempts_key)
+        if used_keys:
+            cache.delete_many(used_keys)
         
         attrs['user'] = user
         return attrs
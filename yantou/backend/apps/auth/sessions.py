@@ -0,0 +1,61 @@
+"""
+用户会话代数
+签发 Token 时写入用户当前的会话代数（gen 声明），认证和刷新时与缓存中的计数器比较。
+递增计数器即可一次性使该用户所有已签发的 Access / Refresh Token 失效，无需扫描 Token 表。
+"""
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from utils.helpers import incr_cache_counter
+from .user_cache import invalidate_user_snapshot
+
+TOKEN_GENERATION_CLAIM = 'gen'
+TOKEN_REVOKED_MESSAGE = _('Token 已失效，请重新登录')
+
+
+def get_token_generation_key(user_id) -> str:
+    """获取用户会话代数缓存键"""
+    return f'token_generation:{user_id}'
+
+
+def get_token_generation(user_id) -> int:
+    """
+    获取用户当前的会话代数
+
+    Args:
+        user_id: 用户 ID
+
+    Returns:
+        int: 会话代数，从未吊销过时为 0
+    """
+    return cache.get(get_token_generation_key(user_id), 0)
+
+
+def revoke_user_sessions(user_id) -> int:
+    """
+    吊销用户的所有会话（登出所有设备）
+    此前签发的所有 Token 在下次认证或刷新时被拒绝
+
+    Args:
+        user_id: 用户 ID
+
+    Returns:
+        int: 新的会话代数
+    """
+    # 计数器不设过期时间，Redis 需使用 volatile-* 或 noeviction 淘汰策略，避免被淘汰后旧 Token 恢复有效
+    generation = incr_cache_counter(get_token_generation_key(user_id))
+    invalidate_user_snapshot(user_id)
+    return generation
+
+
+def is_token_revoked(token, current_generation: int) -> bool:
+    """
+    检查 Token 是否已被会话吊销
+
+    Args:
+        token: Token 对象
+        current_generation: 用户当前的会话代数
+
+    Returns:
+        bool: True 表示 Token 签发于最近一次吊销之前
+    """
+    return token.get(TOKEN_GENERATION_CLAIM, 0) < current_generation
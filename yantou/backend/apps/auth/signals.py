@@ -0,0 +1,62 @@
+"""
+认证信号处理
+用户记录保存或删除时使快照缓存失效，修改密码时吊销用户的所有会话，
+新增或修改用户名时加入用户名可用性过滤器
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .models import SnapshotUser
+from .sessions import revoke_user_sessions
+from .user_cache import invalidate_user_snapshot
+from .username_filter import publish_rename, username_filter
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=SnapshotUser)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=SnapshotUser)
+def invalidate_snapshot_on_user_change(sender, instance, **kwargs):
+    """
+    用户保存或删除后使快照失效
+    事务提交后再失效一次，避免其他请求在提交前用旧数据重建快照
+    """
+    user_id = instance.pk
+    invalidate_user_snapshot(user_id)
+    transaction.on_commit(lambda: invalidate_user_snapshot(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=SnapshotUser)
+def revoke_sessions_on_password_change(sender, instance, created, **kwargs):
+    """用户修改密码（set_password）后吊销其所有会话"""
+    if not created and getattr(instance, '_password', None) is not None:
+        revoke_user_sessions(instance.pk)
+
+
+@receiver(post_init, sender=User)
+@receiver(post_init, sender=SnapshotUser)
+def remember_loaded_username(sender, instance, **kwargs):
+    """记录加载（或构造）时的用户名，保存时据此判断是否改名（延迟加载的字段不触发查询）"""
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=SnapshotUser)
+def add_username_to_filter(sender, instance, created, update_fields=None, **kwargs):
+    """
+    用户保存后将用户名加入本进程的用户名过滤器（其他进程按刷新间隔增量拉取）
+    用户名实际变更时其他进程无法按注册时间拉取，写入改名日志
+    """
+    loaded = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if not instance.username:
+        return
+    username_filter.add(instance.username)
+    if (
+        not created
+        and instance.username != loaded
+        and (update_fields is None or 'username' in update_fields)
+    ):
+        publish_rename(instance.username)
@@ -0,0 +1,163 @@
+"""
+JWT Token 状态存储
+管理 Refresh Token 的 outstanding / blacklist 状态，支持数据库和缓存（Redis）两种后端
+
+- database: 使用 simplejwt 的 token_blacklist 表（默认）
+- cache: 以 jti 为键写入 Redis，TTL 等于 Token 剩余有效期，过期后自动清除
+"""
+import time
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+class DatabaseTokenStore:
+    """
+    数据库 Token 状态存储
+    与 simplejwt token_blacklist 应用的行为保持一致
+    """
+
+    def register(self, token, user=None):
+        """
+        记录新签发的 Token（outstanding）
+
+        Args:
+            token: Refresh Token 对象
+            user: 用户对象（可选，为空时根据 Token 中的用户 ID 查询）
+
+        Returns:
+            OutstandingToken: outstanding 记录
+        """
+        outstanding, _ = OutstandingToken.objects.get_or_create(
+            jti=token[api_settings.JTI_CLAIM],
+            defaults={
+                'user': user if user is not None else self._get_user(token),
+                'created_at': token.current_time,
+                'token': str(token),
+                'expires_at': datetime_from_epoch(token['exp']),
+            },
+        )
+        return outstanding
+
+    def blacklist(self, token):
+        """
+        将 Token 加入黑名单
+
+        Args:
+            token: Refresh Token 对象
+        """
+        return BlacklistedToken.objects.get_or_create(token=self.register(token))
+
+    def is_blacklisted(self, token) -> bool:
+        """
+        检查 Token 是否在黑名单中
+
+        Args:
+            token: Refresh Token 对象
+
+        Returns:
+            bool: True 表示已加入黑名单
+        """
+        return BlacklistedToken.objects.filter(token__jti=token[api_settings.JTI_CLAIM]).exists()
+
+    def _get_user(self, token):
+        """根据 Token 中的用户 ID 获取用户对象"""
+        User = get_user_model()
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        try:
+            return User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            return None
+
+
+class CacheTokenStore:
+    """
+    缓存 Token 状态存储
+    以 jti 为键写入缓存（Redis），TTL 为 Token 剩余有效期，刷新和登出不再写数据库
+    """
+    outstanding_key_prefix = 'jwt_outstanding'
+    blacklist_key_prefix = 'jwt_blacklist'
+
+    def get_outstanding_key(self, jti: str) -> str:
+        """获取 outstanding 缓存键"""
+        return f'{self.outstanding_key_prefix}:{jti}'
+
+    def get_blacklist_key(self, jti: str) -> str:
+        """获取黑名单缓存键"""
+        return f'{self.blacklist_key_prefix}:{jti}'
+
+    def get_remaining_lifetime(self, token) -> int:
+        """
+        获取 Token 剩余有效期（秒）
+
+        Args:
+            token: Token 对象
+
+        Returns:
+            int: 剩余秒数，至少为 1
+        """
+        return max(1, int(token['exp'] - time.time()))
+
+    def register(self, token, user=None):
+        """
+        记录新签发的 Token（outstanding）
+
+        Args:
+            token: Refresh Token 对象
+            user: 用户对象（可选）
+        """
+        cache.set(
+            self.get_outstanding_key(token[api_settings.JTI_CLAIM]),
+            token.get(api_settings.USER_ID_CLAIM),
+            timeout=self.get_remaining_lifetime(token),
+        )
+
+    def blacklist(self, token):
+        """
+        将 Token 加入黑名单
+
+        Args:
+            token: Refresh Token 对象
+        """
+        cache.set(
+            self.get_blacklist_key(token[api_settings.JTI_CLAIM]),
+            1,
+            timeout=self.get_remaining_lifetime(token),
+        )
+
+    def is_blacklisted(self, token) -> bool:
+        """
+        检查 Token 是否在黑名单中
+
+        Args:
+            token: Refresh Token 对象
+
+        Returns:
+            bool: True 表示已加入黑名单
+        """
+        return cache.get(self.get_blacklist_key(token[api_settings.JTI_CLAIM])) is not None
+
+
+TOKEN_STORES = {
+    'database': DatabaseTokenStore,
+    'cache': CacheTokenStore,
+}
+
+
+def get_token_store(backend: Optional[str] = None):
+    """
+    获取 Token 状态存储
+
+    Args:
+        backend: 存储后端名称（database, cache），默认读取 JWT_TOKEN_STATE_BACKEND 配置
+
+    Returns:
+        Token 状态存储对象
+    """
+    if backend is None:
+        backend = getattr(settings, 'JWT_TOKEN_STATE_BACKEND', 'database')
+    return TOKEN_STORES.get(backend, DatabaseTokenStore)()
@@ -0,0 +1,84 @@
+"""
+JWT Token 类
+在 simplejwt RefreshToken 的基础上，将 outstanding / blacklist 状态交给可插拔的 Token 状态存储
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.settings import api_settings
+from .sessions import TOKEN_GENERATION_CLAIM, TOKEN_REVOKED_MESSAGE, get_token_generation, is_token_revoked
+from .token_store import get_token_store
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh Token
+    blacklist() 和黑名单校验通过 JWT_TOKEN_STATE_BACKEND 配置的存储后端完成，
+    签发时写入用户会话代数，吊销用户会话后此前签发的 Token 校验失败
+    """
+
+    def verify(self):
+        """校验 Token（签名、过期、黑名单及会话代数）"""
+        super().verify()
+        self.check_generation()
+
+    def check_generation(self):
+        """
+        检查 Token 是否已被用户会话吊销
+
+        Raises:
+            TokenError: 如果 Token 签发于最近一次吊销之前
+        """
+        user_id = self.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None and is_token_revoked(self, get_token_generation(user_id)):
+            raise TokenError(TOKEN_REVOKED_MESSAGE)
+
+    def check_blacklist(self):
+        """
+        检查 Token 是否在黑名单中
+
+        Raises:
+            TokenError: 如果 Token 已加入黑名单
+        """
+        if get_token_store().is_blacklisted(self):
+            raise TokenError(_('Token 已加入黑名单'))
+
+    def blacklist(self):
+        """将 Token 加入黑名单"""
+        return get_token_store().blacklist(self)
+
+    def outstand(self):
+        """记录 Token（outstanding）"""
+        return get_token_store().register(self)
+
+    def rotate(self):
+        """
+        旋转 Refresh Token
+        重新生成 jti、exp、iat 并记录为新的 outstanding Token，保留其余声明，无需查询用户
+
+        Returns:
+            RefreshToken: 旋转后的 Token（即自身）
+        """
+        self.set_jti()
+        self.set_exp()
+        self.set_iat()
+        self.outstand()
+        return self
+
+    @classmethod
+    def for_user(cls, user):
+        """
+        为用户签发 Refresh Token（带当前会话代数）并记录为 outstanding
+
+        Args:
+            user: 用户对象
+
+        Returns:
+            RefreshToken: Token 对象
+        """
+        # 跳过 BlacklistMixin.for_user（直接写 OutstandingToken 表），由存储后端负责记录
+        token = super(BlacklistMixin, cls).for_user(user)
+        token[TOKEN_GENERATION_CLAIM] = get_token_generation(user.pk)
+        get_token_store().register(token, user=user)
+        return token
+
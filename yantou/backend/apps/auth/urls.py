@@ -8,9 +8,11 @@ app_name = 'auth'
 
 urlpatterns = [
     path('register/', views.RegisterView.as_view(), name='register'),
+    path('username-available/', views.UsernameAvailabilityView.as_view(), name='username-available'),
     path('login/', views.LoginView.as_view(), name='login'),
     path('captcha/', views.CaptchaView.as_view(), name='captcha'),
     path('refresh/', views.TokenRefreshView.as_view(), name='token-refresh'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
+    path('logout-all/', views.LogoutAllView.as_view(), name='logout-all'),
 ]
 
@@ -0,0 +1,119 @@
+"""
+用户快照缓存
+认证时从缓存中的用户快照构造用户对象，避免每个请求都查询用户表
+
+快照只包含认证和权限判断常用的字段（id、username、is_active、is_staff、is_superuser）
+以及权限代数、会话代数；视图访问其他字段时才从数据库加载完整的用户记录。
+
+快照带版本号：失效时递增版本号并删除快照，读取时快照版本与当前版本不一致即视为过期，
+避免失效与重建并发时把旧数据写回缓存。
+"""
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from utils.helpers import incr_cache_counter
+
+SNAPSHOT_FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')
+
+
+def get_snapshot_key(user_id) -> str:
+    """获取用户快照缓存键"""
+    return f'user_snapshot:{user_id}'
+
+
+def get_snapshot_version_key(user_id) -> str:
+    """获取用户快照版本号缓存键"""
+    return f'user_snapshot_version:{user_id}'
+
+
+def build_user_snapshot(user_id, version: int = 0) -> Optional[dict]:
+    """
+    从数据库构建用户快照
+
+    Args:
+        user_id: 用户 ID
+        version: 快照版本号
+
+    Returns:
+        dict: 用户快照，用户不存在时返回 None
+    """
+    from django.contrib.auth import get_user_model
+    from apps.permissions.utils import get_permission_generation_key
+    from .sessions import get_token_generation_key
+
+    values = get_user_model().objects.filter(pk=user_id).values(*SNAPSHOT_FIELDS).first()
+    if values is None:
+        return None
+
+    perm_key = get_permission_generation_key(user_id)
+    token_key = get_token_generation_key(user_id)
+    generations = cache.get_many([perm_key, token_key])
+    values['perm_generation'] = generations.get(perm_key, 0)
+    values['token_generation'] = generations.get(token_key, 0)
+    values['version'] = version
+    return values
+
+
+def get_user_snapshot(user_id) -> Optional[dict]:
+    """
+    获取用户快照，缓存未命中或已过期时从数据库重建
+
+    Args:
+        user_id: 用户 ID
+
+    Returns:
+        dict: 用户快照，用户不存在时返回 None
+    """
+    snapshot_key = get_snapshot_key(user_id)
+    version_key = get_snapshot_version_key(user_id)
+    cached = cache.get_many([snapshot_key, version_key])
+    version = cached.get(version_key, 0)
+
+    snapshot = cached.get(snapshot_key)
+    if snapshot is not None and snapshot.get('version') == version:
+        return snapshot
+
+    # 使用查询前读取的版本号：重建期间若发生失效，写入的快照会因版本不一致被丢弃
+    snapshot = build_user_snapshot(user_id, version=version)
+    if snapshot is not None:
+        cache.set(snapshot_key, snapshot, getattr(settings, 'USER_SNAPSHOT_TIMEOUT', 300))
+    return snapshot
+
+
+def invalidate_user_snapshot(user_id):
+    """
+    使用户快照失效
+
+    Args:
+        user_id: 用户 ID
+    """
+    incr_cache_counter(get_snapshot_version_key(user_id))
+    cache.delete(get_snapshot_key(user_id))
+
+
+def user_from_snapshot(snapshot: dict):
+    """
+    根据快照构造用户对象
+    仅快照中的字段已加载，其余字段在首次访问时一次性从数据库加载
+
+    Args:
+        snapshot: 用户快照
+
+    Returns:
+        SnapshotUser: 用户对象
+    """
+    from .models import SnapshotUser
+
+    # from_db 按模型字段顺序依次取值
+    field_names = [
+        field.attname for field in SnapshotUser._meta.concrete_fields
+        if field.attname in SNAPSHOT_FIELDS
+    ]
+    user = SnapshotUser.from_db(
+        DEFAULT_DB_ALIAS,
+        field_names,
+        [snapshot[name] for name in field_names],
+    )
+    user.perm_generation = snapshot['perm_generation']
+    return user
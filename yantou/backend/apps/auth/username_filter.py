@@ -0,0 +1,196 @@
+"""
+用户名可用性检查
+每个 worker 维护已有用户名的布隆过滤器：判断不存在时直接返回可用，不查询数据库；
+判断可能存在时再走 username 唯一索引确认。
+
+过滤器由后台线程构建和维护，请求线程只读取，不在请求中查询数据库构建：
+- 首次使用时唤醒后台线程构建，构建完成前所有用户名都交给数据库确认
+- 按注册时间（date_joined）水位增量拉取新用户，每次回看 REFRESH_OVERLAP 秒，
+  覆盖注册时间早于水位但较晚提交的事务
+- 修改用户名在本进程立即加入，同时写入缓存中的改名日志，其他进程增量刷新时拉取
+- 定期全量重建以清除已删除的用户并按用户数调整容量
+注册接口的唯一性校验仍以数据库为准，过滤器只用于输入时的可用性提示。
+"""
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from utils.background import PeriodicFlusher
+from utils.bloom import BloomFilter
+from utils.helpers import incr_cache_counter
+
+MIN_CAPACITY = 100000
+
+# 增量拉取时按注册时间回看的秒数
+REFRESH_OVERLAP = 60
+
+RENAME_VERSION_KEY = 'username_filter_rename_version'
+RENAME_LOG_KEY_PREFIX = 'username_filter_rename_log'
+
+
+def get_rename_log_key(version: int) -> str:
+    """获取改名日志缓存键"""
+    return f'{RENAME_LOG_KEY_PREFIX}:{version}'
+
+
+class UsernameFilter:
+    """
+    已有用户名布隆过滤器
+    """
+
+    def __init__(self, error_rate: float = 0.01, refresh_interval: float = None, rebuild_interval: float = None,
+                 background: bool = True):
+        """
+        Args:
+            error_rate: 误判率（误判只会多一次数据库查询）
+            refresh_interval: 增量拉取新用户的最小间隔（秒）
+            rebuild_interval: 全量重建间隔（秒）
+            background: 是否由后台线程维护（为 False 时在调用线程中按需构建和刷新）
+        """
+        self.error_rate = error_rate
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None
+            else getattr(settings, 'USERNAME_FILTER_REFRESH_INTERVAL', 5)
+        )
+        self.rebuild_interval = (
+            rebuild_interval if rebuild_interval is not None
+            else getattr(settings, 'USERNAME_FILTER_REBUILD_INTERVAL', 3600)
+        )
+        self.background = background
+        self.bloom = None
+        self.watermark = None
+        self.rename_version = 0
+        self.last_refresh = 0.0
+        self.last_rebuild = 0.0
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def rebuild(self):
+        """从数据库全量构建过滤器"""
+        User = get_user_model()
+        # 先记录改名日志版本，构建期间的改名在下次刷新时拉取
+        rename_version = cache.get(RENAME_VERSION_KEY, 0)
+        capacity = max(MIN_CAPACITY, User.objects.count() * 2)
+        bloom = BloomFilter(capacity, self.error_rate)
+        watermark = None
+        for username, date_joined in User.objects.values_list('username', 'date_joined').iterator(chunk_size=5000):
+            bloom.add(username)
+            if watermark is None or date_joined > watermark:
+                watermark = date_joined
+
+        now = time.monotonic()
+        self.bloom, self.watermark, self.rename_version = bloom, watermark, rename_version
+        self.last_refresh = self.last_rebuild = now
+
+    def refresh(self):
+        """增量拉取水位之后注册的用户和其他进程的改名"""
+        User = get_user_model()
+        queryset = User.objects.all()
+        if self.watermark is not None:
+            queryset = queryset.filter(date_joined__gte=self.watermark - timedelta(seconds=REFRESH_OVERLAP))
+        for username, date_joined in queryset.values_list('username', 'date_joined'):
+            self.add(username)
+            if self.watermark is None or date_joined > self.watermark:
+                self.watermark = date_joined
+
+        latest = cache.get(RENAME_VERSION_KEY, 0)
+        if latest > self.rename_version:
+            entries = cache.get_many([get_rename_log_key(v) for v in range(self.rename_version + 1, latest + 1)])
+            for username in entries.values():
+                self.add(username)
+        self.rename_version = latest
+        self.last_refresh = time.monotonic()
+
+    def ensure_fresh(self):
+        """按需构建、重建或增量刷新"""
+        now = time.monotonic()
+        if (
+            self.bloom is not None
+            and now - self.last_refresh < self.refresh_interval
+            and now - self.last_rebuild < self.rebuild_interval
+        ):
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self.bloom is None
+                or now - self.last_rebuild >= self.rebuild_interval
+                or len(self.bloom) > self.bloom.capacity
+            ):
+                self.rebuild()
+            elif now - self.last_refresh >= self.refresh_interval:
+                self.refresh()
+
+    def start(self):
+        """启动后台维护线程，过滤器尚未构建时立即唤醒"""
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    interval = max(self.refresh_interval, 1)
+                    self._flusher = PeriodicFlusher(self.ensure_fresh, interval, name='username-filter')
+        self._flusher.start()
+        if self.bloom is None:
+            self._flusher.wake()
+
+    def add(self, username: str):
+        """
+        添加用户名（过滤器尚未构建时忽略，构建时会从数据库加载）
+
+        Args:
+            username: 用户名
+        """
+        bloom = self.bloom
+        # 已存在的不重复计数，避免回看窗口内的用户使计数虚高而提前重建
+        if bloom is not None and username not in bloom:
+            bloom.add(username)
+
+    def might_exist(self, username: str) -> bool:
+        """
+        判断用户名是否可能已存在
+
+        Args:
+            username: 用户名
+
+        Returns:
+            bool: False 表示一定不存在（截至上次刷新）；过滤器尚未构建时返回 True
+        """
+        if self.background:
+            self.start()
+        else:
+            self.ensure_fresh()
+        bloom = self.bloom
+        return bloom is None or username in bloom
+
+
+username_filter = UsernameFilter()
+
+
+def publish_rename(username: str):
+    """
+    记录修改后的用户名，其他进程增量刷新时加入过滤器
+    日志保留一个全量重建间隔（之后重建会从数据库加载）
+
+    Args:
+        username: 修改后的用户名
+    """
+    version = incr_cache_counter(RENAME_VERSION_KEY)
+    cache.set(get_rename_log_key(version), username, timeout=int(username_filter.rebuild_interval) + 60)
+
+
+def is_username_taken(username: str) -> bool:
+    """
+    检查用户名是否已被使用
+    过滤器判断不存在时不查询数据库
+
+    Args:
+        username: 用户名
+
+    Returns:
+        bool: True 表示已被使用
+    """
+    if not username_filter.might_exist(username):
+        return False
+    return get_user_model().objects.filter(username=username).exists()
@@ -5,16 +5,24 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils.translation import gettext_lazy as _
 from apps.common.response import APIResponse
 from apps.common.exceptions import ValidationException, AuthenticationException
 from apps.common.audit import log_login, log_logout
+from .tokens import RefreshToken
+from .sessions import revoke_user_sessions
+from .revocation import revoke_access_token
+from .last_login import record_last_login
+from .username_filter import is_username_taken
 from .serializers import RegisterSerializer, LoginSerializer, TokenRefreshSerializer
 from .security import LoginAttemptLimiter, IPWhitelistBlacklist, CaptchaGenerator, DeviceFingerprint
+from utils.validators import validate_username
 import logging
 
 logger = logging.getLogger('django.request')
@@ -26,6 +34,7 @@ class RegisterView(APIView):
     允许匿名用户注册
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'register'
     
     @extend_schema(
         tags=['认证'],
@@ -188,6 +197,82 @@ class RegisterView(APIView):
             )
 
 
+class UsernameAvailabilityView(APIView):
+    """
+    用户名可用性视图
+    注册表单输入时检查用户名是否可用，由进程内布隆过滤器判断，只有可能已存在时才查询数据库
+    """
+    permission_classes = [AllowAny]
+    throttle_scope = 'username_check'
+
+    @extend_schema(
+        tags=['认证'],
+        summary='检查用户名是否可用',
+        description='注册前检查用户名是否可用。结果仅供提示，注册时仍以数据库唯一性校验为准。',
+        parameters=[
+            OpenApiParameter(
+                name='username',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='用户名'
+            ),
+        ],
+        responses={
+            200: {
+                'description': '检查成功',
+                'examples': [
+                    OpenApiExample(
+                        '成功响应',
+                        value={
+                            'success': True,
+                            'code': 200,
+                            'message': '检查成功',
+                            'data': {
+                                'username': 'testuser',
+                                'available': True
+                            },
+                            'request_id': 'req_abc123',
+                            'timestamp': '2025-12-06T16:00:00Z'
+                        }
+                    )
+                ]
+            },
+            400: {'description': '用户名格式不正确'}
+        }
+    )
+    def get(self, request):
+        """
+        检查用户名是否可用
+
+        Query Params:
+            username: 用户名
+
+        Returns:
+            APIResponse: 包含是否可用的响应
+        """
+        username = request.query_params.get('username', '').strip()
+
+        try:
+            validate_username(username)
+        except DjangoValidationError as e:
+            return APIResponse.error(
+                message=e.messages[0],
+                code='E001001',
+                status_code=status.HTTP_400_BAD_REQUEST,
+                request_id=getattr(request, 'request_id', None)
+            )
+
+        return APIResponse.success(
+            data={
+                'username': username,
+                'available': not is_username_taken(username),
+            },
+            message=_('检查成功'),
+            request_id=getattr(request, 'request_id', None)
+        )
+
+
 class LoginView(APIView):
     """
     用户登录视图
@@ -195,6 +280,7 @@ class LoginView(APIView):
     支持登录失败次数限制、验证码、设备指纹识别
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'login'
     
     @extend_schema(
         tags=['认证'],
@@ -333,6 +419,10 @@ class LoginView(APIView):
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
             
+            # 更新最后登录时间（缓冲后批量写入，不在请求事务中更新用户表）
+            if settings.SIMPLE_JWT.get('UPDATE_LAST_LOGIN', False):
+                record_last_login(user.id)
+            
             # 获取设备信息
             device_info = DeviceFingerprint.get_device_info(request)
             
@@ -410,6 +500,7 @@ class CaptchaView(APIView):
     获取登录验证码（当登录失败次数过多时）
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'captcha'
     
     @extend_schema(
         tags=['认证'],
@@ -468,6 +559,7 @@ class TokenRefreshView(APIView):
     使用 Refresh Token 获取新的 Access Token
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'token_refresh'
     
     @extend_schema(
         tags=['认证'],
@@ -535,19 +627,22 @@ class TokenRefreshView(APIView):
         
         try:
             refresh_token = serializer.validated_data['refresh']
+            # 构造 Token 时会通过 Token 状态存储校验黑名单
             refresh = RefreshToken(refresh_token)
             
             # 生成新的 Access Token
             access_token = str(refresh.access_token)
             
+            if settings.SIMPLE_JWT.get('UPDATE_LAST_LOGIN', False):
+                record_last_login(refresh[api_settings.USER_ID_CLAIM])
+            
             # 如果配置了 Token 旋转，返回新的 Refresh Token
-            from django.conf import settings
             if settings.SIMPLE_JWT.get('ROTATE_REFRESH_TOKENS', False):
                 # 将旧的 Refresh Token 加入黑名单
-                refresh.blacklist()
-                # 生成新的 Refresh Token
-                new_refresh = RefreshToken.for_user(refresh.user)
-                refresh_token = str(new_refresh)
+                if settings.SIMPLE_JWT.get('BLACKLIST_AFTER_ROTATION', False):
+                    refresh.blacklist()
+                # 旋转生成新的 Refresh Token（保留原有声明，无需查询用户）
+                refresh_token = str(refresh.rotate())
             
             return APIResponse.success(
                 data={
@@ -592,7 +687,7 @@ class TokenRefreshView(APIView):
 class LogoutView(APIView):
     """
     用户登出视图
-    将 Refresh Token 加入黑名单
+    将 Refresh Token 加入黑名单，并吊销当前的 Access Token
     """
     permission_classes = [IsAuthenticated]
     
@@ -665,6 +760,9 @@ class LogoutView(APIView):
             refresh = RefreshToken(refresh_token)
             # 将 Token 加入黑名单
             refresh.blacklist()
+            # 吊销当前请求使用的 Access Token，无需等待其过期
+            if request.auth is not None:
+                revoke_access_token(request.auth)
             
             # 记录退出日志到数据库（审计日志）
             log_logout(
@@ -717,3 +815,63 @@ class LogoutView(APIView):
                 error=str(e),
                 request_id=getattr(request, 'request_id', None)
             )
+
+
+class LogoutAllView(APIView):
+    """
+    登出所有设备视图
+    吊销当前用户的所有会话，此前签发的 Access / Refresh Token 全部失效
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        tags=['认证'],
+        summary='登出所有设备',
+        description='吊销当前用户在所有设备上的会话，此前签发的 Token 全部失效',
+        request=None,
+        responses={
+            200: {
+                'description': '登出成功',
+                'examples': [
+                    OpenApiExample(
+                        '成功响应',
+                        value={
+                            'success': True,
+                            'code': 200,
+                            'message': '已登出所有设备',
+                            'request_id': 'req_abc123',
+                            'timestamp': '2025-12-06T16:00:00Z'
+                        }
+                    )
+                ]
+            }
+        }
+    )
+    def post(self, request):
+        """
+        登出所有设备
+
+        Returns:
+            APIResponse: 登出成功响应
+        """
+        revoke_user_sessions(request.user.pk)
+
+        log_logout(
+            user=request.user,
+            request=request,
+            status=1,
+        )
+
+        logger.info(
+            f"User logged out from all devices: {request.user.username}",
+            extra={
+                'request_id': getattr(request, 'request_id', None),
+                'user_id': request.user.id,
+                'username': request.user.username,
+            }
+        )
+
+        return APIResponse.success(
+            message=_('已登出所有设备'),
+            request_id=getattr(request, 'request_id', None)
+        )
@@ -12,7 +12,7 @@ class AuditLogAdmin(admin.ModelAdmin):
     """
     list_display = [
         'id', 'username', 'action', 'resource_type', 'resource_id',
-        'status', 'ip_address', 'created_at'
+        'status', 'ip_address', 'event_count', 'created_at'
     ]
     list_filter = [
         'action', 'resource_type', 'status', 'created_at'
@@ -25,9 +25,11 @@ class AuditLogAdmin(admin.ModelAdmin):
         'user_id', 'username', 'action', 'resource_type', 'resource_id',
         'resource_name', 'description', 'request_method', 'request_path',
         'request_params', 'ip_address', 'user_agent', 'status',
-        'error_message', 'execution_time', 'created_at'
+        'error_message', 'execution_time', 'event_count', 'created_at'
     ]
     date_hierarchy = 'created_at'
+    # 日志表数据量大，不统计总数
+    show_full_result_count = False
     ordering = ['-created_at']
     
     def has_add_permission(self, request):
@@ -63,6 +65,8 @@ class LoginLogAdmin(admin.ModelAdmin):
         'location', 'device', 'browser', 'os', 'status', 'failure_reason', 'created_at'
     ]
     date_hierarchy = 'created_at'
+    # 日志表数据量大，不统计总数
+    show_full_result_count = False
     ordering = ['-created_at']
     
     def has_add_permission(self, request):
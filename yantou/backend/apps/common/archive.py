@@ -0,0 +1,289 @@
+"""
+操作日志冷归档
+把早于 AUDIT_ARCHIVE_AFTER_MONTHS 个月的操作日志按月（UTC）写入归档目录后从数据库删除，热表只保留近期数据。
+
+每次归档一个月生成一组文件（同一个月之后又出现的记录，如回放的缓冲日志，再次归档时生成新的分片）：
+- <表名>_<YYYYMM>_<分片>.ndjson.z: 按 (created_at, id) 排序的 NDJSON，每 AUDIT_ARCHIVE_BLOCK_ROWS 行
+  单独用 zlib 压缩为一个块，块首尾相接，可按偏移单独解压任意一块
+- <表名>_<YYYYMM>_<分片>.index.json: 每个块的偏移、长度、行数、时间范围，以及每个用户 ID 所在的块
+  索引文件最后写入，存在即表示该分片完整；数据库中的记录在索引写入后才删除，
+  且只删除写入分片的记录（按写入时记录的主键），归档期间才满足条件的记录留到下次
+
+查询时只读取索引，按时间范围和用户 ID 选出需要的块，对数据文件 mmap 后只解压这些块。
+归档目录可以是挂载的对象存储（文件系统接口），文件写入后不再修改。
+"""
+import json
+import mmap
+from array import array
+import os
+import re
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from typing import Iterator, List, Optional
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .export import get_export_fields, iter_rows, to_json_value
+from .models import AuditLog
+from .partitions import add_months, month_start
+
+INDEX_VERSION = 1
+DATA_SUFFIX = '.ndjson.z'
+INDEX_SUFFIX = '.index.json'
+
+
+def get_archive_dir() -> str:
+    """获取归档目录"""
+    return getattr(settings, 'AUDIT_ARCHIVE_DIR', None) or os.path.join(str(settings.BASE_DIR), 'archive', 'audit_logs')
+
+
+def month_range(month):
+    """月份（UTC）对应的时间范围 [月初, 下月初)"""
+    start = datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+    end = add_months(month, 1)
+    return start, datetime(end.year, end.month, 1, tzinfo=dt_timezone.utc)
+
+
+def get_archive_cutoff_month(now=None, months: int = None):
+    """
+    获取归档截止月份（早于该月的整月数据可归档）
+
+    Returns:
+        date: 截止月份第一天
+    """
+    if months is None:
+        months = getattr(settings, 'AUDIT_ARCHIVE_AFTER_MONTHS', 6)
+    return add_months(month_start(now or timezone.now()), -months)
+
+
+def list_archive_parts(archive_dir: str = None) -> List[str]:
+    """
+    列出完整的归档分片（有索引文件的分片）
+
+    Returns:
+        list: 分片路径前缀（不含后缀），按名称排序
+    """
+    archive_dir = archive_dir or get_archive_dir()
+    if not os.path.isdir(archive_dir):
+        return []
+    return sorted(
+        os.path.join(archive_dir, name[:-len(INDEX_SUFFIX)])
+        for name in os.listdir(archive_dir) if name.endswith(INDEX_SUFFIX)
+    )
+
+
+def next_part_path(archive_dir: str, table: str, month) -> str:
+    """获取某月下一个分片的路径前缀"""
+    prefix = f'{table}_{month:%Y%m}_'
+    pattern = re.compile(re.escape(prefix) + r'(\d+)' + re.escape(INDEX_SUFFIX))
+    parts = [int(m.group(1)) for m in map(pattern.fullmatch, os.listdir(archive_dir)) if m]
+    return os.path.join(archive_dir, f'{prefix}{max(parts, default=0) + 1:03d}')
+
+
+class BlockWriter:
+    """
+    分块压缩写入器
+    累积到 block_rows 行时压缩为一块写入数据文件，同时记录块的索引信息
+    """
+
+    def __init__(self, f, block_rows: int):
+        self.f = f
+        self.block_rows = block_rows
+        self.blocks = []
+        self.users = {}
+        self._lines = []
+        self._first = None
+        self._last = None
+
+    def add(self, record: dict):
+        """添加一条记录（需按 created_at 顺序）"""
+        if self._first is None:
+            self._first = record
+        self._last = record
+        if record.get('user_id') is not None:
+            blocks = self.users.setdefault(str(record['user_id']), [])
+            if not blocks or blocks[-1] != len(self.blocks):
+                blocks.append(len(self.blocks))
+        self._lines.append(json.dumps(record, ensure_ascii=False))
+        if len(self._lines) >= self.block_rows:
+            self.close_block()
+
+    def close_block(self):
+        """压缩并写入当前块"""
+        if not self._lines:
+            return
+        data = zlib.compress(('\n'.join(self._lines) + '\n').encode('utf-8'), 6)
+        self.blocks.append({
+            'offset': self.f.tell(),
+            'length': len(data),
+            'rows': len(self._lines),
+            'start': self._first['created_at'],
+            'end': self._last['created_at'],
+            'min_id': self._first['id'],
+            'max_id': self._last['id'],
+        })
+        self.f.write(data)
+        self._lines = []
+        self._first = None
+
+
+def archive_month(month, archive_dir: str = None, block_rows: int = None, delete: bool = True,
+                  batch_size: int = 1000) -> int:
+    """
+    归档一个月的操作日志
+
+    Args:
+        month: 月份第一天（UTC）
+        archive_dir: 归档目录
+        block_rows: 每块行数
+        delete: 归档后是否从数据库删除
+        batch_size: 每批删除的记录数
+
+    Returns:
+        int: 归档的记录数
+    """
+    archive_dir = archive_dir or get_archive_dir()
+    block_rows = block_rows or getattr(settings, 'AUDIT_ARCHIVE_BLOCK_ROWS', 2000)
+    start, end = month_range(month)
+    queryset = AuditLog.objects.filter(created_at__gte=start, created_at__lt=end)
+    # 以开始时的最大主键为界，归档期间写入的记录留到下次
+    max_id = queryset.order_by('-id').values_list('id', flat=True).first()
+    if max_id is None:
+        return 0
+    queryset = queryset.filter(id__lte=max_id)
+
+    os.makedirs(archive_dir, exist_ok=True)
+    part = next_part_path(archive_dir, AuditLog._meta.db_table, month)
+    fields = get_export_fields(AuditLog)
+    tmp_data = part + DATA_SUFFIX + '.tmp'
+    # 写入分片的记录主键（紧凑数组，一个月的数据量也只占少量内存），删除时只删除这些记录
+    archived_ids = array('q')
+    with open(tmp_data, 'wb') as f:
+        writer = BlockWriter(f, block_rows)
+        for row in iter_rows(queryset.order_by('created_at', 'id'), fields):
+            record = {field: to_json_value(value) for field, value in zip(fields, row)}
+            writer.add(record)
+            archived_ids.append(record['id'])
+        writer.close_block()
+        f.flush()
+        os.fsync(f.fileno())
+    total = len(archived_ids)
+    if not total:
+        # 开始后记录已被删除
+        os.remove(tmp_data)
+        return 0
+    os.replace(tmp_data, part + DATA_SUFFIX)
+
+    index = {
+        'version': INDEX_VERSION,
+        'table': AuditLog._meta.db_table,
+        'month': f'{month:%Y-%m}',
+        'rows': total,
+        'start': writer.blocks[0]['start'],
+        'end': writer.blocks[-1]['end'],
+        'blocks': writer.blocks,
+        'users': writer.users,
+    }
+    tmp_index = part + INDEX_SUFFIX + '.tmp'
+    with open(tmp_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_index, part + INDEX_SUFFIX)
+
+    if delete:
+        for offset in range(0, total, batch_size):
+            with transaction.atomic():
+                AuditLog.objects.filter(id__in=archived_ids[offset:offset + batch_size].tolist()).delete()
+    return total
+
+
+def archive_old_logs(months: int = None, archive_dir: str = None, delete: bool = True) -> dict:
+    """
+    归档早于指定月数的全部整月操作日志
+
+    Args:
+        months: 热表保留的月数（默认 AUDIT_ARCHIVE_AFTER_MONTHS）
+        archive_dir: 归档目录
+        delete: 归档后是否从数据库删除
+
+    Returns:
+        dict: {月份: 归档的记录数}（不含没有记录的月份）
+    """
+    cutoff = get_archive_cutoff_month(months=months)
+    oldest = AuditLog.objects.filter(created_at__lt=month_range(cutoff)[0]).aggregate(oldest=Min('created_at'))['oldest']
+    result = {}
+    if oldest is None:
+        return result
+    month = month_start(oldest)
+    while month < cutoff:
+        count = archive_month(month, archive_dir, delete=delete)
+        if count:
+            result[f'{month:%Y-%m}'] = count
+        month = add_months(month, 1)
+    return result
+
+
+def load_index(part: str) -> dict:
+    """读取分片索引"""
+    with open(part + INDEX_SUFFIX, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _overlaps(block_start: str, block_end: str, start: Optional[datetime], end: Optional[datetime]) -> bool:
+    if start and parse_datetime(block_end) < start:
+        return False
+    if end and parse_datetime(block_start) >= end:
+        return False
+    return True
+
+
+def search_archive(start: datetime = None, end: datetime = None, user_id: int = None, action: str = None,
+                   resource_type: str = None, archive_dir: str = None) -> Iterator[dict]:
+    """
+    查询归档的操作日志
+
+    Args:
+        start: 开始时间（含）
+        end: 结束时间（不含）
+        user_id: 用户 ID
+        action: 操作类型
+        resource_type: 资源类型
+        archive_dir: 归档目录
+
+    Returns:
+        Iterator: 日志记录字典，按分片和时间顺序
+    """
+    for part in list_archive_parts(archive_dir):
+        index = load_index(part)
+        if not index['blocks'] or not _overlaps(index['start'], index['end'], start, end):
+            continue
+
+        block_numbers = range(len(index['blocks']))
+        if user_id is not None:
+            block_numbers = index['users'].get(str(user_id), [])
+        blocks = [
+            index['blocks'][number] for number in block_numbers
+            if _overlaps(index['blocks'][number]['start'], index['blocks'][number]['end'], start, end)
+        ]
+        if not blocks:
+            continue
+
+        with open(part + DATA_SUFFIX, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for block in blocks:
+                raw = zlib.decompress(data[block['offset']:block['offset'] + block['length']])
+                for line in raw.decode('utf-8').splitlines():
+                    record = json.loads(line)
+                    if user_id is not None and record['user_id'] != user_id:
+                        continue
+                    if action and record['action'] != action:
+                        continue
+                    if resource_type and record['resource_type'] != resource_type:
+                        continue
+                    if start or end:
+                        created_at = parse_datetime(record['created_at'])
+                        if (start and created_at < start) or (end and created_at >= end):
+                            continue
+                    yield record
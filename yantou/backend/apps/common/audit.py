@@ -1,16 +1,124 @@
 """
 操作日志记录工具
 提供便捷的操作日志记录函数和装饰器
+日志通过 audit_writer 异步批量写入数据库，请求线程只负责构造日志对象
+
+日志的提交时机与请求事务（ATOMIC_REQUESTS）解耦：
+- 成功日志在事务提交后提交（transaction.on_commit），事务回滚时随之丢弃，不会记录未生效的操作
+- 失败日志先放入请求级缓冲区，请求结束（事务已提交或回滚）后由 RequestLoggingMiddleware 提交，
+  不会随业务事务一起回滚；不在请求中时直接提交
+
+每个请求只记录一条操作日志：视图（如 AuditLogMixin）通过 set_audit_context 补充资源 ID、名称、描述等字段，
+请求结束时由 RequestLoggingMiddleware 合并为一条记录，不再各自写入。
 """
 import time
 import json
+from contextvars import ContextVar
 from functools import wraps
 from django.contrib.auth import get_user_model
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
+from .audit_writer import submit_log
 from .models import AuditLog, LoginLog
 
 User = get_user_model()
 
+# 请求级失败日志缓冲区（None 表示当前不在请求中）
+_pending_failures = ContextVar('audit_pending_failures', default=None)
+
+# 当前请求待记录的操作日志字段（None 表示当前不在请求中）
+_audit_context = ContextVar('audit_context', default=None)
+
+
+def begin_audit_buffer():
+    """开始请求级日志缓冲和操作日志上下文（请求开始时调用）"""
+    _pending_failures.set([])
+    _audit_context.set({})
+
+
+def set_audit_context(**fields):
+    """
+    补充当前请求的操作日志字段（请求结束时由 RequestLoggingMiddleware 记录）
+
+    Args:
+        **fields: AuditLog 字段，如 action, resource_type, resource_id, resource_name, description
+
+    Returns:
+        bool: 是否在请求中（为 False 时调用方应直接调用 log_audit）
+    """
+    context = _audit_context.get()
+    if context is None:
+        return False
+    context.update(fields)
+    return True
+
+
+def pop_audit_context():
+    """
+    取出并结束当前请求的操作日志上下文
+
+    Returns:
+        dict: 视图补充的字段（没有时为空字典）
+    """
+    context = _audit_context.get()
+    _audit_context.set(None)
+    return context or {}
+
+
+def flush_audit_buffer():
+    """
+    提交缓冲的失败日志并结束缓冲（请求结束时调用）
+
+    Returns:
+        int: 提交的日志数
+    """
+    pending = _pending_failures.get()
+    _pending_failures.set(None)
+    _audit_context.set(None)
+    for obj in pending or ():
+        submit_log(obj)
+    return len(pending or ())
+
+
+def emit_log(obj, success=True):
+    """
+    按事务状态提交日志对象
+
+    Args:
+        obj: 未保存的 AuditLog 或 LoginLog 对象
+        success: 是否为成功操作的日志
+    """
+    if success:
+        # 不在事务中时立即执行
+        transaction.on_commit(lambda: submit_log(obj))
+        return
+
+    pending = _pending_failures.get()
+    if pending is not None and transaction.get_connection().in_atomic_block:
+        pending.append(obj)
+    else:
+        submit_log(obj)
+
+
+def truncate_log_fields(obj):
+    """
+    按 max_length 截断日志对象的字符串字段
+    User-Agent、请求路径等来自客户端，超长时批量写入会整批失败
+
+    Args:
+        obj: 未保存的 AuditLog 或 LoginLog 对象
+
+    Returns:
+        obj: 截断后的日志对象
+    """
+    for field in obj._meta.concrete_fields:
+        if not isinstance(field, models.CharField) or not field.max_length:
+            continue
+        value = getattr(obj, field.attname)
+        if isinstance(value, str) and len(value) > field.max_length:
+            setattr(obj, field.attname, value[:field.max_length])
+    return obj
+
 
 def get_client_ip(request):
     """
@@ -124,15 +232,10 @@ def log_audit(
     # 设置请求参数
     if request_params:
         audit_log.set_request_params(request_params)
+    truncate_log_fields(audit_log)
     
-    # 保存日志
-    try:
-        audit_log.save()
-    except Exception as e:
-        # 日志记录失败不应该影响主业务
-        import logging
-        logger = logging.getLogger('django.audit')
-        logger.error(f"Failed to save audit log: {str(e)}")
+    # 提交日志（异步批量写入，写入失败不影响主业务）
+    emit_log(audit_log, success=status == 1)
     
     return audit_log
 
@@ -243,7 +346,8 @@ def log_login(
         request: Django request 对象（可选，用于获取 IP、User-Agent 等）
         status: 登录状态（1:成功, 0:失败）
         failure_reason: 失败原因（失败时）
-        device_info: 设备信息字典（可选，包含 device, browser, os, location 等）
+        device_info: 设备信息字典（可选，包含 device, browser, os, location 等；
+            未提供的字段在写入前由审计日志写入线程根据 User-Agent 和 IP 补全，见 apps/common/enrichment.py）
     """
     # 从 request 获取信息
     ip_address = None
@@ -291,15 +395,10 @@ def log_login(
         status=status,
         failure_reason=failure_reason,
     )
+    truncate_log_fields(login_log)
     
-    # 保存日志
-    try:
-        login_log.save()
-    except Exception as e:
-        # 日志记录失败不应该影响主业务
-        import logging
-        logger = logging.getLogger('django.audit')
-        logger.error(f"Failed to save login log: {str(e)}")
+    # 提交日志（异步批量写入，写入失败不影响主业务）
+    emit_log(login_log, success=status == 1)
     
     return login_log
 
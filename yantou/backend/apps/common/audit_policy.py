@@ -0,0 +1,170 @@
+"""
+查看（GET）操作日志的记录策略
+RequestLoggingMiddleware 为每个已认证的 GET 请求记录一条 view 日志，这类日志占操作日志的绝大部分但审计价值很低。
+按路由前缀配置记录策略（AUDIT_VIEW_POLICIES，未匹配时使用 AUDIT_VIEW_DEFAULT_POLICY）：
+- full: 每次请求记录一条
+- sample:N: 按 N% 的概率记录，记录的日志 event_count 为 100/N（代表的请求数）
+- aggregate: 按 (用户, 资源类型, 资源 ID, 分钟) 累加计数，定期合并为一条日志写入，event_count 为请求次数
+
+只作用于成功的 GET 请求，创建、修改、删除和失败的请求始终逐条记录。
+"""
+import atexit
+import random
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from utils.background import PeriodicFlusher
+from .audit import get_client_ip, truncate_log_fields
+from .audit_writer import submit_log
+from .models import AuditLog
+
+POLICY_FULL = 'full'
+POLICY_SAMPLE = 'sample'
+POLICY_AGGREGATE = 'aggregate'
+
+
+def parse_view_policy(value):
+    """
+    解析记录策略
+
+    Args:
+        value: 策略字符串（full、aggregate 或 sample:N）
+
+    Returns:
+        tuple: (策略, 采样百分比)，无法解析时按 full 处理
+    """
+    mode, _sep, percent = (value or POLICY_FULL).partition(':')
+    if mode == POLICY_SAMPLE:
+        try:
+            percent = float(percent)
+        except ValueError:
+            return POLICY_FULL, 100
+        if 0 < percent < 100:
+            return POLICY_SAMPLE, percent
+        return (POLICY_FULL, 100) if percent >= 100 else (POLICY_SAMPLE, 0)
+    if mode == POLICY_AGGREGATE:
+        return POLICY_AGGREGATE, 100
+    return POLICY_FULL, 100
+
+
+def get_view_policy(path):
+    """
+    获取路径的查看日志记录策略（最长前缀匹配）
+
+    Args:
+        path: 请求路径
+
+    Returns:
+        tuple: (策略, 采样百分比)
+    """
+    policies = getattr(settings, 'AUDIT_VIEW_POLICIES', {})
+    matched = [prefix for prefix in policies if path.startswith(prefix)]
+    if matched:
+        return parse_view_policy(policies[max(matched, key=len)])
+    return parse_view_policy(getattr(settings, 'AUDIT_VIEW_DEFAULT_POLICY', POLICY_FULL))
+
+
+def should_sample(percent):
+    """按百分比决定是否记录本次请求"""
+    return random.random() * 100 < percent
+
+
+def sample_weight(percent):
+    """采样记录的日志代表的请求数"""
+    return max(1, round(100 / percent))
+
+
+class ViewAggregator:
+    """
+    查看日志聚合器
+    在进程内按 (用户, 资源类型, 资源 ID, 分钟) 累加请求次数，后台线程每隔 AUDIT_VIEW_AGGREGATE_INTERVAL 秒
+    把已结束的分钟合并为一条日志提交给 audit_writer。进程退出时提交全部计数。
+    AUDIT_VIEW_AGGREGATE_INTERVAL 为 0 时不聚合，每次请求直接提交（测试环境）。
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def add(self, request, resource_type, resource_id=None, execution_time=None):
+        """
+        累加一次查看请求
+
+        Args:
+            request: Django request 对象（已认证）
+            resource_type: 资源类型
+            resource_id: 资源 ID
+            execution_time: 执行时间（毫秒）
+        """
+        user = request.user
+        now = timezone.now()
+        minute = now.replace(second=0, microsecond=0)
+        key = (user.id, user.username, resource_type, resource_id, minute)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = {
+                    'count': 0,
+                    'execution_time': 0,
+                    'request_path': request.path,
+                    'ip_address': get_client_ip(request),
+                    'user_agent': request.META.get('HTTP_USER_AGENT', '')[:500],
+                }
+            bucket['count'] += 1
+            bucket['execution_time'] += execution_time or 0
+
+        interval = getattr(settings, 'AUDIT_VIEW_AGGREGATE_INTERVAL', 60)
+        if not interval:
+            self.flush(include_open=True)
+            return
+
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = PeriodicFlusher(self.flush, interval, name='audit-view-aggregator')
+                    # 在 PeriodicFlusher 的退出刷新之前执行（atexit 后注册先执行），提交未结束分钟的计数
+                    atexit.register(self.flush, True)
+        self._flusher.start()
+
+    def flush(self, include_open=False):
+        """
+        把计数合并为日志提交写入
+
+        Args:
+            include_open: 是否包含当前仍在进行的分钟（进程退出时）
+
+        Returns:
+            int: 提交的日志数
+        """
+        boundary = timezone.now().replace(second=0, microsecond=0)
+        if include_open:
+            boundary += timedelta(minutes=1)
+
+        with self._lock:
+            closed = {key: bucket for key, bucket in self._buckets.items() if key[-1] < boundary}
+            for key in closed:
+                del self._buckets[key]
+
+        for (user_id, username, resource_type, resource_id, minute), bucket in closed.items():
+            submit_log(truncate_log_fields(AuditLog(
+                user_id=user_id,
+                username=username,
+                action='view',
+                resource_type=resource_type,
+                resource_id=resource_id,
+                description=f"GET {bucket['request_path']}",
+                request_method='GET',
+                request_path=bucket['request_path'],
+                ip_address=bucket['ip_address'],
+                user_agent=bucket['user_agent'],
+                execution_time=bucket['execution_time'] // bucket['count'],
+                event_count=bucket['count'],
+                created_at=minute,
+            )))
+        return len(closed)
+
+
+view_aggregator = ViewAggregator()
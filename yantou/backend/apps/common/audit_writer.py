@@ -0,0 +1,398 @@
+"""
+异步审计日志写入
+log_audit、log_login 不再在请求线程中逐条 save()，而是把日志对象放入进程内的有界队列，
+由后台线程按时间间隔（AUDIT_WRITER_FLUSH_INTERVAL）或数量阈值（AUDIT_WRITER_BATCH_SIZE）批量 bulk_create，
+写入后把这批日志累加到按天汇总表（apps/common/rollups.py）。
+登录日志在写入前补全设备、浏览器、操作系统和登录地点（apps/common/enrichment.py，LOGIN_LOG_ENRICH）。
+进程退出时会写入队列中剩余的日志。
+
+队列已满时按 AUDIT_WRITER_OVERFLOW 处理：
+- drop: 丢弃日志并计数，定期输出告警
+- spill: 追加写入本进程的本地缓冲文件（apps/common/spool.py）
+
+数据库写入失败（数据库过慢、主从切换等）的日志同样写入缓冲文件，不在请求中重试。
+整批写入失败时逐条重试，数据本身有问题（违反约束、值无效）的日志写入隔离文件（<前缀>.<pid>.quarantine），
+不再回放，避免一条坏数据让整批日志反复失败、回放卡住。
+后台线程在一次刷新的全部写入都成功（数据库已恢复）后回放缓冲文件；
+已退出的进程留下的缓冲文件由 python manage.py replay_audit_spool 回放。
+
+AUDIT_WRITER_FLUSH_INTERVAL 为 0 时在当前线程同步写入（测试环境）。
+"""
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from django.apps import apps
+from django.conf import settings
+from django.db import DataError, IntegrityError, models, router, transaction
+from django.utils.dateparse import parse_datetime
+from utils.background import PeriodicFlusher
+from .enrichment import enrich_login_logs
+from .models import LoginLog
+from .rollups import update_rollups
+from .spool import QUARANTINE_SUFFIX, REPLAY_SUFFIX, SPOOL_SUFFIX, Spool, replay_file
+import logging
+
+logger = logging.getLogger('django.audit')
+
+OVERFLOW_DROP = 'drop'
+OVERFLOW_SPILL = 'spill'
+
+# 逐条写入时出现这些错误说明日志本身有问题，重试不会成功
+REJECTED_ERRORS = (IntegrityError, DataError, ValueError, TypeError)
+
+
+def serialize_log(obj: models.Model) -> str:
+    """
+    将日志对象序列化为一行 JSON（不含主键）
+
+    Args:
+        obj: 日志对象
+
+    Returns:
+        str: JSON 字符串
+    """
+    fields = {}
+    for field in obj._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        value = getattr(obj, field.attname)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        fields[field.attname] = value
+    return json.dumps({'model': obj._meta.label, 'fields': fields}, ensure_ascii=False)
+
+
+def deserialize_log(line: str) -> models.Model:
+    """
+    从一行 JSON 还原日志对象
+
+    Args:
+        line: serialize_log 生成的 JSON 字符串
+
+    Returns:
+        Model: 未保存的日志对象
+    """
+    data = json.loads(line)
+    model = apps.get_model(data['model'])
+    fields = data['fields']
+    for field in model._meta.concrete_fields:
+        if isinstance(field, models.DateTimeField) and isinstance(fields.get(field.attname), str):
+            fields[field.attname] = parse_datetime(fields[field.attname])
+    return model(**fields)
+
+
+class AuditWriter:
+    """
+    审计日志批量写入器
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._flusher = None
+        self._init_lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._spool = None
+        self._spool_pid = None
+        self.dropped = 0
+
+    def get_queue(self) -> queue.Queue:
+        """获取日志队列（首次使用时按配置创建）"""
+        if self._queue is None:
+            with self._init_lock:
+                if self._queue is None:
+                    self._queue = queue.Queue(maxsize=getattr(settings, 'AUDIT_WRITER_QUEUE_SIZE', 10000))
+        return self._queue
+
+    def submit(self, obj: models.Model):
+        """
+        提交日志对象
+
+        Args:
+            obj: 未保存的 AuditLog 或 LoginLog 对象
+        """
+        interval = getattr(settings, 'AUDIT_WRITER_FLUSH_INTERVAL', 1)
+        if not interval:
+            self.save_or_spill([obj])
+            return
+
+        if self._flusher is None:
+            with self._init_lock:
+                if self._flusher is None:
+                    self._flusher = PeriodicFlusher(self.flush, interval, name='audit-writer')
+        self._flusher.start()
+
+        log_queue = self.get_queue()
+        try:
+            log_queue.put_nowait(obj)
+        except queue.Full:
+            self.overflow(obj)
+            return
+
+        if log_queue.qsize() >= getattr(settings, 'AUDIT_WRITER_BATCH_SIZE', 500):
+            self._flusher.wake()
+
+    def overflow(self, obj: models.Model):
+        """队列已满时按溢出策略处理日志"""
+        if getattr(settings, 'AUDIT_WRITER_OVERFLOW', OVERFLOW_DROP) == OVERFLOW_SPILL and self.spill([obj]):
+            return
+
+        self.drop(1)
+
+    def drop(self, count: int):
+        """丢弃日志并计数"""
+        before = self.dropped
+        self.dropped += count
+        # 每丢弃 1000 条输出一次告警，避免告警本身拖慢请求
+        if before == 0 or before // 1000 != self.dropped // 1000:
+            logger.warning(f"Audit log queue full, {self.dropped} logs dropped so far")
+
+    def write(self, objs) -> list:
+        """
+        按模型分组批量写入数据库
+
+        Args:
+            objs: 日志对象列表
+
+        Returns:
+            list: 写入失败（数据库不可用）的日志对象，不含已写入隔离文件的日志
+        """
+        grouped = {}
+        for obj in objs:
+            grouped.setdefault(type(obj), []).append(obj)
+
+        failed = []
+        for model, items in grouped.items():
+            if model is LoginLog and getattr(settings, 'LOGIN_LOG_ENRICH', True):
+                self.enrich(items)
+            written, model_failed = self.bulk_write(model, items)
+            failed.extend(model_failed)
+            if not written:
+                continue
+
+            try:
+                update_rollups(model, written)
+            except Exception as e:
+                # 日志已写入，汇总失败时不重试（可用 rebuild_log_rollups 重建）
+                logger.error(f"Failed to update rollups for {len(written)} {model.__name__} records: {str(e)}")
+        return failed
+
+    def bulk_write(self, model, items) -> tuple:
+        """
+        批量写入一种日志，整批失败时逐条重试，找出有问题的日志写入隔离文件
+
+        Args:
+            model: 日志模型
+            items: 日志对象列表
+
+        Returns:
+            tuple: (写入成功的日志, 写入失败的日志)
+        """
+        using = router.db_for_write(model)
+        try:
+            # 在保存点中写入，失败时不影响外层事务，可以继续逐条重试
+            with transaction.atomic(using=using):
+                model.objects.bulk_create(items, batch_size=getattr(settings, 'AUDIT_WRITER_BATCH_SIZE', 500))
+            return items, []
+        except Exception as e:
+            # 日志写入失败不应该影响主业务
+            logger.error(f"Failed to save {len(items)} {model.__name__} records: {str(e)}")
+
+        written = []
+        rejected = []
+        for index, obj in enumerate(items):
+            # 整批回滚后，已分配的主键无效
+            obj.pk = None
+            try:
+                with transaction.atomic(using=using):
+                    model.objects.bulk_create([obj])
+            except REJECTED_ERRORS as e:
+                logger.error(f"Rejected {model.__name__} record: {str(e)}")
+                rejected.append(obj)
+            except Exception:
+                # 数据库不可用，剩余的日志不再逐条重试
+                self.quarantine(rejected)
+                return written, items[index:]
+            else:
+                written.append(obj)
+        self.quarantine(rejected)
+        return written, []
+
+    def quarantine(self, objs):
+        """
+        有问题的日志写入隔离文件（不回放，排查后可手动处理）
+
+        Args:
+            objs: 日志对象列表
+        """
+        if not objs:
+            return
+        path = self.get_spool_path(QUARANTINE_SUFFIX)
+        spool = Spool(path, fsync=getattr(settings, 'AUDIT_WRITER_SPOOL_FSYNC', False))
+        try:
+            spool.append([serialize_log(obj) for obj in objs])
+            logger.error(f"Quarantined {len(objs)} audit logs rejected by the database to {path}")
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Failed to quarantine {len(objs)} audit logs: {str(e)}")
+            self.drop(len(objs))
+        finally:
+            spool.close()
+
+    def enrich(self, objs):
+        """补全登录日志（失败时照常写入未补全的日志）"""
+        try:
+            enrich_login_logs(objs)
+        except Exception as e:
+            logger.error(f"Failed to enrich {len(objs)} login logs: {str(e)}")
+
+    def save_or_spill(self, objs) -> int:
+        """
+        写入数据库，失败的日志写入缓冲文件
+
+        Args:
+            objs: 日志对象列表
+
+        Returns:
+            int: 写入数据库的日志数
+        """
+        failed = self.write(objs)
+        if failed and not self.spill(failed):
+            self.drop(len(failed))
+        return len(objs) - len(failed)
+
+    def flush(self) -> int:
+        """
+        写入队列中的全部日志，全部写入成功（数据库可用）时回放缓冲文件
+
+        Returns:
+            int: 写入的日志数
+        """
+        batch_size = getattr(settings, 'AUDIT_WRITER_BATCH_SIZE', 500)
+        log_queue = self.get_queue()
+        written = 0
+        healthy = True
+        with self._flush_lock:
+            while True:
+                batch = []
+                try:
+                    while len(batch) < batch_size:
+                        batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    pass
+                if not batch:
+                    break
+                count = self.save_or_spill(batch)
+                healthy = healthy and count == len(batch)
+                written += count
+
+            if healthy:
+                written += self.replay_spill()
+        return written
+
+    def get_spool_base(self) -> str:
+        """获取缓冲文件路径前缀"""
+        return getattr(settings, 'AUDIT_WRITER_SPOOL_PATH', None) or os.path.join(str(settings.BASE_DIR), 'logs', 'audit_spool')
+
+    def get_spool_path(self, suffix: str = SPOOL_SUFFIX, pid: int = None) -> str:
+        """获取缓冲文件路径（按进程区分，避免多个 worker 同时写入）"""
+        return f'{self.get_spool_base()}.{pid or os.getpid()}{suffix}'
+
+    def get_spool(self) -> Spool:
+        """获取本进程的缓冲文件（fork 后的子进程使用自己的文件）"""
+        pid = os.getpid()
+        if self._spool is None or self._spool_pid != pid:
+            with self._spool_lock:
+                if self._spool is None or self._spool_pid != pid:
+                    self._spool = Spool(self.get_spool_path(), fsync=getattr(settings, 'AUDIT_WRITER_SPOOL_FSYNC', False))
+                    self._spool_pid = pid
+        return self._spool
+
+    def spill(self, objs) -> bool:
+        """
+        追加写入缓冲文件
+
+        Args:
+            objs: 日志对象列表
+
+        Returns:
+            bool: 是否写入成功
+        """
+        try:
+            self.get_spool().append([serialize_log(obj) for obj in objs])
+            return True
+        except OSError as e:
+            logger.error(f"Failed to spool {len(objs)} audit logs: {str(e)}")
+            return False
+
+    def write_payloads(self, payloads) -> bool:
+        """
+        回放时写入一批缓冲记录
+
+        Args:
+            payloads: 日志 JSON 列表
+
+        Returns:
+            bool: False 表示数据库仍不可用（整批未写入，稍后从该批重新回放）；
+                有问题的日志已写入隔离文件，不会使回放停在该批
+        """
+        objs = []
+        for payload in payloads:
+            try:
+                objs.append(deserialize_log(payload))
+            except (ValueError, LookupError, TypeError) as e:
+                logger.error(f"Skipping invalid spooled audit log: {str(e)}")
+        failed = self.write(objs)
+        if failed and len(failed) == len(objs):
+            return False
+        # 部分写入成功时，失败的日志重新写入缓冲文件，回放继续向后推进
+        if failed and not self.spill(failed):
+            self.drop(len(failed))
+        return True
+
+    def replay(self, replay_path: str) -> int:
+        """
+        回放一个回放文件
+
+        Args:
+            replay_path: 回放文件路径
+
+        Returns:
+            int: 写入的日志数
+        """
+        written, _completed = replay_file(
+            replay_path, self.write_payloads, getattr(settings, 'AUDIT_WRITER_BATCH_SIZE', 500)
+        )
+        return written
+
+    def replay_spill(self) -> int:
+        """
+        回放本进程的缓冲文件
+
+        Returns:
+            int: 写入的日志数
+        """
+        replay_path = self.get_spool_path(REPLAY_SUFFIX)
+        written = 0
+        # 先继续上次未完成的回放，完成后才把当前缓冲文件改名回放，回放期间新的日志写入新文件
+        if os.path.exists(replay_path):
+            written += self.replay(replay_path)
+            if os.path.exists(replay_path):
+                return written
+        if self.get_spool().rotate(replay_path):
+            written += self.replay(replay_path)
+        return written
+
+
+audit_writer = AuditWriter()
+
+
+def submit_log(obj: models.Model):
+    """
+    提交审计日志（异步批量写入）
+
+    Args:
+        obj: 未保存的 AuditLog 或 LoginLog 对象
+    """
+    audit_writer.submit(obj)
@@ -0,0 +1,99 @@
+"""
+登录日志补全
+登录请求只记录 IP 和 User-Agent，设备类型、浏览器、操作系统、登录地点在写入前由审计日志写入线程批量补全，
+不在登录请求中解析：
+- User-Agent 由 utils/user_agent.py 解析（LRU 缓存）
+- 登录地点从离线 IP 地址库（utils/ip_database.py，python manage.py build_ip_database 编译）查询；
+  地址库文件不存在时不补全地点
+
+已写入数据库的历史记录用 python manage.py enrich_login_logs 补全。
+"""
+import os
+import threading
+from typing import Iterable, Optional
+from django.conf import settings
+from utils.ip_database import IPDatabase
+from utils.user_agent import parse_user_agent
+import logging
+
+logger = logging.getLogger('django.audit')
+
+ENRICH_FIELDS = ('device', 'browser', 'os', 'location')
+
+_database = None
+_database_key = None
+_database_lock = threading.Lock()
+
+
+def get_ip_database_path() -> str:
+    """获取 IP 地址库文件路径"""
+    return getattr(settings, 'IP_DATABASE_PATH', None) or os.path.join(str(settings.BASE_DIR), 'data', 'ip_location.db')
+
+
+def get_ip_database() -> Optional[IPDatabase]:
+    """
+    获取 IP 地址库（文件被重新编译后自动重新打开）
+
+    Returns:
+        IPDatabase: 地址库文件不存在或无效时返回 None
+    """
+    global _database, _database_key
+    path = get_ip_database_path()
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        return None
+    if key != _database_key:
+        with _database_lock:
+            if key != _database_key:
+                try:
+                    database = IPDatabase(path)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Failed to open IP database {path}: {str(e)}")
+                    return None
+                # 旧的映射不关闭，可能仍有线程在查询，随对象回收释放
+                _database, _database_key = database, key
+    return _database
+
+
+def enrich_login_log(obj, database: IPDatabase = None, overwrite: bool = False) -> bool:
+    """
+    补全一条登录日志的设备、浏览器、操作系统和登录地点
+
+    Args:
+        obj: LoginLog 对象
+        database: IP 地址库
+        overwrite: 是否覆盖已有的值
+
+    Returns:
+        bool: 是否有字段被修改
+    """
+    values = dict(parse_user_agent(obj.user_agent or ''))
+    if database is not None and obj.ip_address:
+        values['location'] = database.lookup(obj.ip_address)
+
+    changed = False
+    for field, value in values.items():
+        if value is None or (getattr(obj, field) and not overwrite):
+            continue
+        max_length = type(obj)._meta.get_field(field).max_length
+        value = value[:max_length]
+        if getattr(obj, field) != value:
+            setattr(obj, field, value)
+            changed = True
+    return changed
+
+
+def enrich_login_logs(objs: Iterable, overwrite: bool = False) -> list:
+    """
+    批量补全登录日志
+
+    Args:
+        objs: LoginLog 对象
+        overwrite: 是否覆盖已有的值
+
+    Returns:
+        list: 被修改的对象
+    """
+    database = get_ip_database()
+    return [obj for obj in objs if enrich_login_log(obj, database, overwrite)]
@@ -0,0 +1,145 @@
+"""
+日志流式导出
+按服务端游标（QuerySet.iterator(chunk_size=...)）逐批读取 AuditLog、LoginLog，
+边读边写为 CSV 或 NDJSON（每行一个 JSON 对象），可选实时 gzip 压缩。
+用户名、请求路径等字段来自客户端，CSV 中以公式字符开头的文本加 ' 前缀，用表格软件打开时不会作为公式执行。
+内存占用只与 chunk_size 有关，与导出的总行数无关。
+
+查询接口的 StreamingHttpResponse 和 export_logs 管理命令共用这里的生成器。
+"""
+import csv
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator, List
+from django.conf import settings
+from django.db import models
+
+FORMAT_CSV = 'csv'
+FORMAT_NDJSON = 'ndjson'
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_NDJSON)
+
+CONTENT_TYPES = {
+    FORMAT_CSV: 'text/csv; charset=utf-8',
+    FORMAT_NDJSON: 'application/x-ndjson',
+}
+
+# 表格软件会把以这些字符开头的单元格当作公式
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# 累积到该大小再输出一块，避免每行一次 write / 一次压缩调用
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+
+class _LineBuffer:
+    """csv.writer 的写入目标，直接返回写入的内容而不保存"""
+
+    def write(self, value):
+        return value
+
+
+def get_export_fields(model) -> List[str]:
+    """获取导出的字段（模型的全部数据库字段）"""
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def iter_rows(queryset: models.QuerySet, fields: List[str], chunk_size: int = None) -> Iterator[tuple]:
+    """
+    按服务端游标逐批读取记录
+
+    Args:
+        queryset: 查询集
+        fields: 字段列表
+        chunk_size: 每批读取的行数（默认 LOG_EXPORT_CHUNK_SIZE）
+
+    Returns:
+        Iterator: 字段值元组
+    """
+    chunk_size = chunk_size or getattr(settings, 'LOG_EXPORT_CHUNK_SIZE', 2000)
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def to_json_value(value):
+    """转换为可 JSON 序列化的值（日期时间转为 ISO 格式）"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def to_csv_value(value):
+    """转换为 CSV 单元格的值（以公式字符开头的文本加 ' 前缀，防止公式注入）"""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return to_json_value(value)
+
+
+def iter_csv(rows: Iterable[tuple], fields: List[str]) -> Iterator[str]:
+    """逐行生成 CSV（首行为表头）"""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([to_csv_value(value) for value in row])
+
+
+def iter_ndjson(rows: Iterable[tuple], fields: List[str]) -> Iterator[str]:
+    """逐行生成 NDJSON"""
+    for row in rows:
+        record = {field: to_json_value(value) for field, value in zip(fields, row)}
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def iter_chunks(lines: Iterable[str], buffer_size: int = OUTPUT_BUFFER_SIZE) -> Iterator[bytes]:
+    """把逐行内容合并为较大的字节块"""
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """实时 gzip 压缩"""
+    # wbits=31 输出带 gzip 头和校验的格式
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(queryset: models.QuerySet, export_format: str = FORMAT_CSV, compress: bool = False,
+                  chunk_size: int = None) -> Iterator[bytes]:
+    """
+    流式导出查询集
+
+    Args:
+        queryset: 查询集
+        export_format: 导出格式（csv 或 ndjson）
+        compress: 是否 gzip 压缩
+        chunk_size: 每批读取的行数
+
+    Returns:
+        Iterator: 导出内容的字节块
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format: {export_format}')
+
+    fields = get_export_fields(queryset.model)
+    rows = iter_rows(queryset, fields, chunk_size)
+    lines = iter_csv(rows, fields) if export_format == FORMAT_CSV else iter_ndjson(rows, fields)
+    chunks = iter_chunks(lines)
+    return iter_gzip(chunks) if compress else chunks
+
+
+def get_export_filename(basename: str, export_format: str, compress: bool = False) -> str:
+    """获取导出文件名"""
+    filename = f'{basename}.{export_format}'
+    return f'{filename}.gz' if compress else filename
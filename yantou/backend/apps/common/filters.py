@@ -5,6 +5,9 @@
 import django_filters
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from .exceptions import ValidationException
+from .models import AuditLog, LoginLog
+from .search import SEARCH_MIN_LENGTH, search_audit_logs
 
 
 class BaseFilterSet(django_filters.FilterSet):
@@ -224,3 +227,40 @@ class CommonFilters:
     updated_at__gt = django_filters.DateTimeFilter(field_name='updated_at', lookup_expr='gt', help_text=_('更新时间 >'))
     updated_at__lt = django_filters.DateTimeFilter(field_name='updated_at', lookup_expr='lt', help_text=_('更新时间 <'))
 
+
+
+class AuditLogFilter(django_filters.FilterSet):
+    """
+    操作日志过滤器
+    等值条件和时间范围均可由 (字段, created_at, id) 组合索引的范围扫描完成；
+    关键字检索（q）使用三元组索引（见 apps/common/search.py），不使用逐字段的 icontains
+    """
+    created_at_start = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte', help_text=_('创建时间开始'))
+    created_at_end = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt', help_text=_('创建时间结束（不含）'))
+    q = django_filters.CharFilter(method='filter_q', help_text=_('在操作描述、请求路径、资源名称、请求参数中检索关键字'))
+
+    class Meta:
+        model = AuditLog
+        fields = ['user_id', 'username', 'action', 'resource_type', 'resource_id', 'status', 'ip_address']
+
+    def filter_q(self, queryset, name, value):
+        """关键字检索"""
+        value = value.strip()
+        if not value:
+            return queryset
+        if len(value) < SEARCH_MIN_LENGTH:
+            raise ValidationException(_('检索关键字至少 {count} 个字符').format(count=SEARCH_MIN_LENGTH))
+        return search_audit_logs(queryset, value)
+
+
+class LoginLogFilter(django_filters.FilterSet):
+    """
+    登录日志过滤器
+    只提供等值条件和时间范围，均可由 (字段, created_at, id) 组合索引的范围扫描完成，不提供模糊搜索
+    """
+    created_at_start = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte', help_text=_('登录时间开始'))
+    created_at_end = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt', help_text=_('登录时间结束（不含）'))
+
+    class Meta:
+        model = LoginLog
+        fields = ['user_id', 'username', 'login_type', 'status', 'ip_address']
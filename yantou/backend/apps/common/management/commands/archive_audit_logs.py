@@ -0,0 +1,31 @@
+"""
+操作日志冷归档的管理命令
+把早于指定月数的整月操作日志写入归档目录（按月分块压缩的 NDJSON 和索引），然后从数据库删除
+
+建议每月运行一次，例如：
+    0 4 1 * * python manage.py archive_audit_logs
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.common.archive import archive_old_logs, get_archive_dir
+
+
+class Command(BaseCommand):
+    help = '把早于指定月数的操作日志归档到压缩文件并从数据库删除'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=getattr(settings, 'AUDIT_ARCHIVE_AFTER_MONTHS', 6),
+            help='数据库中保留的月数，更早的整月数据归档'
+        )
+        parser.add_argument('--archive-dir', default=None, help='归档目录（默认 AUDIT_ARCHIVE_DIR）')
+        parser.add_argument('--keep', action='store_true', help='归档后不从数据库删除（用于试运行；再次归档同一月份会生成重复的分片）')
+
+    def handle(self, *args, **options):
+        archive_dir = options['archive_dir'] or get_archive_dir()
+        result = archive_old_logs(options['months'], archive_dir, delete=not options['keep'])
+        for month, count in result.items():
+            self.stdout.write(f'- {month}: 归档 {count} 条')
+        self.stdout.write(self.style.SUCCESS(f'✓ 归档完成：共 {sum(result.values())} 条，目录 {archive_dir}'))
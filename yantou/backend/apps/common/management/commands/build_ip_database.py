@@ -0,0 +1,44 @@
+"""
+编译离线 IP 地址库的管理命令
+输入为文本区间表，每行: 起始 IP、结束 IP、地点字段（点分或整数形式的 IPv4 地址），其余列拼接为地点，
+空值和 0 占位的列忽略。例如 ip2region 的源数据：
+    1.0.1.0|1.0.3.255|中国|0|福建省|福州市|电信
+
+    python manage.py build_ip_database ip.merge.txt --delimiter '|'
+
+输出文件默认为 IP_DATABASE_PATH，替换后运行中的进程在下次补全时自动使用新文件。
+"""
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from apps.common.enrichment import get_ip_database_path
+from utils.ip_database import build_database, parse_ip
+
+
+class Command(BaseCommand):
+    help = '把 IP 区间表编译为离线 IP 地址库'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='区间表文件（UTF-8）')
+        parser.add_argument('--delimiter', default=',', help='列分隔符（默认逗号）')
+        parser.add_argument('-o', '--output', default=None, help='输出文件路径（默认 IP_DATABASE_PATH）')
+
+    def handle(self, *args, **options):
+        output = options['output'] or get_ip_database_path()
+        with open(options['source'], 'r', encoding='utf-8', newline='') as f:
+            count = build_database(self.iter_ranges(f, options['delimiter']), output)
+        self.stdout.write(self.style.SUCCESS(f'已编译 {count} 个区间: {output}'))
+
+    def iter_ranges(self, f, delimiter):
+        """逐行解析区间"""
+        for line_number, row in enumerate(csv.reader(f, delimiter=delimiter), 1):
+            if not row or row[0].startswith('#'):
+                continue
+            if len(row) < 3:
+                raise CommandError(f'第 {line_number} 行格式错误: {delimiter.join(row)}')
+            try:
+                start, end = parse_ip(row[0]), parse_ip(row[1])
+            except ValueError as e:
+                raise CommandError(f'第 {line_number} 行: {e}')
+            location = ' '.join(value.strip() for value in row[2:] if value.strip() not in ('', '0'))
+            if location:
+                yield start, end, location
@@ -0,0 +1,60 @@
+"""
+补全历史登录日志的管理命令
+按主键顺序分批读取设备、浏览器、操作系统或登录地点为空的登录日志，解析 User-Agent、查询离线 IP 地址库后批量更新。
+新写入的登录日志由审计日志写入线程自动补全，本命令只用于启用补全之前的数据或更新地址库之后重新补全（--overwrite）。
+
+    python manage.py enrich_login_logs --start 2026-09-01
+"""
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from apps.common.enrichment import ENRICH_FIELDS, enrich_login_logs, get_ip_database
+from apps.common.models import LoginLog
+from apps.common.management.commands.export_logs import parse_time
+
+
+class Command(BaseCommand):
+    help = '补全历史登录日志的设备、浏览器、操作系统和登录地点'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='登录时间开始（含），如 2026-09-01')
+        parser.add_argument('--end', help='登录时间结束（不含）')
+        parser.add_argument('--overwrite', action='store_true', help='覆盖已有的值（默认只补全空字段）')
+        parser.add_argument('--batch-size', type=int, default=None, help='每批更新的记录数')
+        parser.add_argument('--sleep', type=float, default=None, help='批次之间的休眠时间（秒）')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or getattr(settings, 'PURGE_BATCH_SIZE', 1000)
+        sleep = options['sleep'] if options['sleep'] is not None else getattr(settings, 'PURGE_BATCH_SLEEP', 0.1)
+        if get_ip_database() is None:
+            self.stdout.write(self.style.WARNING('IP 地址库不存在，只补全设备、浏览器和操作系统'))
+
+        queryset = LoginLog.objects.all()
+        if options['start']:
+            queryset = queryset.filter(created_at__gte=parse_time(options['start']))
+        if options['end']:
+            queryset = queryset.filter(created_at__lt=parse_time(options['end']))
+        if not options['overwrite']:
+            empty = Q()
+            for field in ENRICH_FIELDS:
+                empty |= Q(**{f'{field}__isnull': True})
+            queryset = queryset.filter(empty)
+
+        last_id = 0
+        scanned = updated = 0
+        while True:
+            # 按主键推进，补全后仍为空的记录（如地址库中没有的 IP）不会被重复读取
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            changed = enrich_login_logs(batch, overwrite=options['overwrite'])
+            if changed:
+                LoginLog.objects.bulk_update(changed, ENRICH_FIELDS)
+            scanned += len(batch)
+            updated += len(changed)
+            if sleep:
+                time.sleep(sleep)
+
+        self.stdout.write(self.style.SUCCESS(f'检查 {scanned} 条登录日志，更新 {updated} 条'))
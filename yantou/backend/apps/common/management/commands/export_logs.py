@@ -0,0 +1,70 @@
+"""
+日志流式导出的管理命令
+按时间范围把操作日志或登录日志导出为 CSV / NDJSON 文件，可选 gzip 压缩，内存占用与导出行数无关
+
+例如导出 2026 年 9 月的操作日志：
+    python manage.py export_logs audit_logs --start 2026-09-01 --end 2026-10-01 --gzip -o audit_202609.csv.gz
+"""
+import sys
+from datetime import datetime, time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from apps.common.export import EXPORT_FORMATS, FORMAT_CSV, stream_export
+from apps.common.models import AuditLog, LoginLog
+
+TARGETS = {
+    'audit_logs': AuditLog,
+    'login_logs': LoginLog,
+}
+
+
+def parse_time(value):
+    """解析日期或时间（日期取当天零点，无时区时按当前时区）"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'无法解析时间: {value}')
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = '流式导出操作日志或登录日志（CSV / NDJSON，可选 gzip 压缩）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', choices=sorted(TARGETS), help='导出的日志')
+        parser.add_argument('--format', dest='export_format', choices=EXPORT_FORMATS, default=FORMAT_CSV, help='导出格式')
+        parser.add_argument('--gzip', action='store_true', help='gzip 压缩')
+        parser.add_argument('--start', help='开始时间（含），如 2026-09-01')
+        parser.add_argument('--end', help='结束时间（不含），如 2026-10-01')
+        parser.add_argument('--chunk-size', type=int, default=None, help='服务端游标每批读取的行数')
+        parser.add_argument('-o', '--output', default='-', help='输出文件路径（默认标准输出）')
+
+    def handle(self, *args, **options):
+        queryset = TARGETS[options['target']].objects.order_by('created_at', 'id')
+        if options['start']:
+            queryset = queryset.filter(created_at__gte=parse_time(options['start']))
+        if options['end']:
+            queryset = queryset.filter(created_at__lt=parse_time(options['end']))
+
+        chunks = stream_export(queryset, options['export_format'], options['gzip'], options['chunk_size'])
+        if options['output'] == '-':
+            self.write_chunks(chunks, sys.stdout.buffer)
+            return
+
+        with open(options['output'], 'wb') as f:
+            size = self.write_chunks(chunks, f)
+        self.stderr.write(self.style.SUCCESS(f"已导出到 {options['output']}（{size} 字节）"))
+
+    def write_chunks(self, chunks, f):
+        """写入导出内容，返回写入的字节数"""
+        size = 0
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+        f.flush()
+        return size
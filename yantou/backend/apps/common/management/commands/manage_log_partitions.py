@@ -0,0 +1,78 @@
+"""
+日志表分区维护的管理命令（仅 PostgreSQL）
+创建当月及未来若干个月的分区，并按保留天数分离、删除整月过期的分区
+
+建议每天运行一次，例如：
+    0 2 * * * python manage.py manage_log_partitions --drop
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.common.partitions import PARTITIONED_TABLES, drop_partitions_before, ensure_partitions, is_supported
+
+RETENTION_SETTINGS = {
+    'sys_audit_log': ('AUDIT_LOG_RETENTION_DAYS', 180),
+    'sys_login_log': ('LOGIN_LOG_RETENTION_DAYS', 90),
+}
+
+
+def get_retention_cutoff(table, now=None):
+    """
+    获取日志表的保留截止时间
+
+    Returns:
+        datetime: 截止时间，未配置保留天数或由归档负责删除时返回 None
+    """
+    # 启用操作日志归档时由 archive_audit_logs 归档后删除，不按保留天数删除分区
+    if table == 'sys_audit_log' and getattr(settings, 'AUDIT_ARCHIVE_ENABLED', False):
+        return None
+    name, default = RETENTION_SETTINGS[table]
+    days = getattr(settings, name, default)
+    if not days:
+        return None
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+class Command(BaseCommand):
+    help = '维护日志表的按月分区（创建未来分区、删除过期分区）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=getattr(settings, 'LOG_PARTITION_MONTHS_AHEAD', 3),
+            help='提前创建的月数'
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='按保留天数删除整月过期的分区'
+        )
+        parser.add_argument(
+            '--detach-only',
+            action='store_true',
+            help='过期分区只分离不删除（分离后的表可归档后手动删除）'
+        )
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            self.stdout.write(self.style.WARNING('当前数据库不是 PostgreSQL，跳过分区维护'))
+            return
+
+        for table in PARTITIONED_TABLES:
+            created = ensure_partitions(table, options['months_ahead'])
+            for name in created:
+                self.stdout.write(f'  ✓ 创建分区: {name}')
+
+            if not options['drop']:
+                continue
+            cutoff = get_retention_cutoff(table)
+            if cutoff is None:
+                continue
+            removed = drop_partitions_before(table, cutoff, detach_only=options['detach_only'])
+            action = '分离分区' if options['detach_only'] else '删除分区'
+            for name in removed:
+                self.stdout.write(f'  ✓ {action}: {name}')
+
+        self.stdout.write(self.style.SUCCESS('✓ 分区维护完成'))
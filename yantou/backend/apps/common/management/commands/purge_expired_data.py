@@ -0,0 +1,181 @@
+"""
+清理过期数据的管理命令
+删除已过期的 JWT Token 记录（token_blacklist 表），并按保留天数清理登录日志和操作日志
+（启用操作日志归档 AUDIT_ARCHIVE_ENABLED 时操作日志由 archive_audit_logs 归档后删除，这里不清理）
+
+按主键范围分批删除：每批先按主键顺序找到第 batch-size 条待删除记录的主键，
+再删除 (上一批终点, 该主键] 范围内符合条件的记录，每批单独提交事务，批次之间可休眠以降低主从复制延迟，
+不会长时间锁表。每批完成后将进度写入缓存，中断后再次运行会从上次的位置继续。
+日志表在 PostgreSQL 上已按月分区时，先整块删除全部过期的分区，再逐批删除剩余的过期记录。
+
+可作为定时任务运行，例如：
+    0 3 * * * python manage.py purge_expired_data
+"""
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from apps.common.models import AuditLog, LoginLog
+from apps.common.partitions import drop_partitions_before
+
+CHECKPOINT_TIMEOUT = 86400 * 7
+
+# 清理顺序：先删除黑名单记录，再删除其引用的 Token 记录
+TARGETS = ['blacklisted_tokens', 'outstanding_tokens', 'login_logs', 'audit_logs']
+
+
+def get_checkpoint_key(target: str) -> str:
+    """获取清理进度的缓存键"""
+    return f'purge_expired_data:{target}'
+
+
+class Command(BaseCommand):
+    help = '分批清理过期 Token 记录和超过保留期的日志'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--targets',
+            nargs='+',
+            choices=TARGETS,
+            default=TARGETS,
+            help='要清理的数据（默认全部）'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'PURGE_BATCH_SIZE', 1000),
+            help='每批删除的记录数'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=getattr(settings, 'PURGE_BATCH_SLEEP', 0.1),
+            help='批次之间的休眠时间（秒）'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='忽略上次中断的进度，从头开始'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='只统计待删除的记录数，不删除'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        total_deleted = 0
+        started = time.monotonic()
+
+        for target in options['targets']:
+            if target == 'audit_logs' and getattr(settings, 'AUDIT_ARCHIVE_ENABLED', False):
+                self.stdout.write(f'- {target}: 已启用归档，由 archive_audit_logs 归档后删除，跳过')
+                continue
+
+            cutoff = self.get_cutoff(target, now)
+            if cutoff is None:
+                self.stdout.write(f'- {target}: 未配置保留天数，跳过')
+                continue
+
+            if options['dry_run']:
+                self.stdout.write(f'- {target}: 待删除 {self.get_expired(target, cutoff).count()} 条')
+                continue
+
+            if target in ('login_logs', 'audit_logs'):
+                table = self.get_expired(target, cutoff).model._meta.db_table
+                for name in drop_partitions_before(table, cutoff):
+                    self.stdout.write(f'- {target}: 删除分区 {name}')
+
+            total_deleted += self.purge(target, cutoff, options['batch_size'], options['sleep'], options['restart'])
+
+        if not options['dry_run']:
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ 清理完成：共删除 {total_deleted} 条记录，耗时 {elapsed:.1f} 秒'
+            ))
+
+    def get_cutoff(self, target, now):
+        """
+        获取截止时间（早于该时间的记录将被删除）
+
+        Returns:
+            datetime: 截止时间，未配置保留天数时返回 None
+        """
+        if target in ('blacklisted_tokens', 'outstanding_tokens'):
+            return now
+
+        if target == 'login_logs':
+            days = getattr(settings, 'LOGIN_LOG_RETENTION_DAYS', 90)
+        else:
+            days = getattr(settings, 'AUDIT_LOG_RETENTION_DAYS', 180)
+        return now - timedelta(days=days) if days else None
+
+    def get_expired(self, target, cutoff):
+        """获取待删除记录的查询集"""
+        if target == 'blacklisted_tokens':
+            return BlacklistedToken.objects.filter(token__expires_at__lt=cutoff)
+        if target == 'outstanding_tokens':
+            return OutstandingToken.objects.filter(expires_at__lt=cutoff)
+        model = LoginLog if target == 'login_logs' else AuditLog
+        return model.objects.filter(created_at__lt=cutoff)
+
+    def purge(self, target, cutoff, batch_size, sleep, restart) -> int:
+        """
+        按主键范围分批删除
+
+        Returns:
+            int: 删除的记录数
+        """
+        checkpoint_key = get_checkpoint_key(target)
+        checkpoint = None if restart else cache.get(checkpoint_key)
+        cursor = 0
+        if checkpoint:
+            # 继续上次中断的清理，沿用当时的截止时间，保证已扫描范围内的记录都已删除
+            cursor = checkpoint['cursor']
+            cutoff = parse_datetime(checkpoint['cutoff'])
+            self.stdout.write(f'- {target}: 从主键 {cursor} 继续')
+
+        expired = self.get_expired(target, cutoff)
+        label = expired.model._meta.label
+        deleted = 0
+        started = time.monotonic()
+
+        while True:
+            # 本批的主键上界：按主键顺序第 batch_size 条待删除记录，不足一批时删除剩余全部
+            bound = list(expired.filter(pk__gt=cursor).order_by('pk').values_list('pk', flat=True)[batch_size - 1:batch_size])
+            upper = bound[0] if bound else None
+            batch = expired.filter(pk__gt=cursor)
+            if upper is not None:
+                batch = batch.filter(pk__lte=upper)
+
+            with transaction.atomic():
+                # delete() 返回的数量包含级联删除的关联记录，只统计本表
+                batch_deleted = batch.delete()[1].get(label, 0)
+            deleted += batch_deleted
+
+            if upper is None:
+                break
+
+            cursor = upper
+            cache.set(checkpoint_key, {'cursor': cursor, 'cutoff': cutoff.isoformat()}, timeout=CHECKPOINT_TIMEOUT)
+            self.report(target, deleted, started, cursor)
+            if sleep:
+                time.sleep(sleep)
+
+        cache.delete(checkpoint_key)
+        elapsed = time.monotonic() - started
+        rate = deleted / elapsed if elapsed else deleted
+        self.stdout.write(f'- {target}: 删除 {deleted} 条（{rate:.0f} 条/秒）')
+        return deleted
+
+    def report(self, target, deleted, started, cursor):
+        """输出当前进度"""
+        elapsed = time.monotonic() - started
+        rate = deleted / elapsed if elapsed else deleted
+        self.stdout.write(f'  {target}: 已删除 {deleted} 条，主键 ≤ {cursor}（{rate:.0f} 条/秒）')
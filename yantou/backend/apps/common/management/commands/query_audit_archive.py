@@ -0,0 +1,38 @@
+"""
+查询归档操作日志的管理命令
+按时间范围、用户、操作类型、资源类型查询已归档的操作日志，结果按 NDJSON 输出到标准输出
+
+例如查询用户 42 在 2025 年 3 月的删除操作：
+    python manage.py query_audit_archive --start 2025-03-01 --end 2025-04-01 --user-id 42 --action delete
+"""
+import json
+from django.core.management.base import BaseCommand
+from apps.common.archive import search_archive
+from apps.common.management.commands.export_logs import parse_time
+
+
+class Command(BaseCommand):
+    help = '查询归档的操作日志（NDJSON 输出）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='开始时间（含），如 2025-03-01')
+        parser.add_argument('--end', help='结束时间（不含），如 2025-04-01')
+        parser.add_argument('--user-id', type=int, default=None, help='用户 ID')
+        parser.add_argument('--action', default=None, help='操作类型')
+        parser.add_argument('--resource-type', default=None, help='资源类型')
+        parser.add_argument('--limit', type=int, default=None, help='最多输出的条数')
+        parser.add_argument('--archive-dir', default=None, help='归档目录（默认 AUDIT_ARCHIVE_DIR）')
+
+    def handle(self, *args, **options):
+        records = search_archive(
+            start=parse_time(options['start']) if options['start'] else None,
+            end=parse_time(options['end']) if options['end'] else None,
+            user_id=options['user_id'],
+            action=options['action'],
+            resource_type=options['resource_type'],
+            archive_dir=options['archive_dir'],
+        )
+        for count, record in enumerate(records, 1):
+            self.stdout.write(json.dumps(record, ensure_ascii=False))
+            if options['limit'] and count >= options['limit']:
+                break
@@ -0,0 +1,59 @@
+"""
+重建日志按天汇总的管理命令
+汇总表由审计日志写入器增量维护，上线前的历史日志或汇总出错的日期可用本命令从日志表重建：
+逐天删除汇总后重新累加。重建不与写入器协调，最近 REBUILD_HORIZON_DAYS 天（含今天）的日志可能仍在写入
+（包括缓冲文件回放），重建会重复计数，因此只能重建这之前的日期。
+
+例如重建 9 月的汇总：
+    python manage.py rebuild_log_rollups --start 2026-09-01 --end 2026-09-30
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from apps.common.models import AuditLog, LoginLog
+from apps.common.rollups import REBUILD_HORIZON_DAYS, get_rebuild_horizon, rebuild_rollups
+
+TARGETS = {
+    'audit_logs': AuditLog,
+    'login_logs': LoginLog,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        '按日期范围从日志表重建操作日志、登录日志的按天汇总'
+        f'（只能重建 {REBUILD_HORIZON_DAYS} 天之前的日期，更近的日期仍在写入）'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--targets',
+            nargs='+',
+            choices=sorted(TARGETS),
+            default=sorted(TARGETS),
+            help='要重建的汇总（默认全部）'
+        )
+        parser.add_argument('--start', help='开始日期（含），默认 30 天前')
+        parser.add_argument('--end', help=f'结束日期（含），默认且最晚为 {REBUILD_HORIZON_DAYS} 天前')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='每批读取的日志数')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        horizon = get_rebuild_horizon()
+        start = self.parse_day(options['start']) if options['start'] else today - timedelta(days=30)
+        end = self.parse_day(options['end']) if options['end'] else horizon
+        if end > horizon:
+            raise CommandError(f'只能重建 {horizon} 及之前的汇总，更近的日志可能仍在写入，重建会重复计数')
+        if start > end:
+            raise CommandError('开始日期不能晚于结束日期')
+
+        for target in options['targets']:
+            total = rebuild_rollups(TARGETS[target], start, end, options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f'- {target}: 已重建 {start} ~ {end} 的汇总（{total} 条日志）'))
+
+    def parse_day(self, value):
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'无法解析日期: {value}')
+        return day
@@ -0,0 +1,71 @@
+"""
+回放审计日志本地缓冲文件的管理命令
+运行中的进程在数据库恢复后会自动回放自己的缓冲文件，本命令回放已退出（崩溃、重启、缩容）的进程留下的文件。
+进程是否存在按本机进程 ID 判断，多台机器共享缓冲目录时请勿使用 --include-live。
+
+可作为定时任务运行，例如：
+    */5 * * * * python manage.py replay_audit_spool
+"""
+import os
+from django.core.management.base import BaseCommand
+from apps.common.audit_writer import audit_writer
+from apps.common.spool import (
+    REPLAY_SUFFIX, SPOOL_SUFFIX, get_spool_stats, is_process_alive, list_spool_files, parse_spool_pid
+)
+
+
+class Command(BaseCommand):
+    help = '回放已退出进程留下的审计日志缓冲文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='只输出缓冲文件统计（文件数、字节数、最早记录的滞后秒数）'
+        )
+        parser.add_argument(
+            '--include-live',
+            action='store_true',
+            help='同时回放仍在运行的进程的文件（只应在这些进程已停止写入时使用）'
+        )
+
+    def handle(self, *args, **options):
+        base = audit_writer.get_spool_base()
+        stats = get_spool_stats(base)
+        self.stdout.write(f"缓冲文件: {stats['files']} 个，{stats['bytes']} 字节，滞后 {stats['lag_seconds']} 秒")
+        if options['stats']:
+            return
+
+        pids = sorted({parse_spool_pid(base, path) for path in list_spool_files(base)})
+        total = 0
+        for pid in pids:
+            if pid == os.getpid() or (is_process_alive(pid) and not options['include_live']):
+                self.stdout.write(f'- 进程 {pid} 仍在运行，跳过')
+                continue
+            written, completed = self.replay_pid(pid)
+            total += written
+            state = '完成' if completed else '数据库仍不可用，未完成'
+            self.stdout.write(f'- 进程 {pid}: 写入 {written} 条，{state}')
+            if not completed:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'共回放 {total} 条审计日志'))
+
+    def replay_pid(self, pid):
+        """
+        回放一个进程的回放文件和缓冲文件
+
+        Returns:
+            tuple: (写入的日志数, 是否全部完成)
+        """
+        replay_path = audit_writer.get_spool_path(REPLAY_SUFFIX, pid)
+        spool_path = audit_writer.get_spool_path(SPOOL_SUFFIX, pid)
+        written = 0
+        if os.path.exists(replay_path):
+            written += audit_writer.replay(replay_path)
+            if os.path.exists(replay_path):
+                return written, False
+        if os.path.exists(spool_path):
+            os.replace(spool_path, replay_path)
+            written += audit_writer.replay(replay_path)
+        return written, not os.path.exists(replay_path)
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(blank=True, db_index=True, null=True, verbose_name='用户 ID')),
+                ('username', models.CharField(blank=True, db_index=True, max_length=150, null=True, verbose_name='用户名')),
+                ('login_type', models.CharField(choices=[('password', '密码登录'), ('token', 'Token登录'), ('sso', '单点登录'), ('other', '其他')], db_index=True, default='password', max_length=20, verbose_name='登录类型')),
+                ('ip_address', models.CharField(blank=True, db_index=True, max_length=50, null=True, verbose_name='IP 地址')),
+                ('user_agent', models.CharField(blank=True, max_length=500, null=True, verbose_name='用户代理')),
+                ('location', models.CharField(blank=True, max_length=200, null=True, verbose_name='登录地点')),
+                ('device', models.CharField(blank=True, max_length=100, null=True, verbose_name='设备信息')),
+                ('browser', models.CharField(blank=True, max_length=100, null=True, verbose_name='浏览器信息')),
+                ('os', models.CharField(blank=True, max_length=100, null=True, verbose_name='操作系统')),
+                ('status', models.SmallIntegerField(choices=[(1, '成功'), (0, '失败')], db_index=True, default=1, verbose_name='登录状态')),
+                ('failure_reason', models.CharField(blank=True, max_length=200, null=True, verbose_name='失败原因')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='登录时间')),
+            ],
+            options={
+                'verbose_name': '登录日志',
+                'verbose_name_plural': '登录日志',
+                'db_table': 'sys_login_log',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user_id', 'created_at'], name='sys_login_l_user_id_e8b840_idx'), models.Index(fields=['username', 'created_at'], name='sys_login_l_usernam_881029_idx'), models.Index(fields=['ip_address', 'created_at'], name='sys_login_l_ip_addr_ba6018_idx'), models.Index(fields=['status', 'created_at'], name='sys_login_l_status_0f4cee_idx')],
+            },
+        ),
+    ]
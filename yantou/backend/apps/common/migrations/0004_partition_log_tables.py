@@ -0,0 +1,27 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:00
+
+from django.db import migrations
+
+
+def partition_log_tables(apps, schema_editor):
+    """PostgreSQL 下将日志表转换为按月分区表，其他数据库跳过"""
+    from apps.common.partitions import PARTITIONED_TABLES, convert_to_partitioned, is_supported
+
+    if not is_supported(schema_editor.connection):
+        return
+    for table in PARTITIONED_TABLES:
+        convert_to_partitioned(table, connection=schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    # 数据按批复制并逐批提交，中断后重新执行迁移会继续复制
+    atomic = False
+
+    dependencies = [
+        ('apps_common', '0003_audit_created_at_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_log_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,160 @@
+# Generated by Django 4.2.27 on 2026-10-19 13:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_common', '0004_partition_log_tables'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='sys_audit_l_user_id_cce000_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='sys_audit_l_action_c8b8d0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='sys_audit_l_status_05bd3b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loginlog',
+            name='sys_login_l_user_id_e8b840_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loginlog',
+            name='sys_login_l_usernam_881029_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loginlog',
+            name='sys_login_l_ip_addr_ba6018_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='loginlog',
+            name='sys_login_l_status_0f4cee_idx',
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('create', '创建'), ('update', '更新'), ('delete', '删除'), ('view', '查看'), ('login', '登录'), ('logout', '登出'), ('export', '导出'), ('import', '导入'), ('other', '其他')], max_length=50, verbose_name='操作类型'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='ip_address',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='IP 地址'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='resource_id',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='资源 ID'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='resource_type',
+            field=models.CharField(max_length=100, verbose_name='资源类型'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='status',
+            field=models.SmallIntegerField(choices=[(1, '成功'), (0, '失败')], default=1, verbose_name='操作状态'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='user_id',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='用户 ID'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='username',
+            field=models.CharField(blank=True, max_length=150, null=True, verbose_name='用户名'),
+        ),
+        migrations.AlterField(
+            model_name='loginlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='登录时间'),
+        ),
+        migrations.AlterField(
+            model_name='loginlog',
+            name='ip_address',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='IP 地址'),
+        ),
+        migrations.AlterField(
+            model_name='loginlog',
+            name='login_type',
+            field=models.CharField(choices=[('password', '密码登录'), ('token', 'Token登录'), ('sso', '单点登录'), ('other', '其他')], default='password', max_length=20, verbose_name='登录类型'),
+        ),
+        migrations.AlterField(
+            model_name='loginlog',
+            name='status',
+            field=models.SmallIntegerField(choices=[(1, '成功'), (0, '失败')], default=1, verbose_name='登录状态'),
+        ),
+        migrations.AlterField(
+            model_name='loginlog',
+            name='user_id',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='用户 ID'),
+        ),
+        migrations.AlterField(
+            model_name='loginlog',
+            name='username',
+            field=models.CharField(blank=True, max_length=150, null=True, verbose_name='用户名'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['created_at', 'id'], name='audit_log_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user_id', 'created_at', 'id'], name='audit_log_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['username', 'created_at', 'id'], name='audit_log_username_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['action', 'created_at', 'id'], name='audit_log_action_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['resource_type', 'resource_id', 'created_at', 'id'], name='audit_log_resource_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='audit_log_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['ip_address', 'created_at', 'id'], name='audit_log_ip_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginlog',
+            index=models.Index(fields=['created_at', 'id'], name='login_log_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginlog',
+            index=models.Index(fields=['user_id', 'created_at', 'id'], name='login_log_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginlog',
+            index=models.Index(fields=['username', 'created_at', 'id'], name='login_log_username_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginlog',
+            index=models.Index(fields=['ip_address', 'created_at', 'id'], name='login_log_ip_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginlog',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='login_log_status_idx'),
+        ),
+    ]
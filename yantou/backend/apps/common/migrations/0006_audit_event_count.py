@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_common', '0005_log_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='event_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='事件数'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apps_common', '0006_audit_event_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='日期')),
+                ('action', models.CharField(choices=[('create', '创建'), ('update', '更新'), ('delete', '删除'), ('view', '查看'), ('login', '登录'), ('logout', '登出'), ('export', '导出'), ('import', '导入'), ('other', '其他')], max_length=50, verbose_name='操作类型')),
+                ('resource_type', models.CharField(max_length=100, verbose_name='资源类型')),
+                ('status', models.SmallIntegerField(choices=[(1, '成功'), (0, '失败')], verbose_name='操作状态')),
+                ('count', models.BigIntegerField(default=0, verbose_name='事件数')),
+            ],
+            options={
+                'verbose_name': '操作日志日汇总',
+                'verbose_name_plural': '操作日志日汇总',
+                'db_table': 'sys_audit_daily_stat',
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'action', 'resource_type', 'status'), name='audit_daily_stat_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='日期')),
+                ('name', models.CharField(choices=[('audit_users', '操作用户'), ('login_ips', '登录 IP'), ('login_users', '登录用户')], max_length=50, verbose_name='统计项')),
+                ('registers', models.BinaryField(verbose_name='寄存器')),
+            ],
+            options={
+                'verbose_name': '日基数估计',
+                'verbose_name_plural': '日基数估计',
+                'db_table': 'sys_daily_sketch',
+                'constraints': [models.UniqueConstraint(fields=('day', 'name'), name='daily_sketch_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LoginDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='日期')),
+                ('dimension', models.CharField(choices=[('ip', 'IP 地址'), ('user', '用户名')], max_length=10, verbose_name='统计维度')),
+                ('key', models.CharField(max_length=150, verbose_name='IP 地址或用户名')),
+                ('success_count', models.BigIntegerField(default=0, verbose_name='成功次数')),
+                ('failure_count', models.BigIntegerField(default=0, verbose_name='失败次数')),
+            ],
+            options={
+                'verbose_name': '登录日志日汇总',
+                'verbose_name_plural': '登录日志日汇总',
+                'db_table': 'sys_login_daily_stat',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day', 'dimension', '-failure_count'], name='login_daily_stat_failure_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'dimension', 'key'), name='login_daily_stat_unique')],
+            },
+        ),
+    ]
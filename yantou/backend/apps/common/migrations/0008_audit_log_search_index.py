@@ -0,0 +1,30 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:00
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """PostgreSQL 下创建操作日志检索的三元组索引，其他数据库跳过"""
+    from apps.common.search import create_search_index
+
+    create_search_index(connection=schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from apps.common.search import drop_search_index
+
+    drop_search_index(connection=schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    atomic = False
+
+    dependencies = [
+        ('apps_common', '0007_log_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
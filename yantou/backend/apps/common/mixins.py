@@ -5,7 +5,7 @@
 import time
 from rest_framework import viewsets
 from rest_framework.response import Response
-from .audit import log_audit
+from .audit import log_audit, set_audit_context
 
 
 class AuditLogMixin:
@@ -22,6 +22,9 @@ class AuditLogMixin:
     - 自动获取资源类型、资源ID、资源名称
     - 自动记录执行时间、操作状态、错误信息
     - 支持自定义资源类型名称
+
+    在请求中只补充请求级操作日志上下文（set_audit_context），由 RequestLoggingMiddleware 在请求结束时
+    记录为一条日志；不在请求中（如直接调用视图方法）时直接记录。
     """
     
     # 资源类型名称（如果不设置，会从 queryset.model 自动获取）
@@ -114,6 +117,16 @@ class AuditLogMixin:
             if resource_name:
                 description += f": {resource_name}"
             
+            if set_audit_context(
+                action=action,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                resource_name=resource_name,
+                description=description,
+                error_message=error_message,
+            ):
+                return
+            
             log_audit(
                 action=action,
                 resource_type=resource_type,
@@ -131,6 +144,12 @@ class AuditLogMixin:
             logger = logging.getLogger('django.audit')
             logger.warning(f"Failed to log audit in {self.__class__.__name__}: {str(e)}")
     
+    def get_serializer(self, *args, **kwargs):
+        """获取序列化器（保留引用，创建后从中取得保存的实例，不再重新查询）"""
+        serializer = super().get_serializer(*args, **kwargs)
+        self._audit_serializer = serializer
+        return serializer
+    
     def create(self, request, *args, **kwargs):
         """创建资源"""
         start_time = time.time()
@@ -141,14 +160,9 @@ class AuditLogMixin:
         try:
             response = super().create(request, *args, **kwargs)
             
-            # 从响应中获取创建的实例
-            if hasattr(response, 'data') and isinstance(response.data, dict):
-                instance_id = response.data.get('id')
-                if instance_id and hasattr(self, 'queryset'):
-                    try:
-                        instance = self.queryset.model.objects.get(pk=instance_id)
-                    except:
-                        pass
+            # 创建的实例即序列化器保存的实例
+            serializer = getattr(self, '_audit_serializer', None)
+            instance = getattr(serializer, 'instance', None)
             
             return response
         except Exception as e:
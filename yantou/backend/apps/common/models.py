@@ -4,6 +4,7 @@
 """
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 import json
 
@@ -47,32 +48,41 @@ class AuditLog(models.Model):
         (0, _('失败')),
     ]
     
-    user_id = models.BigIntegerField(_('用户 ID'), null=True, blank=True, db_index=True)
-    username = models.CharField(_('用户名'), max_length=150, null=True, blank=True, db_index=True)
-    action = models.CharField(_('操作类型'), max_length=50, choices=ACTION_CHOICES, db_index=True)
-    resource_type = models.CharField(_('资源类型'), max_length=100, db_index=True)
-    resource_id = models.BigIntegerField(_('资源 ID'), null=True, blank=True, db_index=True)
+    # 查询均走下方以 (created_at, id) 结尾的组合索引，单列不再单独建索引
+    user_id = models.BigIntegerField(_('用户 ID'), null=True, blank=True)
+    username = models.CharField(_('用户名'), max_length=150, null=True, blank=True)
+    action = models.CharField(_('操作类型'), max_length=50, choices=ACTION_CHOICES)
+    resource_type = models.CharField(_('资源类型'), max_length=100)
+    resource_id = models.BigIntegerField(_('资源 ID'), null=True, blank=True)
     resource_name = models.CharField(_('资源名称'), max_length=200, null=True, blank=True)
     description = models.TextField(_('操作描述'), null=True, blank=True)
     request_method = models.CharField(_('HTTP 方法'), max_length=10, null=True, blank=True)
     request_path = models.CharField(_('请求路径'), max_length=500, null=True, blank=True)
     request_params = models.TextField(_('请求参数'), null=True, blank=True)  # JSON 格式
-    ip_address = models.CharField(_('IP 地址'), max_length=50, null=True, blank=True, db_index=True)
+    ip_address = models.CharField(_('IP 地址'), max_length=50, null=True, blank=True)
     user_agent = models.CharField(_('用户代理'), max_length=500, null=True, blank=True)
-    status = models.SmallIntegerField(_('操作状态'), choices=STATUS_CHOICES, default=1, db_index=True)
+    status = models.SmallIntegerField(_('操作状态'), choices=STATUS_CHOICES, default=1)
     error_message = models.TextField(_('错误信息'), null=True, blank=True)
     execution_time = models.IntegerField(_('执行时间（毫秒）'), null=True, blank=True)
-    created_at = models.DateTimeField(_('创建时间'), auto_now_add=True, db_index=True)
+    # 采样或聚合记录的查看日志代表多次请求（见 apps/common/audit_policy.py），其他日志为 1
+    event_count = models.PositiveIntegerField(_('事件数'), default=1)
+    # 日志异步批量写入，创建时间取事件发生时间而不是写入时间
+    created_at = models.DateTimeField(_('创建时间'), default=timezone.now)
     
     class Meta:
         db_table = 'sys_audit_log'
         verbose_name = _('操作日志')
         verbose_name_plural = _('操作日志')
         ordering = ['-created_at']
+        # 查询接口按 (created_at, id) 游标分页：每个过滤字段的等值条件 + 时间范围 + 排序由一个索引的范围扫描完成
         indexes = [
-            models.Index(fields=['user_id', 'created_at']),
-            models.Index(fields=['action', 'resource_type']),
-            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['created_at', 'id'], name='audit_log_created_idx'),
+            models.Index(fields=['user_id', 'created_at', 'id'], name='audit_log_user_idx'),
+            models.Index(fields=['username', 'created_at', 'id'], name='audit_log_username_idx'),
+            models.Index(fields=['action', 'created_at', 'id'], name='audit_log_action_idx'),
+            models.Index(fields=['resource_type', 'resource_id', 'created_at', 'id'], name='audit_log_resource_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='audit_log_status_idx'),
+            models.Index(fields=['ip_address', 'created_at', 'id'], name='audit_log_ip_idx'),
         ]
     
     def __str__(self):
@@ -123,32 +133,119 @@ class LoginLog(models.Model):
         (0, _('失败')),
     ]
     
-    user_id = models.BigIntegerField(_('用户 ID'), null=True, blank=True, db_index=True)
-    username = models.CharField(_('用户名'), max_length=150, null=True, blank=True, db_index=True)
-    login_type = models.CharField(_('登录类型'), max_length=20, choices=LOGIN_TYPE_CHOICES, default='password', db_index=True)
-    ip_address = models.CharField(_('IP 地址'), max_length=50, null=True, blank=True, db_index=True)
+    # 查询均走下方以 (created_at, id) 结尾的组合索引，单列不再单独建索引
+    user_id = models.BigIntegerField(_('用户 ID'), null=True, blank=True)
+    username = models.CharField(_('用户名'), max_length=150, null=True, blank=True)
+    login_type = models.CharField(_('登录类型'), max_length=20, choices=LOGIN_TYPE_CHOICES, default='password')
+    ip_address = models.CharField(_('IP 地址'), max_length=50, null=True, blank=True)
     user_agent = models.CharField(_('用户代理'), max_length=500, null=True, blank=True)
     location = models.CharField(_('登录地点'), max_length=200, null=True, blank=True)
     device = models.CharField(_('设备信息'), max_length=100, null=True, blank=True)
     browser = models.CharField(_('浏览器信息'), max_length=100, null=True, blank=True)
     os = models.CharField(_('操作系统'), max_length=100, null=True, blank=True)
-    status = models.SmallIntegerField(_('登录状态'), choices=STATUS_CHOICES, default=1, db_index=True)
+    status = models.SmallIntegerField(_('登录状态'), choices=STATUS_CHOICES, default=1)
     failure_reason = models.CharField(_('失败原因'), max_length=200, null=True, blank=True)
-    created_at = models.DateTimeField(_('登录时间'), auto_now_add=True, db_index=True)
+    created_at = models.DateTimeField(_('登录时间'), default=timezone.now)
     
     class Meta:
         db_table = 'sys_login_log'
         verbose_name = _('登录日志')
         verbose_name_plural = _('登录日志')
         ordering = ['-created_at']
+        # 查询接口按 (created_at, id) 游标分页：每个过滤字段的等值条件 + 时间范围 + 排序由一个索引的范围扫描完成
         indexes = [
-            models.Index(fields=['user_id', 'created_at']),
-            models.Index(fields=['username', 'created_at']),
-            models.Index(fields=['ip_address', 'created_at']),
-            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['created_at', 'id'], name='login_log_created_idx'),
+            models.Index(fields=['user_id', 'created_at', 'id'], name='login_log_user_idx'),
+            models.Index(fields=['username', 'created_at', 'id'], name='login_log_username_idx'),
+            models.Index(fields=['ip_address', 'created_at', 'id'], name='login_log_ip_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='login_log_status_idx'),
         ]
     
     def __str__(self):
         status_display = '成功' if self.status == 1 else '失败'
         return f"{self.username} - {status_display} - {self.created_at}"
 
+
+class AuditDailyStat(models.Model):
+    """
+    操作日志按天汇总
+    由审计日志写入器在写入日志后增量累加，统计接口只读汇总表，不扫描日志表
+    """
+    day = models.DateField(_('日期'))
+    action = models.CharField(_('操作类型'), max_length=50, choices=AuditLog.ACTION_CHOICES)
+    resource_type = models.CharField(_('资源类型'), max_length=100)
+    status = models.SmallIntegerField(_('操作状态'), choices=AuditLog.STATUS_CHOICES)
+    count = models.BigIntegerField(_('事件数'), default=0)
+
+    class Meta:
+        db_table = 'sys_audit_daily_stat'
+        verbose_name = _('操作日志日汇总')
+        verbose_name_plural = _('操作日志日汇总')
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'action', 'resource_type', 'status'], name='audit_daily_stat_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.action} - {self.resource_type} - {self.count}"
+
+
+class LoginDailyStat(models.Model):
+    """
+    登录日志按天汇总
+    按 IP 和按用户名分别统计每天的成功、失败次数
+    """
+    DIMENSION_CHOICES = [
+        ('ip', _('IP 地址')),
+        ('user', _('用户名')),
+    ]
+
+    day = models.DateField(_('日期'))
+    dimension = models.CharField(_('统计维度'), max_length=10, choices=DIMENSION_CHOICES)
+    key = models.CharField(_('IP 地址或用户名'), max_length=150)
+    success_count = models.BigIntegerField(_('成功次数'), default=0)
+    failure_count = models.BigIntegerField(_('失败次数'), default=0)
+
+    class Meta:
+        db_table = 'sys_login_daily_stat'
+        verbose_name = _('登录日志日汇总')
+        verbose_name_plural = _('登录日志日汇总')
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'dimension', 'key'], name='login_daily_stat_unique'),
+        ]
+        indexes = [
+            # 按失败次数排序取某天的 Top N
+            models.Index(fields=['day', 'dimension', '-failure_count'], name='login_daily_stat_failure_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.dimension}:{self.key} - {self.success_count}/{self.failure_count}"
+
+
+class DailySketch(models.Model):
+    """
+    按天的基数估计（HyperLogLog 寄存器）
+    用于统计不同用户数、不同 IP 数，多天的结果合并寄存器后估计
+    """
+    NAME_CHOICES = [
+        ('audit_users', _('操作用户')),
+        ('login_ips', _('登录 IP')),
+        ('login_users', _('登录用户')),
+    ]
+
+    day = models.DateField(_('日期'))
+    name = models.CharField(_('统计项'), max_length=50, choices=NAME_CHOICES)
+    registers = models.BinaryField(_('寄存器'))
+
+    class Meta:
+        db_table = 'sys_daily_sketch'
+        verbose_name = _('日基数估计')
+        verbose_name_plural = _('日基数估计')
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'name'], name='daily_sketch_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.name}"
+
@@ -2,8 +2,13 @@
 自定义分页类
 提供页码分页和游标分页两种方式
 """
+import base64
+import json
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
 
@@ -117,3 +122,105 @@ class CustomCursorPagination(CursorPagination):
         from datetime import datetime
         return datetime.utcnow().isoformat() + 'Z'
 
+
+class KeysetCursorPagination(CustomCursorPagination):
+    """
+    多列键集游标分页
+    DRF 的 CursorPagination 只用排序的第一个字段定位，值相同的记录靠游标中的 OFFSET 跳过；
+    这里游标记录本页边界记录的全部排序字段值，按 (f1, f2, ...) 的字典序条件定位下一页，
+    排序字段值相同的记录很多时也不需要 OFFSET，任意页都是一次索引范围扫描。
+
+    ordering 的最后一个字段须唯一（如 id），各字段不能为 NULL。
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+        position, reverse = self.decode_cursor(request)
+
+        # 向前翻页时按相反方向查询，再把结果倒回来
+        ordering = [self.flip(name) for name in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_following = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_following, position is not None
+        else:
+            self.has_next, self.has_previous = has_following, position is not None
+        return self.page
+
+    @staticmethod
+    def flip(name: str) -> str:
+        """反转排序方向"""
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def after(self, ordering, position) -> Q:
+        """
+        按排序方向位于 position 之后的条件
+        (a, b) 在 (x, y) 之后：a 在 x 之后，或 a = x 且 b 在 y 之后
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(ordering, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_position(self, item) -> list:
+        """记录的排序字段值"""
+        return [field.value_to_string(item) for field in self.fields]
+
+    def decode_cursor(self, request):
+        """
+        解析游标
+
+        Returns:
+            tuple: (边界记录的排序字段值或 None, 是否向前翻页)
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            values = data['p']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(self.fields, values)]
+            # 本页为空时用原位置生成翻页链接
+            self.cursor_values = values
+            return position, bool(data.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse: bool) -> str:
+        """生成带游标的链接（URL 安全的 base64，不含 '+'、'/'、'='）"""
+        data = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(self.get_position(self.page[-1]), False)
+        return self.encode_cursor(self.cursor_values, False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor(self.get_position(self.page[0]), True)
+        return self.encode_cursor(self.cursor_values, True)
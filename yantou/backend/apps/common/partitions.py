@@ -0,0 +1,307 @@
+"""
+日志表按月分区（仅 PostgreSQL）
+sys_audit_log、sys_login_log 使用 PostgreSQL 声明式分区，按 created_at 每月一个分区：
+- 写入只维护当月分区的索引，按 created_at 范围查询时自动裁剪分区
+- 超过保留期的数据直接分离（DETACH）并删除整个分区，不产生大量 DELETE
+
+分区命名为 <表名>_pYYYYMM（按 UTC 月份划分），另有 <表名>_default 默认分区接收超出已建分区范围的数据。
+默认分区中已有某月的数据时，该月的分区不能直接创建：先分离默认分区，创建分区后把这些数据移入，再重新挂载。
+主键为 (id, created_at)（分区表的唯一约束必须包含分区键），id 仍由序列生成，模型层不受影响。
+
+其他数据库不做任何处理，相关函数直接返回。
+"""
+from datetime import date, datetime, timezone as dt_timezone
+from typing import List, Optional, Tuple
+from django.db import DatabaseError, connection as default_connection, transaction
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger('django.request')
+
+PARTITIONED_TABLES = ('sys_audit_log', 'sys_login_log')
+
+
+def month_start(value) -> date:
+    """获取日期或时间所在月（UTC）的第一天"""
+    if isinstance(value, datetime):
+        value = value.astimezone(dt_timezone.utc).date() if timezone.is_aware(value) else value.date()
+    return value.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """月份加减（month 为某月第一天）"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """获取分区表名"""
+    return f'{table}_p{month:%Y%m}'
+
+
+def default_partition_name(table: str) -> str:
+    """获取默认分区表名"""
+    return f'{table}_default'
+
+
+def parse_partition_month(table: str, name: str) -> Optional[date]:
+    """
+    从分区表名解析月份
+
+    Returns:
+        date: 分区月份第一天，非按月分区（如默认分区）时返回 None
+    """
+    prefix = f'{table}_p'
+    suffix = name[len(prefix):]
+    if not name.startswith(prefix) or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def is_supported(connection=None) -> bool:
+    """当前数据库是否支持分区（PostgreSQL）"""
+    return (connection or default_connection).vendor == 'postgresql'
+
+
+def table_exists(cursor, table: str) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [table])
+    return cursor.fetchone()[0]
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    """表是否已是分区表"""
+    cursor.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s)",
+        [table]
+    )
+    return cursor.fetchone()[0]
+
+
+def list_partitions(cursor, table: str) -> List[Tuple[str, Optional[date]]]:
+    """
+    列出分区
+
+    Returns:
+        list: [(分区表名, 月份第一天或 None)]，按名称排序
+    """
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = %s ORDER BY c.relname",
+        [table]
+    )
+    return [(name, parse_partition_month(table, name)) for (name,) in cursor.fetchall()]
+
+
+def month_bound(month: date) -> str:
+    """分区边界（UTC 零点）"""
+    return f'{month.isoformat()} 00:00:00+00'
+
+
+def create_partition(cursor, table: str, month: date):
+    """创建某月的分区（已存在时跳过）"""
+    qn = default_connection.ops.quote_name
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {qn(partition_name(table, month))} PARTITION OF {qn(table)} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        [month_bound(month), month_bound(add_months(month, 1))]
+    )
+
+
+def create_partition_from_default(cursor, table: str, month: date) -> int:
+    """
+    创建某月的分区，并把默认分区中该月的数据移入新分区
+    需在事务中执行：分离默认分区期间持有父表的排他锁，并发写入等待而不会失败
+
+    Args:
+        cursor: 数据库游标
+        table: 分区表名
+        month: 月份第一天
+
+    Returns:
+        int: 移入新分区的记录数
+    """
+    qn = default_connection.ops.quote_name
+    default = default_partition_name(table)
+    bounds = [month_bound(month), month_bound(add_months(month, 1))]
+    cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(default)}")
+    create_partition(cursor, table, month)
+    cursor.execute(
+        f"INSERT INTO {qn(table)} SELECT * FROM {qn(default)} WHERE created_at >= %s AND created_at < %s",
+        bounds
+    )
+    moved = cursor.rowcount
+    cursor.execute(f"DELETE FROM {qn(default)} WHERE created_at >= %s AND created_at < %s", bounds)
+    cursor.execute(f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(default)} DEFAULT")
+    return moved
+
+
+def default_has_rows(cursor, table: str, month: date) -> bool:
+    """默认分区中是否有某月的数据"""
+    qn = default_connection.ops.quote_name
+    default = default_partition_name(table)
+    if not table_exists(cursor, default):
+        return False
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {qn(default)} WHERE created_at >= %s AND created_at < %s)",
+        [month_bound(month), month_bound(add_months(month, 1))]
+    )
+    return cursor.fetchone()[0]
+
+
+def ensure_partitions(table: str, months_ahead: int = 3, connection=None) -> List[str]:
+    """
+    创建当月及未来若干个月的分区
+    默认分区中已有该月数据时移入新分区；某个月创建失败时记录错误并继续处理其他月份
+
+    Args:
+        table: 分区表名
+        months_ahead: 提前创建的月数
+        connection: 数据库连接（默认 default）
+
+    Returns:
+        list: 新创建的分区表名
+    """
+    connection = connection or default_connection
+    if not is_supported(connection):
+        return []
+
+    created = []
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            return []
+        existing = {name for name, _month in list_partitions(cursor, table)}
+        current = month_start(timezone.now())
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            try:
+                with transaction.atomic(using=connection.alias):
+                    if default_has_rows(cursor, table, month):
+                        moved = create_partition_from_default(cursor, table, month)
+                        logger.info(f"Moved {moved} rows from {default_partition_name(table)} to {name}")
+                    else:
+                        create_partition(cursor, table, month)
+            except DatabaseError as e:
+                logger.error(f"Failed to create partition {name}: {str(e)}")
+                continue
+            created.append(name)
+    return created
+
+
+def drop_partitions_before(table: str, cutoff, detach_only: bool = False, connection=None) -> List[str]:
+    """
+    分离并删除整月都早于截止时间的分区
+
+    Args:
+        table: 分区表名
+        cutoff: 截止时间（该时间所在月及之后的分区保留）
+        detach_only: 只分离不删除（分离后的表可归档后手动删除）
+        connection: 数据库连接（默认 default）
+
+    Returns:
+        list: 处理的分区表名
+    """
+    connection = connection or default_connection
+    if not is_supported(connection):
+        return []
+
+    qn = connection.ops.quote_name
+    boundary = month_start(cutoff)
+    removed = []
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            return []
+        for name, month in list_partitions(cursor, table):
+            if month is None or add_months(month, 1) > boundary:
+                continue
+            cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}")
+            if not detach_only:
+                cursor.execute(f"DROP TABLE {qn(name)}")
+            removed.append(name)
+    return removed
+
+
+def convert_to_partitioned(table: str, months_ahead: int = 3, batch_size: int = 50000, connection=None):
+    """
+    将普通表转换为按月分区表
+
+    步骤：原表改名为 <表名>_legacy（索引一并改名），按原表结构创建同名分区表和分区，
+    在分区表上重建原有索引，按主键范围分批复制数据，最后删除原表。
+    每批单独提交，中断后再次执行会从已复制的位置继续。
+
+    Args:
+        table: 表名
+        months_ahead: 提前创建的月数
+        batch_size: 每批复制的记录数
+        connection: 数据库连接（默认 default）
+    """
+    connection = connection or default_connection
+    if not is_supported(connection):
+        return
+
+    qn = connection.ops.quote_name
+    legacy = f'{table}_legacy'
+    # 不能与原表的序列（<表名>_id_seq）同名，原表删除时会一并删除其序列
+    sequence = f'{table}_partitioned_id_seq'
+
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            cursor.execute(
+                "SELECT i.relname, pg_get_indexdef(x.indexrelid), x.indisprimary FROM pg_index x "
+                "JOIN pg_class i ON i.oid = x.indexrelid "
+                "JOIN pg_class t ON t.oid = x.indrelid WHERE t.relname = %s",
+                [table]
+            )
+            indexes = cursor.fetchall()
+
+            cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+            for name, _definition, _primary in indexes:
+                cursor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(name[:56] + '_legacy')}")
+
+            # 不复制 IDENTITY（PostgreSQL 17 之前分区表不支持），改用序列作为默认值
+            cursor.execute(
+                f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+                f"INCLUDING COMMENTS) PARTITION BY RANGE (created_at)"
+            )
+            cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(sequence)}")
+            cursor.execute(f"SELECT setval(%s, COALESCE((SELECT max(id) FROM {qn(legacy)}), 0) + 1, false)", [sequence])
+            cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [sequence])
+            cursor.execute(f"ALTER SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id")
+            cursor.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, created_at)")
+
+            # 按原表数据的时间范围创建分区
+            cursor.execute(f"SELECT min(created_at) FROM {qn(legacy)}")
+            oldest = cursor.fetchone()[0]
+            current = month_start(timezone.now())
+            month = month_start(oldest) if oldest else current
+            while month <= add_months(current, months_ahead):
+                create_partition(cursor, table, month)
+                month = add_months(month, 1)
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {qn(default_partition_name(table))} PARTITION OF {qn(table)} DEFAULT")
+
+            # 原索引定义中的表名即为新的分区表，在分区表上创建会同时建立到每个分区
+            for _name, definition, primary in indexes:
+                if not primary:
+                    cursor.execute(definition)
+
+        if not table_exists(cursor, legacy):
+            return
+
+        cursor.execute(f"SELECT COALESCE(min(id), 0), COALESCE(max(id), 0) FROM {qn(legacy)}")
+        low, high = cursor.fetchone()
+        cursor.execute(f"SELECT COALESCE(max(id), %s) FROM {qn(table)} WHERE id <= %s", [low - 1, high])
+        cursor_id = cursor.fetchone()[0]
+        while cursor_id < high:
+            upper = cursor_id + batch_size
+            cursor.execute(
+                f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)} WHERE id > %s AND id <= %s",
+                [cursor_id, upper]
+            )
+            cursor_id = upper
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+        logger.info(f"Converted {table} to a partitioned table")
@@ -0,0 +1,296 @@
+"""
+日志按天汇总
+审计日志写入器每写入一批日志，就把这批日志按天累加到汇总表（增量维护，不扫描日志表）：
+- AuditDailyStat: 天 × 操作类型 × 资源类型 × 状态的事件数（按 event_count 累加，包含采样、聚合的查看日志）
+- LoginDailyStat: 天 × IP、天 × 用户名的登录成功、失败次数
+- DailySketch: 每天的不同用户数、不同 IP 数的 HyperLogLog 寄存器，多天合并后估计
+
+日期按当前时区（TIME_ZONE）划分。统计接口只读汇总表。
+历史数据或汇总出错时可用 python manage.py rebuild_log_rollups 按日期范围重建。
+重建与写入器的增量累加互不协调，只允许重建 REBUILD_HORIZON_DAYS 天之前的日期（这些日期不再有日志写入）。
+"""
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from utils.hyperloglog import HyperLogLog
+from .models import AuditDailyStat, AuditLog, DailySketch, LoginDailyStat, LoginLog
+
+SKETCH_PRECISION = 12
+
+# 最近这么多天（含今天）的日志可能仍在写入（队列、缓冲文件回放），不允许重建
+REBUILD_HORIZON_DAYS = 2
+
+
+def log_day(value: datetime) -> date:
+    """日志所属的日期（当前时区）"""
+    return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+
+
+def day_range(start: date, end: date):
+    """日期范围对应的时间范围 [开始日零点, 结束日次日零点)"""
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+    )
+
+
+def increment(model, key: dict, **deltas):
+    """
+    累加汇总行的计数（不存在时创建）
+
+    Args:
+        model: 汇总模型
+        key: 唯一键字段
+        **deltas: 各计数字段的增量
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**key).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **deltas)
+    except IntegrityError:
+        # 其他进程已创建
+        model.objects.filter(**key).update(**updates)
+
+
+def merge_sketches(sketches: dict):
+    """
+    把 HyperLogLog 合并到按天的寄存器中
+
+    Args:
+        sketches: {(日期, 统计项): HyperLogLog}
+    """
+    for (day, name), sketch in sketches.items():
+        with transaction.atomic():
+            row = DailySketch.objects.select_for_update().filter(day=day, name=name).first()
+            if row is None:
+                try:
+                    with transaction.atomic():
+                        DailySketch.objects.create(day=day, name=name, registers=sketch.to_bytes())
+                    continue
+                except IntegrityError:
+                    row = DailySketch.objects.select_for_update().get(day=day, name=name)
+            sketch.merge(HyperLogLog.from_bytes(bytes(row.registers)))
+            row.registers = sketch.to_bytes()
+            row.save(update_fields=['registers'])
+
+
+def _add_to_sketch(sketches: dict, day: date, name: str, value):
+    if value in (None, ''):
+        return
+    sketch = sketches.get((day, name))
+    if sketch is None:
+        sketch = sketches[(day, name)] = HyperLogLog(SKETCH_PRECISION)
+    sketch.add(str(value))
+
+
+def update_audit_rollups(objs):
+    """
+    把一批操作日志累加到汇总表
+
+    Args:
+        objs: AuditLog 对象列表
+    """
+    counts = Counter()
+    sketches = {}
+    for obj in objs:
+        day = log_day(obj.created_at)
+        counts[(day, obj.action, obj.resource_type, obj.status)] += obj.event_count or 1
+        _add_to_sketch(sketches, day, 'audit_users', obj.user_id)
+
+    for (day, action, resource_type, status), count in counts.items():
+        increment(
+            AuditDailyStat,
+            {'day': day, 'action': action, 'resource_type': resource_type, 'status': status},
+            count=count
+        )
+    merge_sketches(sketches)
+
+
+def update_login_rollups(objs):
+    """
+    把一批登录日志累加到汇总表
+
+    Args:
+        objs: LoginLog 对象列表
+    """
+    counts = defaultdict(lambda: [0, 0])
+    sketches = {}
+    for obj in objs:
+        day = log_day(obj.created_at)
+        column = 0 if obj.status == 1 else 1
+        counts[(day, 'ip', obj.ip_address or '')][column] += 1
+        counts[(day, 'user', (obj.username or '')[:150])][column] += 1
+        _add_to_sketch(sketches, day, 'login_ips', obj.ip_address)
+        _add_to_sketch(sketches, day, 'login_users', obj.username)
+
+    for (day, dimension, key), (success, failure) in counts.items():
+        increment(
+            LoginDailyStat,
+            {'day': day, 'dimension': dimension, 'key': key},
+            success_count=success,
+            failure_count=failure
+        )
+    merge_sketches(sketches)
+
+
+ROLLUP_UPDATERS = {
+    AuditLog: update_audit_rollups,
+    LoginLog: update_login_rollups,
+}
+
+
+def update_rollups(model, objs):
+    """
+    把一批已写入的日志累加到对应的汇总表
+
+    Args:
+        model: 日志模型
+        objs: 日志对象列表
+    """
+    updater = ROLLUP_UPDATERS.get(model)
+    if updater and objs:
+        updater(objs)
+
+
+def get_rebuild_horizon() -> date:
+    """可以重建的最晚日期"""
+    return timezone.localdate() - timedelta(days=REBUILD_HORIZON_DAYS)
+
+
+def rebuild_rollups(model, start: date, end: date, chunk_size: int = 2000) -> int:
+    """
+    按日期范围从日志表重建汇总（逐天在一个事务中删除该天的汇总后重新累加）
+    只能重建 get_rebuild_horizon() 及之前的日期：更近的日期写入器仍在累加，重建期间写入的日志会被重复计数
+
+    Args:
+        model: 日志模型
+        start: 开始日期
+        end: 结束日期（含）
+        chunk_size: 每批读取的日志数
+
+    Returns:
+        int: 处理的日志数
+
+    Raises:
+        ValueError: 结束日期晚于可以重建的最晚日期
+    """
+    horizon = get_rebuild_horizon()
+    if end > horizon:
+        raise ValueError(f'Cannot rebuild rollups after {horizon}, logs for later days may still be written')
+
+    if model is AuditLog:
+        stat_model, names = AuditDailyStat, ['audit_users']
+    else:
+        stat_model, names = LoginDailyStat, ['login_ips', 'login_users']
+
+    total = 0
+    day = start
+    while day <= end:
+        since, until = day_range(day, day)
+        # 统计接口不会读到删除后、累加完成前的一天
+        with transaction.atomic():
+            stat_model.objects.filter(day=day).delete()
+            DailySketch.objects.filter(day=day, name__in=names).delete()
+            batch = []
+            queryset = model.objects.filter(created_at__gte=since, created_at__lt=until).order_by()
+            for obj in queryset.iterator(chunk_size=chunk_size):
+                batch.append(obj)
+                if len(batch) >= chunk_size:
+                    update_rollups(model, batch)
+                    total += len(batch)
+                    batch = []
+            update_rollups(model, batch)
+            total += len(batch)
+        day += timedelta(days=1)
+    return total
+
+
+def get_distinct_count(name: str, start: date, end: date) -> int:
+    """
+    估计日期范围内的不同元素数（合并每天的寄存器）
+
+    Args:
+        name: 统计项
+        start: 开始日期
+        end: 结束日期（含）
+
+    Returns:
+        int: 估计值
+    """
+    sketch = HyperLogLog(SKETCH_PRECISION)
+    for registers in DailySketch.objects.filter(name=name, day__gte=start, day__lte=end).values_list('registers', flat=True):
+        sketch.merge(HyperLogLog.from_bytes(bytes(registers)))
+    return sketch.count()
+
+
+def get_audit_stats(start: date, end: date) -> dict:
+    """
+    操作日志统计（只读汇总表）
+
+    Args:
+        start: 开始日期
+        end: 结束日期（含）
+
+    Returns:
+        dict: 总数、失败数、按天 / 操作类型 / 资源类型的事件数和不同用户数
+    """
+    stats = AuditDailyStat.objects.filter(day__gte=start, day__lte=end)
+    daily = defaultdict(lambda: {'count': 0, 'failed': 0})
+    for row in stats.values('day', 'status').annotate(total=Sum('count')).order_by('day'):
+        daily[row['day']]['count'] += row['total']
+        if row['status'] == 0:
+            daily[row['day']]['failed'] += row['total']
+
+    return {
+        'start': start,
+        'end': end,
+        'total': sum(item['count'] for item in daily.values()),
+        'failed': sum(item['failed'] for item in daily.values()),
+        'daily': [{'day': day, **item} for day, item in daily.items()],
+        'by_action': list(stats.values('action').annotate(count=Sum('count')).order_by('-count')),
+        'by_resource': list(stats.values('resource_type').annotate(count=Sum('count')).order_by('-count')),
+        'distinct_users': get_distinct_count('audit_users', start, end),
+    }
+
+
+def get_login_stats(start: date, end: date, top: int = 10) -> dict:
+    """
+    登录日志统计（只读汇总表）
+
+    Args:
+        start: 开始日期
+        end: 结束日期（含）
+        top: 失败次数最多的 IP、用户名返回的条数
+
+    Returns:
+        dict: 成功、失败次数，按天的次数，失败最多的 IP 和用户名，不同 IP 数和不同用户数
+    """
+    stats = LoginDailyStat.objects.filter(day__gte=start, day__lte=end)
+    # 每条登录日志在 ip 维度恰好计数一次，总数按 ip 维度求和
+    daily = list(
+        stats.filter(dimension='ip').values('day')
+        .annotate(success=Sum('success_count'), failure=Sum('failure_count')).order_by('day')
+    )
+
+    def top_failures(dimension):
+        return [
+            {'key': row['key'], 'failure_count': row['failures']}
+            for row in stats.filter(dimension=dimension).values('key')
+            .annotate(failures=Sum('failure_count')).filter(failures__gt=0).order_by('-failures')[:top]
+        ]
+
+    return {
+        'start': start,
+        'end': end,
+        'success': sum(row['success'] for row in daily),
+        'failure': sum(row['failure'] for row in daily),
+        'daily': daily,
+        'top_failed_ips': top_failures('ip'),
+        'top_failed_users': top_failures('user'),
+        'distinct_ips': get_distinct_count('login_ips', start, end),
+        'distinct_users': get_distinct_count('login_users', start, end),
+    }
@@ -0,0 +1,46 @@
+"""
+通用序列化器
+操作日志、登录日志的只读序列化器
+"""
+from rest_framework import serializers
+from .models import AuditLog, LoginLog
+
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    """
+    操作日志序列化器
+    """
+    action_display = serializers.CharField(source='get_action_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    request_params = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AuditLog
+        fields = [
+            'id', 'user_id', 'username', 'action', 'action_display', 'resource_type', 'resource_id',
+            'resource_name', 'description', 'request_method', 'request_path', 'request_params',
+            'ip_address', 'user_agent', 'status', 'status_display', 'error_message', 'execution_time',
+            'event_count', 'created_at',
+        ]
+        read_only_fields = fields
+
+    def get_request_params(self, obj):
+        """请求参数（解析 JSON）"""
+        return obj.get_request_params()
+
+
+class LoginLogSerializer(serializers.ModelSerializer):
+    """
+    登录日志序列化器
+    """
+    login_type_display = serializers.CharField(source='get_login_type_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = LoginLog
+        fields = [
+            'id', 'user_id', 'username', 'login_type', 'login_type_display', 'ip_address', 'user_agent',
+            'location', 'device', 'browser', 'os', 'status', 'status_display', 'failure_reason',
+            'created_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,279 @@
+"""
+审计日志本地缓冲文件（spool）
+数据库写入失败或队列已满时，审计日志写入器把日志追加到本进程的缓冲文件，数据库恢复后由写入器或
+replay_audit_spool 管理命令批量读回写入数据库。
+
+文件格式：每条记录一行 "<crc32> <写入时间戳> <日志 JSON>\\n"，crc32 覆盖其后的全部内容。
+进程崩溃时最后一行可能只写入一部分，读取时没有换行符或校验不通过的行被跳过，不影响其他记录。
+
+文件命名（<前缀> 为 AUDIT_WRITER_SPOOL_PATH）：
+- <前缀>.<pid>.spool: 进程正在追加的文件
+- <前缀>.<pid>.replay: 正在回放的文件，<前缀>.<pid>.replay.offset 记录已写入数据库的位置，
+  回放中断（数据库再次失败或进程崩溃）后从该位置继续
+- <前缀>.<pid>.quarantine: 被数据库拒绝（违反约束、值无效）的记录，格式相同，不回放
+
+回放为至少一次（at-least-once）：一批记录写入数据库后才保存进度，进程恰好在两步之间崩溃时，
+重启后该批（最多 AUDIT_WRITER_BATCH_SIZE 条）会再写入一次。日志表没有可用于去重的自然键，不做去重。
+"""
+import glob
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Callable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger('django.audit')
+
+SPOOL_SUFFIX = '.spool'
+REPLAY_SUFFIX = '.replay'
+OFFSET_SUFFIX = '.offset'
+QUARANTINE_SUFFIX = '.quarantine'
+
+# 追加写入的缓冲区大小，一批记录合并为少量顺序写
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+def encode_record(payload: str, timestamp: float = None) -> bytes:
+    """
+    编码一条记录
+
+    Args:
+        payload: 日志 JSON
+        timestamp: 写入时间戳（默认当前时间）
+
+    Returns:
+        bytes: 带校验和换行符的一行
+    """
+    body = f'{time.time() if timestamp is None else timestamp:.3f} {payload}'.encode('utf-8')
+    return b'%08x %s\n' % (zlib.crc32(body), body)
+
+
+def decode_record(line: bytes) -> Optional[Tuple[float, str]]:
+    """
+    解码一条记录
+
+    Args:
+        line: 一行（含换行符）
+
+    Returns:
+        tuple: (写入时间戳, 日志 JSON)，不完整或校验不通过时返回 None
+    """
+    if not line.endswith(b'\n') or len(line) < 10 or line[8:9] != b' ':
+        return None
+    body = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(body):
+            return None
+        timestamp, _sep, payload = body.decode('utf-8').partition(' ')
+        return float(timestamp), payload
+    except ValueError:
+        return None
+
+
+def iter_records(path: str, offset: int = 0) -> Iterator[Tuple[int, Optional[str]]]:
+    """
+    从指定位置逐行读取记录
+
+    Args:
+        path: 文件路径
+        offset: 开始读取的位置
+
+    Returns:
+        Iterator: (该行结束的位置, 日志 JSON)，损坏的行日志 JSON 为 None
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            record = decode_record(line)
+            yield offset, record[1] if record else None
+
+
+def read_offset(path: str) -> int:
+    """读取回放进度（不存在或损坏时从头开始）"""
+    try:
+        with open(path + OFFSET_SUFFIX, 'r') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def write_offset(path: str, offset: int):
+    """原子地保存回放进度"""
+    tmp_path = path + OFFSET_SUFFIX + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(str(offset))
+    os.replace(tmp_path, path + OFFSET_SUFFIX)
+
+
+def replay_file(path: str, write_batch: Callable[[List[str]], bool], batch_size: int = 500) -> Tuple[int, bool]:
+    """
+    回放缓冲文件（至少一次：写入一批后、保存进度前崩溃时该批会再次写入）
+
+    Args:
+        path: 回放文件路径（.replay）
+        write_batch: 写入一批日志 JSON 的函数，返回 False 表示数据库仍不可用
+        batch_size: 每批记录数
+
+    Returns:
+        tuple: (写入的记录数, 是否已回放完成；未完成时文件和进度保留，下次继续)
+    """
+    written = 0
+    corrupt = 0
+    batch = []
+    batch_end = offset = read_offset(path)
+
+    def commit():
+        nonlocal batch, written
+        if batch and not write_batch(batch):
+            return False
+        written += len(batch)
+        batch = []
+        write_offset(path, batch_end)
+        return True
+
+    for batch_end, payload in iter_records(path, offset):
+        if payload is None:
+            corrupt += 1
+            continue
+        batch.append(payload)
+        if len(batch) >= batch_size and not commit():
+            return written, False
+
+    if not commit():
+        return written, False
+    if corrupt:
+        logger.warning(f"Skipped {corrupt} corrupt records in audit spool {path}")
+    os.remove(path)
+    os.remove(path + OFFSET_SUFFIX)
+    return written, True
+
+
+def parse_spool_pid(base: str, path: str) -> Optional[int]:
+    """从缓冲文件名解析进程 ID"""
+    match = re.fullmatch(re.escape(base) + r'\.(\d+)(\.spool|\.replay)', path)
+    return int(match.group(1)) if match else None
+
+
+def list_spool_files(base: str) -> List[str]:
+    """列出全部缓冲文件和回放文件（不含进度文件）"""
+    return sorted(
+        path for path in glob.glob(glob.escape(base) + '.*')
+        if parse_spool_pid(base, path) is not None
+    )
+
+
+def is_process_alive(pid: int) -> bool:
+    """进程是否仍在运行（仅对本机进程有效）"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_spool_stats(base: str) -> dict:
+    """
+    缓冲文件统计
+
+    Args:
+        base: 缓冲文件路径前缀
+
+    Returns:
+        dict: 文件数、总字节数、最早一条未回放记录的滞后秒数
+    """
+    files = 0
+    size = 0
+    oldest = None
+    for path in list_spool_files(base):
+        try:
+            file_size = os.path.getsize(path)
+            offset = read_offset(path) if path.endswith(REPLAY_SUFFIX) else 0
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                record = decode_record(f.readline())
+        except OSError:
+            continue
+        files += 1
+        size += file_size - offset
+        if record and (oldest is None or record[0] < oldest):
+            oldest = record[0]
+    return {
+        'files': files,
+        'bytes': size,
+        'lag_seconds': round(time.time() - oldest, 3) if oldest else 0,
+    }
+
+
+class Spool:
+    """
+    进程的缓冲文件
+    追加写入使用带缓冲区的顺序写，每次 append 结束时刷新到操作系统（AUDIT_WRITER_SPOOL_FSYNC 开启时同时 fsync）
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        """
+        Args:
+            path: 缓冲文件路径（.spool）
+            fsync: 每次追加后是否 fsync
+        """
+        self.path = path
+        self.fsync = fsync
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, payloads: List[str]):
+        """
+        追加一批记录
+
+        Args:
+            payloads: 日志 JSON 列表
+        """
+        timestamp = time.time()
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._file = open(self.path, 'ab', buffering=WRITE_BUFFER_SIZE)
+                # 上次崩溃留下的不完整行单独成行，不与新记录连在一起
+                if self._file.tell() and not self._ends_with_newline():
+                    self._file.write(b'\n')
+            for payload in payloads:
+                self._file.write(encode_record(payload, timestamp))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def close(self):
+        """关闭文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def rotate(self, replay_path: str) -> bool:
+        """
+        把当前文件改名为回放文件，之后的追加写入新文件
+
+        Args:
+            replay_path: 回放文件路径
+
+        Returns:
+            bool: 是否有可回放的文件
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if not os.path.exists(self.path):
+                return False
+            os.replace(self.path, replay_path)
+            return True
@@ -0,0 +1,273 @@
+"""
+限流
+提供滑动窗口和令牌桶两种限流算法，以 DRF 限流类的形式接入
+
+规则在 settings.RATE_LIMITS 中按作用域配置，视图通过 throttle_scope 指定作用域，
+多个视图使用同一作用域即为一个路由组，未指定时使用 default 作用域：
+
+    RATE_LIMITS = {
+        'default': {'rate': '1000/hour', 'key': 'user'},
+        'register': {'rate': '5/hour', 'key': 'ip'},
+        'token_refresh': {'rate': '30/min', 'key': 'user', 'algorithm': 'token_bucket', 'burst': 10},
+    }
+
+- rate: 次数/周期（s、m/min、h/hour、d/day）
+- key: 限流维度，ip 按客户端 IP，user 按用户（匿名用户按 IP）
+- algorithm: sliding_window（默认）或 token_bucket
+- burst: 令牌桶容量（默认等于 rate 中的次数）
+
+Redis 后端下每次判定通过一次 Lua 脚本原子完成（使用 Redis 服务器时间），
+其他缓存后端回退为缓存 API 实现。
+"""
+import math
+import time
+from typing import Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+from utils.cache import get_redis_client, make_cache_key
+import logging
+
+logger = logging.getLogger('django.request')
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# 滑动窗口计数：当前窗口计数 + 上一窗口计数按剩余比例加权
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now_time = redis.call('TIME')
+local now = tonumber(now_time[1]) * 1000 + math.floor(tonumber(now_time[2]) / 1000)
+local current_window = math.floor(now / window)
+local curr_key = KEYS[1] .. ':' .. current_window
+local prev_key = KEYS[1] .. ':' .. (current_window - 1)
+local prev = tonumber(redis.call('GET', prev_key) or '0')
+local curr = tonumber(redis.call('GET', curr_key) or '0')
+local elapsed = now - current_window * window
+if prev * (window - elapsed) / window + curr + 1 > limit then
+    local wait = window - elapsed
+    if curr + 1 <= limit and prev > 0 then
+        wait = math.ceil(window - (limit - curr - 1) * window / prev - elapsed)
+    end
+    return {0, wait}
+end
+redis.call('INCR', curr_key)
+redis.call('PEXPIRE', curr_key, window * 2)
+return {1, 0}
+"""
+
+# 令牌桶：按经过时间补充令牌，令牌不足时返回补足一个令牌所需时间
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_ms = tonumber(ARGV[2])
+local now_time = redis.call('TIME')
+local now = tonumber(now_time[1]) * 1000 + math.floor(tonumber(now_time[2]) / 1000)
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) / refill_ms)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) * refill_ms)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * refill_ms))
+return {allowed, wait}
+"""
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    解析限流频率
+
+    Args:
+        rate: 频率字符串，如 '10/min'
+
+    Returns:
+        tuple: (次数, 周期秒数)
+    """
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class SlidingWindowLimiter:
+    """
+    滑动窗口限流器（加权计数近似），每个键只需两个计数器
+    """
+    script = None
+
+    def hit(self, key: str, limit: int, period: int) -> Tuple[bool, float]:
+        """
+        记录一次请求
+
+        Args:
+            key: 限流键
+            limit: 窗口内最大请求数
+            period: 窗口长度（秒）
+
+        Returns:
+            tuple: (是否允许, 需等待秒数)
+        """
+        client = get_redis_client()
+        if client is not None:
+            if SlidingWindowLimiter.script is None:
+                SlidingWindowLimiter.script = client.register_script(SLIDING_WINDOW_SCRIPT)
+            allowed, wait_ms = SlidingWindowLimiter.script(
+                keys=[make_cache_key(key)], args=[limit, period * 1000], client=client
+            )
+            return bool(allowed), wait_ms / 1000
+        return self.hit_cache(key, limit, period)
+
+    def hit_cache(self, key: str, limit: int, period: int) -> Tuple[bool, float]:
+        """使用缓存 API 的回退实现"""
+        now = time.time()
+        current_window = int(now // period)
+        curr_key = f'{key}:{current_window}'
+        prev_key = f'{key}:{current_window - 1}'
+        counts = cache.get_many([prev_key, curr_key])
+        prev = counts.get(prev_key, 0)
+        curr = counts.get(curr_key, 0)
+        elapsed = now - current_window * period
+
+        if prev * (period - elapsed) / period + curr + 1 > limit:
+            wait = period - elapsed
+            if curr + 1 <= limit and prev > 0:
+                wait = period - (limit - curr - 1) * period / prev - elapsed
+            return False, wait
+
+        if not cache.add(curr_key, 1, timeout=period * 2):
+            cache.incr(curr_key)
+        return True, 0
+
+
+class TokenBucketLimiter:
+    """
+    令牌桶限流器，允许突发请求，长期速率不超过补充速率
+    """
+    script = None
+
+    def hit(self, key: str, limit: int, period: int, burst: Optional[int] = None) -> Tuple[bool, float]:
+        """
+        消耗一个令牌
+
+        Args:
+            key: 限流键
+            limit: 周期内补充的令牌数
+            period: 周期（秒）
+            burst: 桶容量（默认等于 limit）
+
+        Returns:
+            tuple: (是否允许, 需等待秒数)
+        """
+        capacity = burst or limit
+        refill_ms = period * 1000 / limit
+        client = get_redis_client()
+        if client is not None:
+            if TokenBucketLimiter.script is None:
+                TokenBucketLimiter.script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, wait_ms = TokenBucketLimiter.script(
+                keys=[make_cache_key(key)], args=[capacity, refill_ms], client=client
+            )
+            return bool(allowed), wait_ms / 1000
+        return self.hit_cache(key, capacity, refill_ms)
+
+    def hit_cache(self, key: str, capacity: int, refill_ms: float) -> Tuple[bool, float]:
+        """使用缓存 API 的回退实现"""
+        now = time.time() * 1000
+        bucket = cache.get(key) or {'tokens': capacity, 'ts': now}
+        tokens = min(capacity, bucket['tokens'] + (now - bucket['ts']) / refill_ms)
+
+        allowed = tokens >= 1
+        wait = 0 if allowed else (1 - tokens) * refill_ms / 1000
+        if allowed:
+            tokens -= 1
+        cache.set(key, {'tokens': tokens, 'ts': now}, timeout=math.ceil(capacity * refill_ms / 1000))
+        return allowed, wait
+
+
+LIMITERS = {
+    'sliding_window': SlidingWindowLimiter(),
+    'token_bucket': TokenBucketLimiter(),
+}
+
+
+class ScopedRateThrottle(BaseThrottle):
+    """
+    按作用域配置的限流类
+    作用域取视图的 throttle_scope，未设置时为 default；作用域没有配置规则时不限流
+    """
+    default_scope = 'default'
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scope(self, view) -> str:
+        """获取视图的限流作用域"""
+        return getattr(view, 'throttle_scope', None) or self.default_scope
+
+    def get_rule(self, scope: str) -> Optional[dict]:
+        """获取作用域的限流规则"""
+        return getattr(settings, 'RATE_LIMITS', {}).get(scope)
+
+    def get_identifier(self, request, key_type: str) -> str:
+        """
+        获取限流维度标识
+
+        Args:
+            request: 请求对象
+            key_type: ip 或 user
+
+        Returns:
+            str: 标识
+        """
+        user = getattr(request, 'user', None)
+        if key_type == 'user' and user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view) -> bool:
+        """
+        判断请求是否允许通过
+
+        Args:
+            request: 请求对象
+            view: 视图对象
+
+        Returns:
+            bool: True 表示允许
+        """
+        scope = self.get_scope(view)
+        rule = self.get_rule(scope)
+        if not rule:
+            return True
+
+        limit, period = parse_rate(rule['rate'])
+        identifier = self.get_identifier(request, rule.get('key', 'user'))
+        key = f'ratelimit:{scope}:{identifier}'
+        algorithm = rule.get('algorithm', 'sliding_window')
+
+        try:
+            if algorithm == 'token_bucket':
+                allowed, wait = LIMITERS[algorithm].hit(key, limit, period, burst=rule.get('burst'))
+            else:
+                allowed, wait = LIMITERS[algorithm].hit(key, limit, period)
+        except Exception as e:
+            # 限流存储故障时放行，与缓存 IGNORE_EXCEPTIONS 行为一致
+            logger.warning(f"Rate limit check failed: {str(e)}", extra={'scope': scope})
+            return True
+
+        if not allowed:
+            self.wait_seconds = wait
+            logger.warning(
+                f"Rate limit exceeded: {scope}",
+                extra={'scope': scope, 'identifier': identifier, 'path': request.path},
+            )
+        return allowed
+
+    def wait(self) -> Optional[float]:
+        """返回建议的重试等待秒数（用于 Retry-After 响应头）"""
+        return self.wait_seconds
@@ -0,0 +1,18 @@
+"""
+通用路由
+"""
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import AuditLogViewSet, AuditStatsView, LoginLogViewSet, LoginStatsView
+
+router = DefaultRouter()
+router.register(r'audit-logs', AuditLogViewSet, basename='audit-log')
+router.register(r'login-logs', LoginLogViewSet, basename='login-log')
+
+app_name = 'common'
+
+urlpatterns = [
+    path('log-stats/audit/', AuditStatsView.as_view(), name='audit-stats'),
+    path('log-stats/login/', LoginStatsView.as_view(), name='login-stats'),
+    path('', include(router.urls)),
+]
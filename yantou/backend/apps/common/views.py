@@ -0,0 +1,228 @@
+"""
+通用视图
+操作日志、登录日志查询、导出和统计接口
+"""
+from datetime import timedelta
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.views import APIView
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.translation import gettext_lazy as _
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from .audit import log_audit, set_audit_context
+from .exceptions import ValidationException
+from .export import CONTENT_TYPES, EXPORT_FORMATS, FORMAT_CSV, get_export_filename, stream_export
+from .filters import AuditLogFilter, LoginLogFilter
+from .models import AuditLog, LoginLog
+from .pagination import KeysetCursorPagination
+from .response import APIResponse
+from .rollups import get_audit_stats, get_login_stats
+from .serializers import AuditLogSerializer, LoginLogSerializer
+
+
+class LogCursorPagination(KeysetCursorPagination):
+    """
+    日志游标分页
+    按 (created_at, id) 倒序，游标记录两列的值，created_at 相同的记录由 id 区分，翻页时不会重复或遗漏；
+    与过滤字段的组合索引列顺序一致，任意页都是一次索引范围扫描，不需要 OFFSET 和 COUNT
+    """
+    ordering = ('-created_at', '-id')
+
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter('export_format', OpenApiTypes.STR, enum=EXPORT_FORMATS, description='导出格式，默认 csv'),
+    OpenApiParameter('gzip', OpenApiTypes.BOOL, description='是否 gzip 压缩'),
+]
+
+
+class LogExportMixin:
+    """
+    日志流式导出
+    使用与列表接口相同的过滤条件，按时间正序逐批读取并写出，内存占用与导出行数无关
+    """
+    export_basename = 'logs'
+
+    def export_logs(self, request):
+        export_format = request.query_params.get('export_format', FORMAT_CSV)
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationException(_('不支持的导出格式'))
+        compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by('created_at', 'id')
+        response = StreamingHttpResponse(
+            stream_export(queryset, export_format, compress),
+            content_type='application/gzip' if compress else CONTENT_TYPES[export_format]
+        )
+        filename = get_export_filename(self.export_basename, export_format, compress)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+        audit_fields = {
+            'action': 'export',
+            'resource_type': self.export_basename,
+            'description': f'导出 {export_format} 文件',
+        }
+        if not set_audit_context(**audit_fields):
+            log_audit(request=request, **audit_fields)
+        return response
+
+
+class AuditLogViewSet(LogExportMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    操作日志查询视图集
+    """
+    queryset = AuditLog.objects.all()
+    serializer_class = AuditLogSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = LogCursorPagination
+    throttle_scope = 'admin'
+    # 只允许可由组合索引完成的过滤，不开放搜索和自定义排序
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = AuditLogFilter
+    export_basename = 'audit_logs'
+
+    @extend_schema(
+        tags=['日志'],
+        summary='操作日志列表',
+        description='按用户、操作类型、资源、状态、IP 和时间范围查询操作日志，可用 q 在描述、路径、资源名称、请求参数中检索关键字，游标分页。只有管理员可以访问。'
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        tags=['日志'],
+        summary='操作日志详情',
+        description='获取操作日志详细信息'
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return APIResponse.success(data=self.get_serializer(self.get_object()).data)
+
+    @extend_schema(
+        tags=['日志'],
+        summary='导出操作日志',
+        description='按列表接口的过滤条件流式导出操作日志（CSV 或 NDJSON，可选 gzip 压缩）',
+        parameters=EXPORT_PARAMETERS,
+        responses={200: OpenApiTypes.BINARY}
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        return self.export_logs(request)
+
+
+class LoginLogViewSet(LogExportMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    登录日志查询视图集
+    """
+    queryset = LoginLog.objects.all()
+    serializer_class = LoginLogSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = LogCursorPagination
+    throttle_scope = 'admin'
+    # 只允许可由组合索引完成的过滤，不开放搜索和自定义排序
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = LoginLogFilter
+    export_basename = 'login_logs'
+
+    @extend_schema(
+        tags=['日志'],
+        summary='登录日志列表',
+        description='按用户、登录类型、状态、IP 和时间范围查询登录日志，游标分页。只有管理员可以访问。'
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        tags=['日志'],
+        summary='登录日志详情',
+        description='获取登录日志详细信息'
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return APIResponse.success(data=self.get_serializer(self.get_object()).data)
+
+    @extend_schema(
+        tags=['日志'],
+        summary='导出登录日志',
+        description='按列表接口的过滤条件流式导出登录日志（CSV 或 NDJSON，可选 gzip 压缩）',
+        parameters=EXPORT_PARAMETERS,
+        responses={200: OpenApiTypes.BINARY}
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        return self.export_logs(request)
+
+
+# 统计接口单次查询的最大天数
+STATS_MAX_DAYS = 366
+
+STATS_PARAMETERS = [
+    OpenApiParameter('start', OpenApiTypes.DATE, description='开始日期（含），默认 30 天前'),
+    OpenApiParameter('end', OpenApiTypes.DATE, description='结束日期（含），默认今天'),
+]
+
+
+def get_stats_range(request):
+    """
+    解析统计接口的日期范围
+
+    Returns:
+        tuple: (开始日期, 结束日期)
+    """
+    today = timezone.localdate()
+    try:
+        end = parse_date(request.query_params.get('end') or '') or today
+        start = parse_date(request.query_params.get('start') or '') or end - timedelta(days=29)
+    except ValueError:
+        raise ValidationException(_('日期格式错误'))
+    if start > end:
+        raise ValidationException(_('开始日期不能晚于结束日期'))
+    if (end - start).days >= STATS_MAX_DAYS:
+        raise ValidationException(_('查询范围不能超过 %(days)s 天') % {'days': STATS_MAX_DAYS})
+    return start, end
+
+
+class AuditStatsView(APIView):
+    """
+    操作日志统计视图
+    只读按天汇总表，不扫描日志表
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    throttle_scope = 'admin'
+
+    @extend_schema(
+        tags=['日志'],
+        summary='操作日志统计',
+        description='按天、操作类型、资源类型统计事件数，以及不同用户数（HyperLogLog 估计值）。只有管理员可以访问。',
+        parameters=STATS_PARAMETERS
+    )
+    def get(self, request):
+        start, end = get_stats_range(request)
+        return APIResponse.success(data=get_audit_stats(start, end))
+
+
+class LoginStatsView(APIView):
+    """
+    登录日志统计视图
+    只读按天汇总表，不扫描日志表
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    throttle_scope = 'admin'
+
+    @extend_schema(
+        tags=['日志'],
+        summary='登录日志统计',
+        description='按天统计登录成功、失败次数，失败最多的 IP 和用户名，以及不同 IP 数、不同用户数（HyperLogLog 估计值）。只有管理员可以访问。',
+        parameters=STATS_PARAMETERS + [
+            OpenApiParameter('top', OpenApiTypes.INT, description='失败最多的 IP、用户名返回的条数，默认 10，最大 100'),
+        ]
+    )
+    def get(self, request):
+        start, end = get_stats_range(request)
+        try:
+            top = min(max(int(request.query_params.get('top', 10)), 1), 100)
+        except ValueError:
+            raise ValidationException(_('top 必须是整数'))
+        return APIResponse.success(data=get_login_stats(start, end, top))
@@ -10,3 +10,6 @@ class PermissionsConfig(BaseAppConfig):
     label = 'apps_permissions'  # 明确指定应用标签
     verbose_name = '权限管理'
 
+    def ready(self):
+        """注册信号处理"""
+        from . import signals  # noqa: F401
@@ -0,0 +1,74 @@
+"""
+权限信号处理
+角色分配、角色权限、角色、权限变更后，清除受影响用户的权限缓存并递增其权限代数，
+按权限代数缓存的权限代码集合和用户快照随之失效（网关鉴权等直接读取缓存的地方立即生效）
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .models import Permission, Role, RolePermission, UserRole
+from .utils import clear_permission_cache, get_role_user_ids
+
+
+def clear_permission_cache_for(user_ids):
+    """
+    清除用户的权限缓存
+    事务提交后再清除一次，避免其他请求在提交前用旧数据重建缓存
+
+    Args:
+        user_ids: 用户 ID 集合
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    def clear():
+        for user_id in user_ids:
+            clear_permission_cache(user_id)
+
+    clear()
+    transaction.on_commit(clear)
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def clear_cache_on_user_role_change(sender, instance, **kwargs):
+    """分配、修改、撤销用户角色后清除该用户的权限缓存"""
+    clear_permission_cache_for({instance.user_id})
+
+
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+def clear_cache_on_role_permission_change(sender, instance, **kwargs):
+    """角色授予或移除权限后清除拥有该角色的用户的权限缓存"""
+    clear_permission_cache_for(get_role_user_ids([instance.role_id]))
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def clear_cache_on_role_change(sender, instance, **kwargs):
+    """角色修改（启用、停用、软删除）或删除后清除拥有该角色的用户的权限缓存"""
+    clear_permission_cache_for(get_role_user_ids([instance.pk]))
+
+
+@receiver(post_save, sender=Permission)
+def clear_cache_on_permission_change(sender, instance, created, **kwargs):
+    """权限修改（代码、启用状态）后清除拥有该权限的用户的权限缓存"""
+    if created:
+        return
+    role_ids = RolePermission.objects.filter(permission=instance).values_list('role_id', flat=True)
+    clear_permission_cache_for(get_role_user_ids(list(role_ids)))
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def clear_cache_on_role_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """通过 role.permissions.add/remove/clear 修改角色权限后清除受影响用户的权限缓存"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        role_ids = [instance.pk]
+    elif pk_set is not None:
+        role_ids = list(pk_set)
+    else:
+        role_ids = list(RolePermission.objects.filter(permission=instance).values_list('role_id', flat=True))
+    clear_permission_cache_for(get_role_user_ids(role_ids))
@@ -6,6 +6,7 @@ from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.db import models
+from utils.helpers import incr_cache_counter
 from .models import Role, Permission, UserRole, RolePermission
 
 
@@ -151,6 +152,40 @@ def check_user_permission(user, permission_code, use_cache=True):
     return permissions.filter(code=permission_code).exists()
 
 
+def get_user_permission_codes(user, use_cache=True):
+    """
+    获取用户的权限代码集合
+    缓存键包含权限代数，权限变更后自动使用新的缓存键，无需显式删除
+
+    Args:
+        user: 用户对象（带 perm_generation 属性时直接使用，避免再读取一次权限代数）
+        use_cache: 是否使用缓存
+
+    Returns:
+        frozenset: 权限代码集合
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    generation = getattr(user, 'perm_generation', None)
+    if generation is None:
+        generation = get_permission_generation(user.id)
+    cache_key = f'user_permission_codes:{user.id}:{generation}'
+
+    if use_cache:
+        cached_codes = cache.get(cache_key)
+        if cached_codes is not None:
+            return cached_codes
+
+    codes = frozenset(get_user_permissions(user, use_cache=use_cache).values_list('code', flat=True))
+
+    # 缓存结果（5分钟）
+    if use_cache:
+        cache.set(cache_key, codes, 300)
+
+    return codes
+
+
 def clear_user_permission_cache(user):
     """
     清除用户的权限缓存
@@ -158,8 +193,67 @@ def clear_user_permission_cache(user):
     Args:
         user: 用户对象
     """
-    cache.delete(f'user_roles:{user.id}')
-    cache.delete(f'user_permissions:{user.id}')
+    clear_permission_cache(user.id)
+
+
+def clear_permission_cache(user_id):
+    """
+    按用户 ID 清除权限缓存，并递增权限代数
+
+    Args:
+        user_id: 用户 ID
+    """
+    cache.delete_many([f'user_roles:{user_id}', f'user_permissions:{user_id}'])
+    bump_permission_generation(user_id)
+
+
+def get_role_user_ids(role_ids):
+    """
+    获取拥有指定角色的用户 ID（包括未激活、已过期的分配，权限变更时一并失效）
+
+    Args:
+        role_ids: 角色 ID 列表
+
+    Returns:
+        set: 用户 ID 集合
+    """
+    return set(UserRole.objects.filter(role_id__in=role_ids).values_list('user_id', flat=True))
+
+
+def get_permission_generation_key(user_id) -> str:
+    """获取用户权限代数缓存键"""
+    return f'user_perm_generation:{user_id}'
+
+
+def get_permission_generation(user_id) -> int:
+    """
+    获取用户权限代数
+    每次用户权限变更时递增，可用于校验依赖权限的缓存是否过期
+    
+    Args:
+        user_id: 用户 ID
+        
+    Returns:
+        int: 权限代数，未变更过时为 0
+    """
+    return cache.get(get_permission_generation_key(user_id), 0)
+
+
+def bump_permission_generation(user_id) -> int:
+    """
+    递增用户权限代数，并使用户快照失效
+    
+    Args:
+        user_id: 用户 ID
+        
+    Returns:
+        int: 递增后的权限代数
+    """
+    from apps.auth.user_cache import invalidate_user_snapshot
+
+    generation = incr_cache_counter(get_permission_generation_key(user_id))
+    invalidate_user_snapshot(user_id)
+    return generation
 
 
 def clear_all_permission_cache():
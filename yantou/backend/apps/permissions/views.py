@@ -29,6 +29,7 @@ class PermissionViewSet(viewsets.ModelViewSet):
     queryset = Permission.objects.all()
     permission_classes = [IsAuthenticated, IsAdminUser]
     pagination_class = CustomPageNumberPagination
+    throttle_scope = 'admin'
     filterset_fields = ['content_type', 'action', 'parent', 'is_active']
     search_fields = ['name', 'code', 'description']
     ordering_fields = ['sort_order', 'created_at']
@@ -181,6 +182,7 @@ class RoleViewSet(viewsets.ModelViewSet):
     queryset = Role.objects.filter(is_deleted=False)
     permission_classes = [IsAuthenticated, IsAdminUser]
     pagination_class = CustomPageNumberPagination
+    throttle_scope = 'admin'
     filterset_fields = ['is_active', 'is_system']
     search_fields = ['name', 'code', 'description']
     ordering_fields = ['sort_order', 'created_at']
@@ -488,6 +490,7 @@ class UserRoleViewSet(viewsets.ModelViewSet):
     serializer_class = UserRoleSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
     pagination_class = CustomPageNumberPagination
+    throttle_scope = 'admin'
     filterset_fields = ['user', 'role', 'is_active']
     ordering_fields = ['assigned_at']
     ordering = ['-assigned_at']
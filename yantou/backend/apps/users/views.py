@@ -12,6 +12,7 @@ from drf_spectacular.types import OpenApiTypes
 from apps.common.response import APIResponse
 from apps.common.exceptions import NotFoundException, PermissionException, ValidationException
 from apps.permissions.permissions import PermissionRequired
+from apps.auth.sessions import revoke_user_sessions
 from apps.common.pagination import CustomPageNumberPagination
 from .models import UserProfile, Department
 from .serializers import (
@@ -38,6 +39,7 @@ class DepartmentViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, PermissionRequired]
     required_permissions = ['department:read']
     pagination_class = CustomPageNumberPagination
+    throttle_scope = 'admin'
     filterset_fields = ['parent', 'level', 'is_active']
     search_fields = ['name', 'code', 'description']
     ordering_fields = ['sort_order', 'created_at']
@@ -195,6 +197,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.select_related('profile', 'profile__department').all()
     permission_classes = [IsAuthenticated, UserPermission]
     pagination_class = CustomPageNumberPagination
+    throttle_scope = 'admin'
     filterset_class = UserFilter
     search_fields = ['username', 'email', 'first_name', 'last_name']
     ordering_fields = ['date_joined', 'last_login', 'username']
@@ -504,6 +507,9 @@ class UserViewSet(viewsets.ModelViewSet):
         user = self.get_object()
         user.is_active = not user.is_active
         user.save()
+        if not user.is_active:
+            # 禁用用户时吊销其所有会话，已签发的 Token 立即失效
+            revoke_user_sessions(user.pk)
         
         action = _('激活') if user.is_active else _('禁用')
         logger.info(f'用户{action}成功: {user.username}', extra={
@@ -122,8 +122,15 @@ AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
+    {
+        # 本地泄露密码库校验，索引文件由 build_breached_password_index 命令生成，文件不存在时不校验
+        'NAME': 'apps.auth.password_validation.BreachedPasswordValidator',
+    },
 ]
 
+# 泄露密码索引文件路径
+BREACHED_PASSWORD_INDEX_PATH = config('BREACHED_PASSWORD_INDEX_PATH', default=str(BASE_DIR / 'data' / 'breached_passwords.idx'))
+
 # 密码策略配置
 PASSWORD_MIN_LENGTH = 8  # 最小长度
 PASSWORD_REQUIRE_UPPERCASE = True  # 要求大写字母
@@ -160,6 +167,22 @@ LOCALE_PATHS = [
 LOGIN_MAX_ATTEMPTS = config('LOGIN_MAX_ATTEMPTS', default=5, cast=int)  # 最大失败次数
 LOGIN_LOCKOUT_DURATION = config('LOGIN_LOCKOUT_DURATION', default=900, cast=int)  # 锁定持续时间（秒，默认15分钟）
 LOGIN_WINDOW_DURATION = config('LOGIN_WINDOW_DURATION', default=3600, cast=int)  # 时间窗口（秒，默认1小时）
+# 接口限流（apps.common.throttling），视图通过 throttle_scope 指定作用域，未指定时使用 default
+# key: ip 按客户端 IP，user 按用户（匿名用户按 IP）；algorithm: sliding_window（默认）或 token_bucket
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMITS = {
+    'default': {'rate': '1000/hour', 'key': 'user'},
+    'register': {'rate': '10/hour', 'key': 'ip'},
+    'login': {'rate': '20/min', 'key': 'ip'},
+    'captcha': {'rate': '30/min', 'key': 'ip'},
+    'username_check': {'rate': '60/min', 'key': 'ip'},
+    'token_refresh': {'rate': '30/min', 'key': 'ip', 'algorithm': 'token_bucket', 'burst': 10},
+    'admin': {'rate': '300/min', 'key': 'user'},
+} if RATE_LIMIT_ENABLED else {}
+
+# 设备指纹
+DEVICE_FINGERPRINT_MAX_DEVICES = config('DEVICE_FINGERPRINT_MAX_DEVICES', default=10, cast=int)  # 每个用户最多记录的设备数
+DEVICE_FINGERPRINT_TTL = config('DEVICE_FINGERPRINT_TTL', default=86400 * 30, cast=int)  # 设备未使用的过期时间（秒，默认30天）
 
 # 静态文件
 STATIC_URL = '/static/'
@@ -178,12 +201,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework 配置
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # JWT 认证
+        'apps.auth.authentication.CachedJWTAuthentication',  # JWT 认证（用户快照缓存）
         'rest_framework.authentication.SessionAuthentication',  # Session 认证（备用）
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'apps.common.throttling.ScopedRateThrottle',  # 按 RATE_LIMITS 作用域限流
+    ],
     'DEFAULT_PAGINATION_CLASS': 'apps.common.pagination.CustomPageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -279,7 +305,7 @@ SIMPLE_JWT = {
     ),
     'ROTATE_REFRESH_TOKENS': True,  # 刷新 Token 时生成新的 Refresh Token
     'BLACKLIST_AFTER_ROTATION': True,  # 刷新后加入黑名单
-    'UPDATE_LAST_LOGIN': True,
+    'UPDATE_LAST_LOGIN': True,  # 登录和刷新时更新最后登录时间（缓冲后批量写入，见 LAST_LOGIN_FLUSH_INTERVAL）
     
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
@@ -302,52 +328,80 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# JWT Token 状态存储后端（database: token_blacklist 表, cache: Redis，按 jti 存储并随 Token 过期自动清除）
+JWT_TOKEN_STATE_BACKEND = config('JWT_TOKEN_STATE_BACKEND', default='database')
+
+# 最后登录时间批量写入：刷新间隔（秒，0 表示同步写入）；同一用户在粒度时间（秒）内的重复登录只记录一次
+LAST_LOGIN_FLUSH_INTERVAL = config('LAST_LOGIN_FLUSH_INTERVAL', default=5, cast=float)
+LAST_LOGIN_GRANULARITY = config('LAST_LOGIN_GRANULARITY', default=60, cast=int)
+
+# 认证用户快照缓存时间（秒），用户保存、删除或权限变更时自动失效
+USER_SNAPSHOT_TIMEOUT = config('USER_SNAPSHOT_TIMEOUT', default=300, cast=int)
+
+# Access Token 吊销过滤器（进程内布隆过滤器）
+# 容量为一个 Access Token 有效期内的最大吊销数，同步间隔为其他进程感知吊销的最大延迟（秒）
+ACCESS_REVOCATION_FILTER_CAPACITY = config('ACCESS_REVOCATION_FILTER_CAPACITY', default=50000, cast=int)
+ACCESS_REVOCATION_FILTER_ERROR_RATE = config('ACCESS_REVOCATION_FILTER_ERROR_RATE', default=0.001, cast=float)
+ACCESS_REVOCATION_SYNC_INTERVAL = config('ACCESS_REVOCATION_SYNC_INTERVAL', default=1, cast=float)
+
+# 审计日志异步批量写入（apps/common/audit_writer.py）
+# 刷新间隔（秒，0 表示同步写入）；每批写入条数（队列达到该数量时立即写入）；队列容量；
+# 队列已满时的处理策略（drop: 丢弃, spill: 写入本地缓冲文件，稍后回放）；
+# 本地缓冲文件路径前缀（按进程 ID 区分，数据库写入失败的日志也写入该文件）；每次写入缓冲文件后是否 fsync
+AUDIT_WRITER_FLUSH_INTERVAL = config('AUDIT_WRITER_FLUSH_INTERVAL', default=1, cast=float)
+AUDIT_WRITER_BATCH_SIZE = config('AUDIT_WRITER_BATCH_SIZE', default=500, cast=int)
+AUDIT_WRITER_QUEUE_SIZE = config('AUDIT_WRITER_QUEUE_SIZE', default=10000, cast=int)
+AUDIT_WRITER_OVERFLOW = config('AUDIT_WRITER_OVERFLOW', default='drop')
+AUDIT_WRITER_SPOOL_PATH = config('AUDIT_WRITER_SPOOL_PATH', default=str(BASE_DIR / 'logs' / 'audit_spool'))
+AUDIT_WRITER_SPOOL_FSYNC = config('AUDIT_WRITER_SPOOL_FSYNC', default=False, cast=bool)
+
+# 登录日志补全（apps/common/enrichment.py）：写入前由写入线程解析 User-Agent、查询登录地点
+# 是否启用；离线 IP 地址库文件（python manage.py build_ip_database 编译，不存在时不补全登录地点）
+LOGIN_LOG_ENRICH = config('LOGIN_LOG_ENRICH', default=True, cast=bool)
+IP_DATABASE_PATH = config('IP_DATABASE_PATH', default=str(BASE_DIR / 'data' / 'ip_location.db'))
+
+# 成功的查看（GET）请求的操作日志记录策略（apps/common/audit_policy.py），创建、修改、删除和失败的请求始终逐条记录
+# 策略：full 逐条记录；sample:N 按 N% 采样；aggregate 按 (用户, 资源, 分钟) 聚合为一条日志
+# AUDIT_VIEW_POLICIES 按路径前缀配置（最长前缀优先），未匹配时使用默认策略；聚合计数的写入间隔（秒，0 表示不聚合）
+AUDIT_VIEW_DEFAULT_POLICY = config('AUDIT_VIEW_DEFAULT_POLICY', default='aggregate')
+AUDIT_VIEW_POLICIES = {
+    # 查看审计日志本身需要逐条留痕
+    '/api/v1/audit-logs/': 'full',
+    '/api/v1/login-logs/': 'full',
+}
+AUDIT_VIEW_AGGREGATE_INTERVAL = config('AUDIT_VIEW_AGGREGATE_INTERVAL', default=60, cast=float)
+
+# 不记录请求日志和操作日志的路径前缀（网关鉴权接口每个内部请求都会调用一次）
+REQUEST_LOGGING_EXEMPT_PATHS = ['/gateway/auth/']
+
+# 过期数据清理（python manage.py purge_expired_data）
+# 日志保留天数（0 表示永久保留）；每批删除的记录数；批次之间的休眠时间（秒，降低主从复制延迟）
+LOGIN_LOG_RETENTION_DAYS = config('LOGIN_LOG_RETENTION_DAYS', default=90, cast=int)
+AUDIT_LOG_RETENTION_DAYS = config('AUDIT_LOG_RETENTION_DAYS', default=180, cast=int)
+PURGE_BATCH_SIZE = config('PURGE_BATCH_SIZE', default=1000, cast=int)
+PURGE_BATCH_SLEEP = config('PURGE_BATCH_SLEEP', default=0.1, cast=float)
+
+# 日志表按月分区（仅 PostgreSQL，python manage.py manage_log_partitions）：提前创建的分区月数
+LOG_PARTITION_MONTHS_AHEAD = config('LOG_PARTITION_MONTHS_AHEAD', default=3, cast=int)
+
+# 操作日志冷归档（python manage.py archive_audit_logs，查询用 query_audit_archive）
+# 是否启用（启用后 purge_expired_data、manage_log_partitions 不再按 AUDIT_LOG_RETENTION_DAYS 删除操作日志）；
+# 数据库中保留的月数（更早的整月数据归档后删除）；归档目录（可挂载对象存储）；每个压缩块的行数
+AUDIT_ARCHIVE_ENABLED = config('AUDIT_ARCHIVE_ENABLED', default=False, cast=bool)
+AUDIT_ARCHIVE_AFTER_MONTHS = config('AUDIT_ARCHIVE_AFTER_MONTHS', default=6, cast=int)
+AUDIT_ARCHIVE_DIR = config('AUDIT_ARCHIVE_DIR', default=str(BASE_DIR / 'archive' / 'audit_logs'))
+AUDIT_ARCHIVE_BLOCK_ROWS = config('AUDIT_ARCHIVE_BLOCK_ROWS', default=2000, cast=int)
+
+# 日志流式导出（/api/v1/audit-logs/export/、python manage.py export_logs）：服务端游标每批读取的行数
+LOG_EXPORT_CHUNK_SIZE = config('LOG_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# 用户名可用性过滤器（进程内布隆过滤器）
+# 后台线程增量拉取新用户和改名的间隔（秒，其他进程注册或改名的用户名最多延迟这么久被感知）；全量重建间隔（秒，清除已删除的用户名）
+USERNAME_FILTER_REFRESH_INTERVAL = config('USERNAME_FILTER_REFRESH_INTERVAL', default=5, cast=float)
+USERNAME_FILTER_REBUILD_INTERVAL = config('USERNAME_FILTER_REBUILD_INTERVAL', default=3600, cast=float)
+
 # 日志配置
-import json
-import logging
-
-class JSONFormatter(logging.Formatter):
-    """
-    JSON 格式化器
-    将日志记录格式化为 JSON 格式，便于日志聚合和分析
-    """
-    def format(self, record):
-        """
-        格式化日志记录为 JSON
-        
-        Args:
-            record: 日志记录对象
-            
-        Returns:
-            str: JSON 格式的日志字符串
-        """
-        log_data = {
-            'timestamp': self.formatTime(record, self.datefmt),
-            'level': record.levelname,
-            'logger': record.name,
-            'message': record.getMessage(),
-            'module': record.module,
-            'function': record.funcName,
-            'line': record.lineno,
-        }
-        
-        # 添加请求 ID（如果存在）
-        if hasattr(record, 'request_id'):
-            log_data['request_id'] = record.request_id
-        
-        # 添加错误 ID（如果存在）
-        if hasattr(record, 'error_id'):
-            log_data['error_id'] = record.error_id
-        
-        # 添加异常信息（如果存在）
-        if record.exc_info:
-            log_data['exception'] = self.formatException(record.exc_info)
-        
-        # 添加额外字段（如果存在）
-        if hasattr(record, 'extra_data'):
-            log_data.update(record.extra_data)
-        
-        return json.dumps(log_data, ensure_ascii=False)
+from utils.log_handlers import JSONFormatter
 
 # 日志格式配置
 USE_JSON_LOGGING = config('USE_JSON_LOGGING', default=False, cast=bool)
@@ -356,6 +410,12 @@ USE_JSON_LOGGING = config('USE_JSON_LOGGING', default=False, cast=bool)
 LOG_DIR = BASE_DIR / 'logs'
 LOG_DIR.mkdir(exist_ok=True)
 
+# 日志由后台线程写入（utils/log_handlers.py），请求线程只入队：队列容量（队列满时丢弃新日志，不阻塞请求）
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+# 日志文件不在进程内轮转（多个 worker 各自轮转同一文件会互相覆盖），由 logrotate 等外部工具轮转；
+# 设为 True 时每个进程写自己的文件（django.<进程 ID>.log）
+LOG_FILE_PER_PROCESS = config('LOG_FILE_PER_PROCESS', default=False, cast=bool)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -380,53 +440,62 @@ LOGGING = {
         },
         # 业务日志文件处理器
         'file': {
-            'class': 'logging.handlers.RotatingFileHandler',
+            '()': 'utils.log_handlers.ProcessSafeFileHandler',
             'filename': LOG_DIR / 'django.log',
-            'maxBytes': 1024 * 1024 * 10,  # 10MB
-            'backupCount': 10,
+            'per_process': LOG_FILE_PER_PROCESS,
             'formatter': 'json' if USE_JSON_LOGGING else 'verbose',
             'encoding': 'utf-8',
         },
         # 错误日志文件处理器
         'error_file': {
-            'class': 'logging.handlers.RotatingFileHandler',
+            '()': 'utils.log_handlers.ProcessSafeFileHandler',
             'filename': LOG_DIR / 'django_error.log',
-            'maxBytes': 1024 * 1024 * 10,  # 10MB
-            'backupCount': 10,
+            'per_process': LOG_FILE_PER_PROCESS,
             'formatter': 'json' if USE_JSON_LOGGING else 'verbose',
             'level': 'ERROR',
             'encoding': 'utf-8',
         },
+        # 队列处理器：记录器只写入队列，由后台线程转交给 targets 中的处理器
+        'queue': {
+            '()': 'utils.log_handlers.QueueLoggingHandler',
+            'targets': ['console', 'file'],
+            'queue_size': LOG_QUEUE_SIZE,
+        },
+        'error_queue': {
+            '()': 'utils.log_handlers.QueueLoggingHandler',
+            'targets': ['console', 'error_file'],
+            'queue_size': LOG_QUEUE_SIZE,
+        },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': config('LOG_LEVEL', default='INFO'),
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': config('LOG_LEVEL', default='INFO'),
             'propagate': False,
         },
         'django.request': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'django.exception': {
-            'handlers': ['console', 'error_file'],
+            'handlers': ['error_queue'],
             'level': 'ERROR',
             'propagate': False,
         },
         # 业务日志记录器
         'django.business': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         # 审计日志记录器（用于记录审计日志保存失败的情况）
         'django.audit': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'ERROR',
             'propagate': False,
         },
@@ -467,7 +536,7 @@ SPECTACULAR_SETTINGS = {
     'DEFAULT_GENERATOR_CLASS': 'drf_spectacular.generators.SchemaGenerator',
     # 支持 JWT 认证
     'AUTHENTICATION_WHITELIST': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.auth.authentication.CachedJWTAuthentication',
     ],
     'APPEND_COMPONENTS': {
         'securitySchemes': {
@@ -85,24 +85,28 @@ LOGGING = {
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.handlers.RotatingFileHandler',
+            '()': 'utils.log_handlers.ProcessSafeFileHandler',
             'filename': BASE_DIR / 'logs' / 'django.log',
-            'maxBytes': 1024 * 1024 * 10,  # 10MB
-            'backupCount': 10,
+            'per_process': LOG_FILE_PER_PROCESS,
             'formatter': 'verbose',
         },
         'console': {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
+        'queue': {
+            '()': 'utils.log_handlers.QueueLoggingHandler',
+            'targets': ['file', 'console'],
+            'queue_size': LOG_QUEUE_SIZE,
+        },
     },
     'root': {
-        'handlers': ['file', 'console'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['file', 'console'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -14,6 +14,16 @@ DATABASES = {
     }
 }
 
+# 测试环境禁用接口限流
+RATE_LIMITS = {}
+
+# 测试环境同步写入最后登录时间
+LAST_LOGIN_FLUSH_INTERVAL = 0
+
+# 测试环境同步写入审计日志
+AUDIT_WRITER_FLUSH_INTERVAL = 0
+AUDIT_VIEW_AGGREGATE_INTERVAL = 0
+
 # 测试环境禁用密码验证
 AUTH_PASSWORD_VALIDATORS = []
 
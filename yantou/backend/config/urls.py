@@ -4,12 +4,14 @@ URL configuration for config project.
 主 URL 路由配置，包含：
 - Admin 后台路由
 - API 版本路由
+- 网关鉴权路由（nginx auth_request，不经过 /api/ 的请求日志和操作日志）
 - 静态文件和媒体文件路由（开发环境）
 """
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from apps.auth.gateway import gateway_auth
 
 # Admin 后台配置
 admin.site.site_header = '企业级应用管理系统'
@@ -25,6 +27,9 @@ urlpatterns = [
     
     # 健康检查路由（可选）
     path('health/', include('config.urls_health')),
+    
+    # 网关鉴权路由（供 nginx auth_request 调用）
+    path('gateway/auth/', gateway_auth, name='gateway-auth'),
 ]
 
 # 静态文件和媒体文件路由（仅开发环境）
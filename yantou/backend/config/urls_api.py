@@ -14,6 +14,9 @@ urlpatterns = [
     # 权限管理路由
     path('', include('apps.permissions.urls')),
     
+    # 日志查询路由
+    path('', include('apps.common.urls')),
+    
     # 健康检查
     path('health/', include('config.urls_health')),
 ]
@@ -7,6 +7,8 @@ from django.urls import path
 from django.db import connection
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.types import OpenApiTypes
+from apps.common.audit_writer import audit_writer
+from apps.common.spool import get_spool_stats
 
 @extend_schema(
     tags=['系统'],
@@ -19,6 +21,7 @@ from drf_spectacular.types import OpenApiTypes
                 {
                     'status': 'ok',
                     'database': 'ok',
+                    'audit_spool': {'files': 0, 'bytes': 0, 'lag_seconds': 0},
                     'service': 'yantou-backend'
                 }
             ]
@@ -31,7 +34,7 @@ from drf_spectacular.types import OpenApiTypes
 def health_check(request):
     """
     健康检查接口
-    检查数据库连接状态
+    检查数据库连接状态，并返回审计日志本地缓冲文件的积压（不影响状态码）
     """
     try:
         # 检查数据库连接
@@ -43,9 +46,11 @@ def health_check(request):
     
     status_code = 200 if db_status == "ok" else 503
     
+    # 缓冲文件积压：bytes 持续增长或 lag_seconds 持续变大说明数据库写入失败或回放未跟上
     return JsonResponse({
         'status': 'ok' if db_status == "ok" else 'error',
         'database': db_status,
+        'audit_spool': get_spool_stats(audit_writer.get_spool_base()),
         'service': 'yantou-backend',
     }, status=status_code)
 
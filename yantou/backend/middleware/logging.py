@@ -2,7 +2,9 @@
 请求日志中间件
 记录所有 HTTP 请求的详细信息
 支持结构化日志（JSON 格式）
-同时记录操作日志（AuditLog）
+同时记录操作日志（AuditLog），并在请求结束时提交请求中缓冲的失败日志
+每个请求只记录一条操作日志，视图通过 set_audit_context 补充的字段（资源 ID、名称、描述等）合并到这条记录中
+成功的查看（GET）请求按 apps/common/audit_policy.py 中的路由策略逐条记录、采样或聚合
 """
 import time
 import json
@@ -26,23 +28,69 @@ class RequestLoggingMiddleware(MiddlewareMixin):
     
     def process_request(self, request):
         """处理请求前"""
+        if self._is_exempt(request):
+            return None
+        
         # 记录请求开始时间
         request._start_time = time.time()
+        
+        # 开始请求级审计日志缓冲（失败日志在请求事务结束后提交）
+        from apps.common.audit import begin_audit_buffer
+        begin_audit_buffer()
         return None
     
     def process_response(self, request, response):
         """处理响应后"""
+        # 豁免路径（如网关鉴权接口）不记录请求日志和操作日志
+        if self._is_exempt(request):
+            return response
+        
         # 计算执行时间
         if hasattr(request, '_start_time'):
             execution_time = (time.time() - request._start_time) * 1000  # 转换为毫秒
         else:
             execution_time = 0
         
+        # 根据状态码选择日志级别
+        status_code = response.status_code
+        if status_code >= 500:
+            level = logging.ERROR
+        elif status_code >= 400:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        
+        # 日志级别未启用时不构建日志记录
+        if logger.isEnabledFor(level):
+            self._log_request(request, status_code, level, execution_time)
+        
+        # 记录操作日志（AuditLog）
+        # 只记录 API 请求（排除静态文件、健康检查等）；视图补充了日志字段时始终记录
+        from apps.common.audit import pop_audit_context
+        audit_context = pop_audit_context()
+        if audit_context or self._should_log_audit(request, response):
+            self._log_audit(request, response, execution_time, audit_context)
+        
+        # 提交请求中缓冲的失败日志（ATOMIC_REQUESTS 事务此时已结束，不会随业务回滚）
+        from apps.common.audit import flush_audit_buffer
+        flush_audit_buffer()
+        
+        return response
+    
+    def _log_request(self, request, status_code, level, execution_time):
+        """
+        记录请求日志
+        
+        Args:
+            request: Django request 对象
+            status_code: 响应状态码
+            level: 日志级别
+            execution_time: 执行时间（毫秒）
+        """
         # 获取请求信息
         method = request.method
         path = request.path
         query_params = request.GET.dict()
-        status_code = response.status_code
         
         # 获取客户端 IP
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -73,7 +121,7 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         # 创建日志记录，添加额外字段
         log_record = logging.LogRecord(
             name=logger.name,
-            level=logging.INFO,
+            level=level,
             pathname='',
             lineno=0,
             msg='HTTP Request',
@@ -82,25 +130,19 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         )
         log_record.request_id = request_id
         log_record.extra_data = log_data
+        logger.handle(log_record)
+    
+    def _is_exempt(self, request):
+        """
+        判断请求路径是否豁免日志记录
         
-        # 根据状态码选择日志级别
-        if status_code >= 500:
-            log_record.levelno = logging.ERROR
-            log_record.levelname = 'ERROR'
-            logger.handle(log_record)
-        elif status_code >= 400:
-            log_record.levelno = logging.WARNING
-            log_record.levelname = 'WARNING'
-            logger.handle(log_record)
-        else:
-            logger.handle(log_record)
-        
-        # 记录操作日志（AuditLog）
-        # 只记录 API 请求（排除静态文件、健康检查等）
-        if self._should_log_audit(request, response):
-            self._log_audit(request, response, execution_time)
-        
-        return response
+        Args:
+            request: Django request 对象
+            
+        Returns:
+            bool: 是否豁免
+        """
+        return request.path.startswith(tuple(getattr(settings, 'REQUEST_LOGGING_EXEMPT_PATHS', ())))
     
     def _should_log_audit(self, request, response):
         """
@@ -136,7 +178,7 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         
         return True
     
-    def _log_audit(self, request, response, execution_time):
+    def _log_audit(self, request, response, execution_time, audit_context=None):
         """
         记录操作日志
         
@@ -144,6 +186,7 @@ class RequestLoggingMiddleware(MiddlewareMixin):
             request: Django request 对象
             response: Django response 对象
             execution_time: 执行时间（毫秒）
+            audit_context: 视图补充的日志字段（覆盖从请求推断的字段）
         """
         try:
             from apps.common.audit import log_audit
@@ -185,17 +228,36 @@ class RequestLoggingMiddleware(MiddlewareMixin):
                 except (ValueError, IndexError):
                     pass
             
+            fields = {
+                'action': action,
+                'resource_type': resource_type,
+                'resource_id': resource_id,
+                'resource_name': resource_name,
+                'description': f"{method} {request.path}",
+                'error_message': error_message,
+            }
+            fields.update({key: value for key, value in (audit_context or {}).items() if value is not None})
+            
+            # 成功的查看请求按路由策略采样或聚合（视图明确要求记录的除外），其他请求始终逐条记录
+            if fields['action'] == 'view' and status == 1 and not audit_context:
+                from apps.common.audit_policy import (
+                    POLICY_AGGREGATE, POLICY_SAMPLE, get_view_policy, sample_weight, should_sample, view_aggregator
+                )
+                policy, percent = get_view_policy(request.path)
+                if policy == POLICY_AGGREGATE:
+                    view_aggregator.add(request, resource_type, resource_id, int(execution_time))
+                    return
+                if policy == POLICY_SAMPLE:
+                    if not should_sample(percent):
+                        return
+                    fields['event_count'] = sample_weight(percent)
+            
             # 记录日志
             log_audit(
-                action=action,
-                resource_type=resource_type,
-                resource_id=resource_id,
-                resource_name=resource_name,
-                description=f"{method} {request.path}",
                 request=request,
                 status=status,
-                error_message=error_message,
                 execution_time=int(execution_time),
+                **fields
             )
         except Exception as e:
             # 操作日志记录失败不应该影响主业务
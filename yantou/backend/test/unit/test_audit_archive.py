@@ -0,0 +1,100 @@
+"""
+操作日志冷归档测试
+测试 apps/common/archive.py 中的分块归档、索引和查询，以及 archive_audit_logs、query_audit_archive 管理命令
+"""
+import json
+import os
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from apps.common.archive import archive_old_logs, list_archive_parts, load_index, search_archive
+from apps.common.models import AuditLog
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def archive_settings(settings, tmp_path):
+    settings.AUDIT_ARCHIVE_DIR = str(tmp_path)
+    settings.AUDIT_ARCHIVE_BLOCK_ROWS = 2
+    return settings
+
+
+@pytest.fixture
+def old_logs(db):
+    return AuditLog.objects.bulk_create([
+        AuditLog(user_id=1, action='view', resource_type='users', created_at=utc(2025, 1, 5)),
+        AuditLog(user_id=2, action='delete', resource_type='roles', created_at=utc(2025, 1, 10)),
+        AuditLog(user_id=2, action='view', resource_type='users', created_at=utc(2025, 1, 20)),
+        AuditLog(user_id=1, action='update', resource_type='users', created_at=utc(2025, 2, 1)),
+        AuditLog(user_id=1, action='view', resource_type='users', created_at=timezone.now()),
+    ])
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestAuditArchive:
+    """归档和查询测试"""
+
+    def test_archive_moves_old_months(self, archive_settings, old_logs):
+        """测试整月归档后从数据库删除，索引记录块和用户所在的块"""
+        assert archive_old_logs(months=6) == {'2025-01': 3, '2025-02': 1}
+        assert AuditLog.objects.count() == 1
+
+        parts = list_archive_parts()
+        assert [os.path.basename(part) for part in parts] == ['sys_audit_log_202501_001', 'sys_audit_log_202502_001']
+        index = load_index(parts[0])
+        assert [block['rows'] for block in index['blocks']] == [2, 1]
+        assert index['users'] == {'1': [0], '2': [0, 1]}
+
+    def test_search_by_user_and_time(self, archive_settings, old_logs):
+        """测试按用户和时间范围查询归档"""
+        archive_old_logs(months=6)
+        records = list(search_archive(user_id=2, start=utc(2025, 1, 15)))
+        assert [record['action'] for record in records] == ['view']
+        assert [record['created_at'][:10] for record in search_archive(action='update')] == ['2025-02-01']
+
+    def test_late_rows_go_to_new_part(self, archive_settings, old_logs):
+        """测试已归档月份后来出现的记录归档为新分片"""
+        archive_old_logs(months=6)
+        AuditLog.objects.create(user_id=3, action='view', resource_type='users', created_at=utc(2025, 1, 31))
+        archive_old_logs(months=6)
+        assert os.path.basename(list_archive_parts()[1]) == 'sys_audit_log_202501_002'
+        assert len(list(search_archive(start=utc(2025, 1, 1), end=utc(2025, 2, 1)))) == 4
+
+    def test_deletes_only_archived_rows(self, archive_settings, monkeypatch):
+        """测试归档期间才进入该月的记录（主键小于归档上界）不会被删除，留到下次归档"""
+        from apps.common import archive
+
+        moved, _first, _second = AuditLog.objects.bulk_create([
+            AuditLog(action='view', resource_type='users', created_at=utc(2025, 2, 1)),
+            AuditLog(action='view', resource_type='users', created_at=utc(2025, 1, 5)),
+            AuditLog(action='view', resource_type='users', created_at=utc(2025, 1, 10)),
+        ])
+        real_iter_rows = archive.iter_rows
+
+        def iter_rows(queryset, fields):
+            yield from real_iter_rows(queryset, fields)
+            AuditLog.objects.filter(pk=moved.pk).update(created_at=utc(2025, 1, 31))
+
+        monkeypatch.setattr(archive, 'iter_rows', iter_rows)
+        assert archive.archive_month(utc(2025, 1, 1).date()) == 2
+        assert list(AuditLog.objects.values_list('pk', flat=True)) == [moved.pk]
+
+    def test_commands(self, archive_settings, old_logs):
+        """测试归档命令和查询命令"""
+        call_command('archive_audit_logs', '--months', '6', stdout=StringIO())
+        out = StringIO()
+        call_command('query_audit_archive', '--user-id', '1', '--end', '2025-02-01', stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [record['created_at'][:10] for record in records] == ['2025-01-05']
+
+    def test_purge_skips_archived_table(self, archive_settings, old_logs):
+        """测试启用归档后清理命令不删除操作日志"""
+        archive_settings.AUDIT_ARCHIVE_ENABLED = True
+        call_command('purge_expired_data', '--targets', 'audit_logs', '--sleep', '0', stdout=StringIO())
+        assert AuditLog.objects.count() == 5
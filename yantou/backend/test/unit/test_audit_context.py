@@ -0,0 +1,89 @@
+"""
+请求级操作日志上下文测试
+测试 AuditLogMixin 补充的字段与 RequestLoggingMiddleware 的记录合并为一条操作日志
+"""
+import pytest
+from rest_framework import serializers, viewsets
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.common.audit import begin_audit_buffer, flush_audit_buffer, pop_audit_context, set_audit_context
+from apps.common.mixins import AuditLogMixin
+from apps.common.models import AuditLog
+from apps.users.models import Department
+from middleware.logging import RequestLoggingMiddleware
+
+
+class DepartmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Department
+        fields = ['id', 'name', 'code']
+
+
+class DepartmentViewSet(AuditLogMixin, viewsets.ModelViewSet):
+    queryset = Department.objects.all()
+    serializer_class = DepartmentSerializer
+    permission_classes = []
+    throttle_classes = []
+    log_retrieve = True
+
+
+@pytest.fixture
+def audit_buffer():
+    """开始请求级缓冲，测试结束后结束缓冲，不把上下文留给其他测试"""
+    begin_audit_buffer()
+    yield
+    flush_audit_buffer()
+
+
+def call(user, method, path, view, data=None, **kwargs):
+    request = getattr(APIRequestFactory(), method)(path, data, format='json')
+    force_authenticate(request, user=user)
+    return RequestLoggingMiddleware(lambda request: view(request, **kwargs))(request)
+
+
+@pytest.mark.unit
+class TestAuditContext:
+    """上下文函数测试"""
+
+    def test_outside_request(self):
+        """测试不在请求中时不保存字段，调用方应直接记录"""
+        assert set_audit_context(action='create') is False
+
+    def test_fields_merged(self, audit_buffer):
+        """测试多次补充的字段合并，取出后结束上下文"""
+        set_audit_context(action='create', resource_id=1)
+        set_audit_context(resource_name='R&D')
+        assert pop_audit_context() == {'action': 'create', 'resource_id': 1, 'resource_name': 'R&D'}
+        assert set_audit_context(action='create') is False
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestMixinWithMiddleware:
+    """AuditLogMixin 与中间件合并记录测试"""
+
+    def test_create_logged_once(self, user, django_capture_on_commit_callbacks, django_assert_num_queries):
+        """测试创建只记录一条日志，资源信息来自视图，且不再重新查询创建的实例"""
+        view = DepartmentViewSet.as_view({'post': 'create'})
+        with django_capture_on_commit_callbacks(execute=True):
+            # 唯一性校验、插入、Department.save 更新 path；不再按 ID 重新查询
+            with django_assert_num_queries(3):
+                response = call(user, 'post', '/api/v1/departments/', view, {'name': 'R&D', 'code': 'rd'})
+        assert response.status_code == 201
+
+        log = AuditLog.objects.get()
+        department = Department.objects.get()
+        assert (log.action, log.resource_type, log.resource_id) == ('create', 'department', department.id)
+        assert log.resource_name == 'R&D'
+        assert log.description == '创建department: R&D'
+        assert log.request_method == 'POST'
+
+    def test_explicit_view_bypasses_policy(self, settings, user, django_capture_on_commit_callbacks):
+        """测试视图明确记录的查看操作不受采样、聚合策略影响"""
+        settings.AUDIT_VIEW_DEFAULT_POLICY = 'sample:0'
+        department = Department.objects.create(name='Ops', code='ops')
+        view = DepartmentViewSet.as_view({'get': 'retrieve'})
+        with django_capture_on_commit_callbacks(execute=True):
+            call(user, 'get', f'/api/v1/departments/{department.id}/', view, pk=department.id).render()
+
+        log = AuditLog.objects.get()
+        assert (log.action, log.resource_name, log.event_count) == ('view', 'Ops', 1)
@@ -0,0 +1,65 @@
+"""
+查看日志记录策略测试
+测试 apps/common/audit_policy.py 中的策略解析、聚合计数，以及 RequestLoggingMiddleware 对不同请求的处理
+"""
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from apps.common.audit_policy import ViewAggregator, get_view_policy, parse_view_policy
+from apps.common.models import AuditLog
+from middleware.logging import RequestLoggingMiddleware
+
+
+@pytest.mark.unit
+class TestViewPolicy:
+    """策略解析测试"""
+
+    def test_parse(self):
+        """测试解析各种策略"""
+        assert parse_view_policy('full') == ('full', 100)
+        assert parse_view_policy('aggregate') == ('aggregate', 100)
+        assert parse_view_policy('sample:10') == ('sample', 10)
+        assert parse_view_policy('sample:100') == ('full', 100)
+        assert parse_view_policy('bogus') == ('full', 100)
+
+    def test_longest_prefix_wins(self, settings):
+        """测试最长前缀优先，未匹配时使用默认策略"""
+        settings.AUDIT_VIEW_DEFAULT_POLICY = 'aggregate'
+        settings.AUDIT_VIEW_POLICIES = {'/api/v1/users/': 'sample:5', '/api/v1/users/me/': 'full'}
+        assert get_view_policy('/api/v1/users/3/') == ('sample', 5)
+        assert get_view_policy('/api/v1/users/me/') == ('full', 100)
+        assert get_view_policy('/api/v1/roles/') == ('aggregate', 100)
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestViewAggregation:
+    """查看日志聚合测试"""
+
+    def test_views_merged_into_one_row(self, settings, user):
+        """测试同一用户同一资源同一分钟的请求合并为一条日志"""
+        settings.AUDIT_VIEW_AGGREGATE_INTERVAL = 3600
+        request = RequestFactory().get('/api/v1/users/')
+        request.user = user
+        aggregator = ViewAggregator()
+        for elapsed in (10, 20, 30):
+            aggregator.add(request, 'users', execution_time=elapsed)
+        assert aggregator.flush(include_open=True) == 1
+        log = AuditLog.objects.get()
+        assert log.event_count == 3
+        assert log.execution_time == 20
+        assert log.created_at.second == 0
+
+    def test_mutations_always_logged_in_full(self, settings, user, django_capture_on_commit_callbacks):
+        """测试修改请求不受查看策略影响"""
+        settings.AUDIT_VIEW_DEFAULT_POLICY = 'sample:0'
+        middleware = RequestLoggingMiddleware(lambda request: HttpResponse())
+        with django_capture_on_commit_callbacks(execute=True):
+            for method in ('get', 'patch'):
+                request = getattr(RequestFactory(), method)('/api/v1/users/3/')
+                request.user = user
+                middleware._log_audit(request, HttpResponse(), 5)
+
+        log = AuditLog.objects.get()
+        assert log.action == 'update'
+        assert log.event_count == 1
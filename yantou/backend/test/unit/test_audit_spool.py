@@ -0,0 +1,112 @@
+"""
+审计日志本地缓冲文件测试
+测试 apps/common/spool.py 中的记录校验、断点续放，以及数据库写入失败时的缓冲和 replay_audit_spool 管理命令
+"""
+import os
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from apps.common.audit_writer import AuditWriter, serialize_log
+from apps.common.models import AuditLog
+from apps.common.spool import QUARANTINE_SUFFIX, REPLAY_SUFFIX, Spool, decode_record, encode_record, get_spool_stats, replay_file
+
+
+@pytest.mark.unit
+class TestSpoolFile:
+    """缓冲文件格式测试"""
+
+    def test_partial_and_corrupt_records_skipped(self, tmp_path):
+        """测试不完整或校验不通过的行被跳过，其余记录正常读取"""
+        record = encode_record('{"a": 1}', 1000.0)
+        assert decode_record(record) == (1000.0, '{"a": 1}')
+        assert decode_record(record[:-5]) is None
+        assert decode_record(record.replace(b'"a"', b'"b"')) is None
+
+        path = tmp_path / 'spool.1.replay'
+        path.write_bytes(record + record.replace(b'1}', b'2}') + encode_record('{"c": 3}') + record[:7])
+        batches = []
+        assert replay_file(str(path), lambda batch: batches.append(batch) or True) == (2, True)
+        assert batches == [['{"a": 1}', '{"c": 3}']]
+        assert not path.exists()
+
+    def test_resume_from_offset(self, tmp_path):
+        """测试写入失败时保留进度，下次从失败的批次继续"""
+        path = str(tmp_path / 'spool.1.replay')
+        with open(path, 'wb') as f:
+            for i in range(5):
+                f.write(encode_record(str(i)))
+
+        calls = []
+
+        def flaky(batch):
+            calls.append(batch)
+            return len(calls) != 2
+
+        assert replay_file(path, flaky, batch_size=2) == (2, False)
+        assert replay_file(path, lambda batch: calls.append(batch) or True, batch_size=2) == (3, True)
+        assert calls == [['0', '1'], ['2', '3'], ['2', '3'], ['4']]
+
+    def test_append_after_crash_and_stats(self, tmp_path):
+        """测试崩溃留下的不完整行不影响之后追加的记录，统计文件积压"""
+        path = tmp_path / 'spool.1.spool'
+        path.write_bytes(encode_record('x')[:6])
+        spool = Spool(str(path))
+        spool.append(['{"ok": true}'])
+        spool.close()
+
+        stats = get_spool_stats(str(tmp_path / 'spool'))
+        assert stats['files'] == 1
+        assert stats['bytes'] == path.stat().st_size
+        assert decode_record(path.read_bytes().split(b'\n', 1)[1]) is not None
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestSpoolOnDatabaseFailure:
+    """数据库写入失败时的缓冲测试"""
+
+    def test_failed_writes_spooled_and_replayed(self, settings, tmp_path, monkeypatch):
+        """测试写入失败的日志进入缓冲文件，数据库恢复后回放"""
+        settings.AUDIT_WRITER_FLUSH_INTERVAL = 0
+        settings.AUDIT_WRITER_SPOOL_PATH = str(tmp_path / 'spool')
+        writer = AuditWriter()
+        real_write = writer.write
+        monkeypatch.setattr(writer, 'write', lambda objs: list(objs))
+        writer.submit(AuditLog(action='update', resource_type='users'))
+        assert AuditLog.objects.count() == 0
+        assert os.path.exists(writer.get_spool_path())
+
+        monkeypatch.setattr(writer, 'write', real_write)
+        assert writer.replay_spill() == 1
+        assert AuditLog.objects.count() == 1
+
+    def test_rejected_rows_quarantined(self, settings, tmp_path):
+        """测试被数据库拒绝的日志写入隔离文件，同批其他日志正常写入，回放不会卡住"""
+        settings.AUDIT_WRITER_SPOOL_PATH = str(tmp_path / 'spool')
+        writer = AuditWriter()
+        writer.spill([
+            AuditLog(action='create', resource_type='users'),
+            AuditLog(action=None, resource_type='users'),
+            AuditLog(action='delete', resource_type='users'),
+        ])
+
+        assert writer.replay_spill() == 3
+        assert sorted(AuditLog.objects.values_list('action', flat=True)) == ['create', 'delete']
+        assert not os.path.exists(writer.get_spool_path(REPLAY_SUFFIX))
+        with open(writer.get_spool_path(QUARANTINE_SUFFIX), 'rb') as f:
+            records = [decode_record(line) for line in f]
+        assert len(records) == 1
+        assert '"action": null' in records[0][1]
+
+    def test_command_replays_orphaned_files(self, settings, tmp_path):
+        """测试管理命令回放已退出进程的缓冲文件"""
+        settings.AUDIT_WRITER_SPOOL_PATH = str(tmp_path / 'spool')
+        # 进程 ID 上限之外的 ID 不可能存在
+        orphan = Spool(str(tmp_path / 'spool.99999999.spool'))
+        orphan.append([serialize_log(AuditLog(action='delete', resource_type='roles'))])
+        orphan.close()
+
+        out = StringIO()
+        call_command('replay_audit_spool', stdout=out)
+        assert AuditLog.objects.get().action == 'delete'
+        assert os.listdir(tmp_path) == []
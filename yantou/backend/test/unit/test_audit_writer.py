@@ -0,0 +1,129 @@
+"""
+审计日志写入测试
+测试 apps/common/audit_writer.py 中的队列、批量写入和溢出策略，以及 apps/common/audit.py 中日志的提交时机
+"""
+import os
+import pytest
+from datetime import timedelta
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from apps.common.audit import begin_audit_buffer, flush_audit_buffer, log_audit
+from apps.common.audit_writer import AuditWriter, deserialize_log, serialize_log
+from apps.common.models import AuditLog, LoginLog
+
+
+@pytest.fixture
+def queued(settings):
+    """启用异步写入（间隔足够长，只由测试手动刷新）"""
+    settings.AUDIT_WRITER_FLUSH_INTERVAL = 3600
+    return settings
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestAuditWriter:
+    """审计日志写入器测试"""
+
+    def test_submit_defers_until_flush(self, queued):
+        """测试提交后不立即写入，刷新时按模型批量写入"""
+        writer = AuditWriter()
+        event_time = timezone.now() - timedelta(minutes=5)
+        writer.submit(AuditLog(action='view', resource_type='users', created_at=event_time))
+        writer.submit(AuditLog(action='view', resource_type='roles'))
+        writer.submit(LoginLog(username='alice'))
+        assert AuditLog.objects.count() == 0
+
+        assert writer.flush() == 3
+        assert AuditLog.objects.count() == 2
+        assert LoginLog.objects.count() == 1
+        # 创建时间为事件发生时间而不是写入时间
+        assert AuditLog.objects.get(resource_type='users').created_at == event_time
+
+    def test_sync_mode(self, settings):
+        """测试刷新间隔为 0 时同步写入"""
+        settings.AUDIT_WRITER_FLUSH_INTERVAL = 0
+        AuditWriter().submit(AuditLog(action='view', resource_type='users'))
+        assert AuditLog.objects.count() == 1
+
+    def test_overflow_drop(self, queued):
+        """测试队列已满时丢弃并计数"""
+        queued.AUDIT_WRITER_QUEUE_SIZE = 1
+        queued.AUDIT_WRITER_OVERFLOW = 'drop'
+        writer = AuditWriter()
+        writer.submit(AuditLog(action='view', resource_type='a'))
+        writer.submit(AuditLog(action='view', resource_type='b'))
+
+        assert writer.dropped == 1
+        assert writer.flush() == 1
+
+    def test_overflow_spill_and_replay(self, queued, tmp_path):
+        """测试队列已满时写入缓冲文件，刷新时回放"""
+        queued.AUDIT_WRITER_QUEUE_SIZE = 1
+        queued.AUDIT_WRITER_OVERFLOW = 'spill'
+        queued.AUDIT_WRITER_SPOOL_PATH = str(tmp_path / 'spool')
+        writer = AuditWriter()
+        writer.submit(AuditLog(action='view', resource_type='a'))
+        writer.submit(LoginLog(username='bob', status=0, failure_reason='密码错误'))
+
+        spool_path = writer.get_spool_path()
+        assert writer.dropped == 0
+        assert open(spool_path, 'rb').read().count(b'\n') == 1
+
+        assert writer.flush() == 2
+        assert LoginLog.objects.get(username='bob').failure_reason == '密码错误'
+        assert os.listdir(tmp_path) == []
+
+    def test_long_fields_truncated(self, settings, django_capture_on_commit_callbacks):
+        """测试超长的客户端字段按 max_length 截断，不会使批量写入失败"""
+        settings.AUDIT_WRITER_FLUSH_INTERVAL = 0
+        request = RequestFactory().get('/api/v1/users/' + 'a' * 1000, HTTP_USER_AGENT='b' * 1000)
+        with django_capture_on_commit_callbacks(execute=True):
+            log = log_audit(action='view', resource_type='users', description='x' * 1000, request=request)
+        assert len(log.user_agent) == AuditLog._meta.get_field('user_agent').max_length
+        assert len(log.request_path) == AuditLog._meta.get_field('request_path').max_length
+        assert len(log.description) == 1000
+        assert AuditLog.objects.count() == 1
+
+    def test_serialize_round_trip(self):
+        """测试日志对象序列化后可还原"""
+        log = AuditLog(action='update', resource_type='users', resource_id=3, status=0)
+        restored = deserialize_log(serialize_log(log))
+        assert isinstance(restored, AuditLog)
+        assert restored.resource_id == 3
+        assert restored.created_at == log.created_at
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestAuditEmission:
+    """日志提交时机测试"""
+
+    def test_success_log_emitted_on_commit(self, django_capture_on_commit_callbacks):
+        """测试成功日志在事务提交后写入"""
+        with django_capture_on_commit_callbacks(execute=True):
+            log_audit(action='create', resource_type='users')
+            assert AuditLog.objects.count() == 0
+        assert AuditLog.objects.count() == 1
+
+    def test_success_log_discarded_on_rollback(self, django_capture_on_commit_callbacks):
+        """测试事务回滚时丢弃成功日志"""
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    log_audit(action='create', resource_type='users')
+                    raise RuntimeError
+        assert callbacks == []
+        assert AuditLog.objects.count() == 0
+
+    def test_failure_log_survives_rollback(self):
+        """测试失败日志在请求结束后提交，不随业务事务回滚"""
+        begin_audit_buffer()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                log_audit(action='update', resource_type='users', status=0, error_message='boom')
+                raise RuntimeError
+        assert AuditLog.objects.count() == 0
+
+        assert flush_audit_buffer() == 1
+        assert AuditLog.objects.get().error_message == 'boom'
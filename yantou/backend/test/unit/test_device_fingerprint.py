@@ -0,0 +1,48 @@
+"""
+设备指纹测试
+测试 apps/auth/security.py 中 DeviceFingerprint 的设备记录
+"""
+import pytest
+from unittest.mock import patch
+from django.core.cache import cache
+from apps.auth.security import DeviceFingerprint
+
+
+@pytest.mark.unit
+class TestDeviceFingerprintRegistry:
+    """设备记录测试（缓存 API 回退实现）"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_known_device(self):
+        """测试记录后识别为已知设备"""
+        DeviceFingerprint.store_device_fingerprint(1, 'fp-a')
+
+        assert DeviceFingerprint.is_known_device(1, 'fp-a')
+        assert not DeviceFingerprint.is_known_device(1, 'fp-b')
+        assert not DeviceFingerprint.is_known_device(2, 'fp-a')
+
+    def test_evicts_least_recently_used(self, settings):
+        """测试超过上限时淘汰最久未使用的设备"""
+        settings.DEVICE_FINGERPRINT_MAX_DEVICES = 2
+        with patch('apps.auth.security.time') as mock_time:
+            for now, fingerprint in [(100, 'fp-a'), (200, 'fp-b'), (300, 'fp-a'), (400, 'fp-c')]:
+                mock_time.time.return_value = now
+                DeviceFingerprint.store_device_fingerprint(1, fingerprint)
+
+            assert DeviceFingerprint.is_known_device(1, 'fp-a')
+            assert DeviceFingerprint.is_known_device(1, 'fp-c')
+            assert not DeviceFingerprint.is_known_device(1, 'fp-b')
+
+    def test_device_expires_individually(self, settings):
+        """测试长时间未使用的设备单独过期"""
+        settings.DEVICE_FINGERPRINT_TTL = 1000
+        with patch('apps.auth.security.time') as mock_time:
+            for now, fingerprint in [(100, 'fp-a'), (900, 'fp-b')]:
+                mock_time.time.return_value = now
+                DeviceFingerprint.store_device_fingerprint(1, fingerprint)
+            mock_time.time.return_value = 1500
+
+            assert not DeviceFingerprint.is_known_device(1, 'fp-a')
+            assert DeviceFingerprint.is_known_device(1, 'fp-b')
@@ -0,0 +1,97 @@
+"""
+网关鉴权测试
+测试 apps/auth/gateway.py 中供 nginx auth_request 调用的鉴权接口
+"""
+import pytest
+from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.permissions.models import Permission, Role, RolePermission, UserRole
+from apps.permissions.utils import clear_user_permission_cache
+
+URL = '/gateway/auth/'
+
+
+def grant(user, code):
+    permission = Permission.objects.create(name=code, code=code)
+    role = Role.objects.create(name=f'role-{code}', code=f'role-{code}')
+    RolePermission.objects.create(role=role, permission=permission)
+    UserRole.objects.create(user=user, role=role)
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestGatewayAuth:
+    """网关鉴权接口测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_missing_or_invalid_token(self, client):
+        """测试缺少或无效的 Token 返回 401"""
+        assert client.get(URL).status_code == 401
+        response = client.get(URL, HTTP_AUTHORIZATION='Bearer invalid')
+        assert response.status_code == 401
+        assert response['WWW-Authenticate'] == 'Bearer'
+
+    def test_identity_headers(self, client, user, token_pair):
+        """测试认证成功时返回身份响应头"""
+        response = client.get(URL, HTTP_AUTHORIZATION=f"Bearer {token_pair['access']}")
+        assert response.status_code == 200
+        assert response['X-Auth-User-Id'] == str(user.id)
+        assert response['X-Auth-Username'] == user.username
+
+    def test_required_permission(self, client, user, token_pair):
+        """测试按请求头检查权限"""
+        headers = {'HTTP_AUTHORIZATION': f"Bearer {token_pair['access']}"}
+        response = client.get(URL, HTTP_X_REQUIRED_PERMISSION='report:read', **headers)
+        assert response.status_code == 403
+
+        grant(user, 'report:read')
+        clear_user_permission_cache(user)
+        response = client.get(URL, HTTP_X_REQUIRED_PERMISSION='report:read', **headers)
+        assert response.status_code == 200
+
+        response = client.get(URL, HTTP_X_REQUIRED_PERMISSION='report:read, report:export', **headers)
+        assert response.status_code == 403
+
+    def test_revoked_role_takes_effect(self, client, user, token_pair):
+        """测试撤销角色、移除角色权限、停用角色后，下一次鉴权即返回 403"""
+        headers = {
+            'HTTP_AUTHORIZATION': f"Bearer {token_pair['access']}",
+            'HTTP_X_REQUIRED_PERMISSION': 'report:read',
+        }
+        grant(user, 'report:read')
+        assert client.get(URL, **headers).status_code == 200
+
+        UserRole.objects.filter(user=user).get().delete()
+        assert client.get(URL, **headers).status_code == 403
+
+        role = Role.objects.get(code='role-report:read')
+        UserRole.objects.create(user=user, role=role)
+        assert client.get(URL, **headers).status_code == 200
+        RolePermission.objects.filter(role=role).get().delete()
+        assert client.get(URL, **headers).status_code == 403
+
+        role.permissions.add(Permission.objects.get(code='report:read'))
+        assert client.get(URL, **headers).status_code == 200
+        role.is_active = False
+        role.save()
+        assert client.get(URL, **headers).status_code == 403
+
+    def test_cached_check_skips_database_and_logging(self, client, user, token_pair):
+        """测试缓存命中时不查询数据库，且不记录请求日志"""
+        grant(user, 'report:read')
+        headers = {
+            'HTTP_AUTHORIZATION': f"Bearer {token_pair['access']}",
+            'HTTP_X_REQUIRED_PERMISSION': 'report:read',
+        }
+        client.get(URL, **headers)
+
+        with CaptureQueriesContext(connection) as queries, \
+                patch('middleware.logging.RequestLoggingMiddleware._should_log_audit') as should_log:
+            response = client.get(URL, **headers)
+        assert response.status_code == 200
+        assert len(queries) == 0
+        should_log.assert_not_called()
@@ -0,0 +1,60 @@
+"""
+最后登录时间测试
+测试 apps/auth/last_login.py 中的缓冲合并写入
+"""
+import pytest
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.auth.last_login import LastLoginBuffer
+from apps.auth.tokens import RefreshToken
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestLastLoginBuffer:
+    """最后登录时间缓冲区测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_record_does_not_write_until_flush(self, user, settings):
+        """测试记录时不写数据库，刷新时批量写入"""
+        settings.LAST_LOGIN_FLUSH_INTERVAL = 3600
+        buffer = LastLoginBuffer()
+        when = timezone.now()
+
+        with CaptureQueriesContext(connection) as queries:
+            buffer.record(user.id, when)
+        assert len(queries) == 0
+
+        assert buffer.flush() == 1
+        user.refresh_from_db()
+        assert user.last_login == when
+
+    def test_repeated_logins_within_granularity_skipped(self, user, settings):
+        """测试粒度时间内的重复登录只记录一次"""
+        settings.LAST_LOGIN_FLUSH_INTERVAL = 3600
+        settings.LAST_LOGIN_GRANULARITY = 60
+        buffer = LastLoginBuffer()
+        first = timezone.now()
+
+        buffer.record(user.id, first)
+        buffer.record(user.id, first + timedelta(seconds=10))
+        buffer.flush()
+
+        user.refresh_from_db()
+        assert user.last_login == first
+
+    def test_refresh_endpoint_updates_last_login(self, api_client, user, settings):
+        """测试刷新 Token 接口更新最后登录时间"""
+        settings.SIMPLE_JWT = {**settings.SIMPLE_JWT, 'UPDATE_LAST_LOGIN': True}
+        refresh = RefreshToken.for_user(user)
+
+        response = api_client.post('/api/v1/auth/refresh/', {'refresh': str(refresh)}, format='json')
+        assert response.status_code == 200
+
+        user.refresh_from_db()
+        assert user.last_login is not None
@@ -0,0 +1,98 @@
+"""
+日志流式导出测试
+测试 apps/common/export.py 中的 CSV / NDJSON / gzip 生成器、导出接口和 export_logs 管理命令
+"""
+import csv
+import gzip
+import io
+import json
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from apps.common.export import stream_export
+from apps.common.models import AuditLog, LoginLog
+
+
+@pytest.fixture
+def audit_logs(db):
+    now = timezone.now()
+    return AuditLog.objects.bulk_create([
+        AuditLog(action='view', resource_type='users', resource_id=i, created_at=now - timedelta(hours=i))
+        for i in range(5)
+    ])
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestStreamExport:
+    """导出生成器测试"""
+
+    def test_csv_in_time_order(self, audit_logs):
+        """测试 CSV 含表头并按查询集顺序输出"""
+        content = b''.join(stream_export(AuditLog.objects.order_by('created_at', 'id'), 'csv', chunk_size=2))
+        rows = list(csv.DictReader(io.StringIO(content.decode('utf-8'))))
+        assert [int(row['resource_id']) for row in rows] == [4, 3, 2, 1, 0]
+
+    def test_csv_formula_escaped(self, db):
+        """测试以公式字符开头的文本在 CSV 中加 ' 前缀，NDJSON 保持原值"""
+        LoginLog.objects.create(username='=HYPERLINK("http://evil")', failure_reason='-1+1', status=0)
+        content = b''.join(stream_export(LoginLog.objects.all(), 'csv')).decode('utf-8')
+        row = next(csv.DictReader(io.StringIO(content)))
+        assert row['username'] == '\'=HYPERLINK("http://evil")'
+        assert row['failure_reason'] == "'-1+1"
+        assert row['status'] == '0'
+
+        record = json.loads(b''.join(stream_export(LoginLog.objects.all(), 'ndjson')))
+        assert record['username'] == '=HYPERLINK("http://evil")'
+
+    def test_ndjson_gzip(self, audit_logs):
+        """测试 gzip 压缩的 NDJSON 可解压还原"""
+        content = b''.join(stream_export(AuditLog.objects.all(), 'ndjson', compress=True))
+        records = [json.loads(line) for line in gzip.decompress(content).decode('utf-8').splitlines()]
+        assert len(records) == 5
+        assert records[0]['action'] == 'view'
+
+    def test_unknown_format(self):
+        """测试不支持的格式"""
+        with pytest.raises(ValueError):
+            stream_export(AuditLog.objects.all(), 'xml')
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestExportEndpoint:
+    """导出接口测试"""
+
+    def test_streaming_response_with_filters(self, admin_client, audit_logs):
+        """测试接口返回流式响应并应用列表过滤条件"""
+        response = admin_client.get('/api/v1/audit-logs/export/', {'resource_id': 2, 'export_format': 'ndjson'})
+        assert response.status_code == 200
+        assert response.streaming
+        assert 'audit_logs.ndjson' in response['Content-Disposition']
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        assert [json.loads(line)['resource_id'] for line in lines] == [2]
+
+    def test_invalid_format(self, admin_client):
+        """测试不支持的导出格式"""
+        response = admin_client.get('/api/v1/login-logs/export/', {'export_format': 'xml'})
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestExportCommand:
+    """export_logs 管理命令测试"""
+
+    def test_export_time_range_to_file(self, tmp_path):
+        """测试按时间范围导出到 gzip 文件"""
+        now = timezone.now()
+        LoginLog.objects.create(username='old', created_at=now - timedelta(days=40))
+        LoginLog.objects.create(username='recent', created_at=now)
+        output = tmp_path / 'login.csv.gz'
+
+        start = (now - timedelta(days=1)).date().isoformat()
+        call_command('export_logs', 'login_logs', '--start', start, '--gzip', '-o', str(output), stderr=io.StringIO())
+
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(output.read_bytes()).decode('utf-8'))))
+        assert [row['username'] for row in rows] == ['recent']
@@ -0,0 +1,106 @@
+"""
+日志处理器测试
+测试 utils/log_handlers.py 中的 JSON 格式化器、队列处理器和多进程文件处理器
+"""
+import json
+import logging
+import os
+import pytest
+from utils.log_handlers import JSONFormatter, ProcessSafeFileHandler, QueueLoggingHandler
+
+
+class ListHandler(logging.Handler):
+    """把格式化后的日志保存到列表"""
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def make_record(msg='hello %s', args=('world',), level=logging.INFO):
+    return logging.LogRecord('test', level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def target():
+    handler = ListHandler()
+    handler.name = 'test_log_handlers_target'
+    logging._handlers[handler.name] = handler
+    yield handler
+    logging._handlers.pop(handler.name, None)
+
+
+@pytest.mark.unit
+class TestJSONFormatter:
+    """JSON 格式化器测试"""
+
+    def test_format_fields(self):
+        """测试输出字段、请求 ID 和额外字段"""
+        record = make_record()
+        record.request_id = 'req-1'
+        record.extra_data = {'status_code': 200, 'path': '/api/v1/users/'}
+        data = json.loads(JSONFormatter().format(record))
+        assert data['message'] == 'hello world'
+        assert data['request_id'] == 'req-1'
+        assert data['status_code'] == 200
+
+    def test_unserializable_values(self):
+        """测试无法序列化的值转为字符串"""
+        record = make_record()
+        record.extra_data = {'value': object()}
+        assert json.loads(JSONFormatter().format(record))['value'].startswith('<object')
+
+
+@pytest.mark.unit
+class TestQueueLoggingHandler:
+    """队列处理器测试"""
+
+    def test_delivers_in_background(self, target):
+        """测试日志由后台线程写入目标处理器，停止时写完队列"""
+        handler = QueueLoggingHandler([target.name])
+        handler.emit(make_record())
+        handler.stop()
+        assert target.lines == ['hello world']
+
+    def test_drops_when_full(self, target):
+        """测试队列已满时丢弃并计数，不阻塞"""
+        handler = QueueLoggingHandler([target.name], queue_size=1)
+        handler.start = lambda: None  # 不启动后台线程，队列不会被消费
+        handler.emit(make_record())
+        handler.emit(make_record())
+        assert handler.dropped == 1
+        assert handler.queue.qsize() == 1
+
+    def test_respects_target_level(self, target):
+        """测试按目标处理器的级别过滤"""
+        target.setLevel(logging.ERROR)
+        handler = QueueLoggingHandler([target.name])
+        handler.emit(make_record('info', ()))
+        handler.emit(make_record('error', (), logging.ERROR))
+        handler.stop()
+        assert target.lines == ['error']
+
+
+@pytest.mark.unit
+class TestProcessSafeFileHandler:
+    """多进程文件处理器测试"""
+
+    def test_per_process_filename(self, tmp_path):
+        """测试每个进程写自己的文件"""
+        handler = ProcessSafeFileHandler(tmp_path / 'django.log', per_process=True, encoding='utf-8')
+        handler.emit(make_record())
+        handler.close()
+        assert (tmp_path / f'django.{os.getpid()}.log').read_text(encoding='utf-8') == 'hello world\n'
+
+    def test_reopens_after_rotation(self, tmp_path):
+        """测试文件被外部轮转后重新打开"""
+        path = tmp_path / 'django.log'
+        handler = ProcessSafeFileHandler(path, encoding='utf-8')
+        handler.emit(make_record('first', ()))
+        os.replace(path, tmp_path / 'django.log.1')
+        handler.emit(make_record('second', ()))
+        handler.close()
+        assert path.read_text(encoding='utf-8') == 'second\n'
@@ -0,0 +1,107 @@
+"""
+日志查询接口测试
+测试 apps/common/views.py 中操作日志、登录日志的过滤和游标分页
+"""
+import pytest
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.common.models import AuditLog, LoginLog
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestAuditLogQuery:
+    """操作日志查询测试"""
+
+    url = '/api/v1/audit-logs/'
+
+    def test_requires_admin(self, authenticated_client):
+        """测试普通用户无权访问"""
+        response = authenticated_client.get(self.url)
+        assert response.status_code == 403
+
+    def test_filter_by_user_and_time_range(self, admin_client):
+        """测试按用户和时间范围过滤"""
+        now = timezone.now()
+        AuditLog.objects.create(user_id=1, action='view', resource_type='users', created_at=now - timedelta(days=2))
+        AuditLog.objects.create(user_id=1, action='update', resource_type='users', created_at=now)
+        AuditLog.objects.create(user_id=2, action='update', resource_type='users', created_at=now)
+
+        response = admin_client.get(self.url, {
+            'user_id': 1,
+            # 查询参数中不能出现 '+'（SQL 注入防护），时区用 Z 表示
+            'created_at_start': (now - timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        })
+        assert response.status_code == 200
+        results = response.data['data']['results']
+        assert [item['action'] for item in results] == ['update']
+
+    def test_cursor_pagination_breaks_ties_by_id(self, admin_client):
+        """测试创建时间相同时按 id 翻页，不重复不遗漏"""
+        now = timezone.now()
+        AuditLog.objects.bulk_create([
+            AuditLog(action='view', resource_type='users', created_at=now) for _ in range(5)
+        ])
+
+        seen = []
+        response = admin_client.get(self.url, {'page_size': 2})
+        while True:
+            data = response.data['data']
+            seen.extend(item['id'] for item in data['results'])
+            if not data['pagination']['next']:
+                break
+            response = admin_client.get(data['pagination']['next'])
+
+        assert seen == sorted(AuditLog.objects.values_list('id', flat=True), reverse=True)
+
+    def test_cursor_pagination_backwards_without_offset(self, admin_client):
+        """测试按 (created_at, id) 键集定位：向前翻页回到原页，查询中没有 OFFSET"""
+        now = timezone.now()
+        AuditLog.objects.bulk_create([
+            AuditLog(action='view', resource_type='users', created_at=now) for _ in range(5)
+        ])
+        first = admin_client.get(self.url, {'page_size': 2}).data['data']
+        with CaptureQueriesContext(connection) as queries:
+            second = admin_client.get(first['pagination']['next']).data['data']
+        assert not any('OFFSET' in query['sql'] for query in queries.captured_queries)
+
+        back = admin_client.get(second['pagination']['previous']).data['data']
+        assert [item['id'] for item in back['results']] == [item['id'] for item in first['results']]
+        assert back['pagination']['has_previous'] is False
+        assert admin_client.get(self.url, {'cursor': 'invalid'}).status_code == 404
+
+    def test_keyword_search(self, admin_client):
+        """测试关键字在描述、路径、资源名称、请求参数中检索"""
+        AuditLog.objects.create(action='update', resource_type='roles', request_path='/api/v1/roles/7/')
+        AuditLog.objects.create(action='update', resource_type='users', resource_name='Alice')
+        AuditLog.objects.create(action='create', resource_type='users', request_params='{"manager": "alice"}')
+        AuditLog.objects.create(action='view', resource_type='users', description='GET /api/v1/users/')
+
+        response = admin_client.get(self.url, {'q': 'ALICE'})
+        assert sorted(item['action'] for item in response.data['data']['results']) == ['create', 'update']
+        response = admin_client.get(self.url, {'q': 'roles/7', 'status': 1})
+        assert [item['resource_type'] for item in response.data['data']['results']] == ['roles']
+
+    def test_keyword_too_short(self, admin_client):
+        """测试关键字过短（无法使用索引）时返回 400"""
+        response = admin_client.get(self.url, {'q': 'ab'})
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestLoginLogQuery:
+    """登录日志查询测试"""
+
+    def test_filter_by_status(self, admin_client):
+        """测试按登录状态过滤"""
+        LoginLog.objects.create(username='alice', status=1)
+        LoginLog.objects.create(username='alice', status=0, failure_reason='密码错误')
+
+        response = admin_client.get('/api/v1/login-logs/', {'username': 'alice', 'status': 0})
+        assert response.status_code == 200
+        results = response.data['data']['results']
+        assert len(results) == 1
+        assert results[0]['failure_reason'] == '密码错误'
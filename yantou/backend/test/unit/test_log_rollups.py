@@ -0,0 +1,85 @@
+"""
+日志按天汇总测试
+测试 utils/hyperloglog.py、apps/common/rollups.py 中的增量汇总、统计接口和 rebuild_log_rollups 管理命令
+"""
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from apps.common.audit_writer import AuditWriter
+from apps.common.models import AuditDailyStat, AuditLog, LoginDailyStat, LoginLog
+from utils.hyperloglog import HyperLogLog
+
+
+@pytest.mark.unit
+class TestHyperLogLog:
+    """HyperLogLog 测试"""
+
+    def test_estimate_within_error(self):
+        """测试估计误差在 5% 以内，重复元素不重复计数"""
+        sketch = HyperLogLog(12)
+        for i in range(20000):
+            sketch.add(f'user-{i % 10000}')
+        assert abs(sketch.count() - 10000) / 10000 < 0.05
+
+    def test_merge_and_round_trip(self):
+        """测试合并得到并集的估计，寄存器可导出还原"""
+        a, b = HyperLogLog(10), HyperLogLog(10)
+        for i in range(100):
+            a.add(str(i))
+            b.add(str(i + 50))
+        a.merge(HyperLogLog.from_bytes(b.to_bytes()))
+        assert 140 <= a.count() <= 160
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestRollups:
+    """增量汇总测试"""
+
+    def test_writer_updates_rollups(self):
+        """测试写入器写入日志后累加汇总（按 event_count 计数）"""
+        writer = AuditWriter()
+        writer.write([
+            AuditLog(user_id=1, action='view', resource_type='users', event_count=5),
+            AuditLog(user_id=2, action='view', resource_type='users'),
+        ])
+        writer.write([AuditLog(user_id=1, action='view', resource_type='users', status=0)])
+
+        day = timezone.localdate()
+        assert AuditDailyStat.objects.get(day=day, action='view', resource_type='users', status=1).count == 6
+        assert AuditDailyStat.objects.get(day=day, action='view', resource_type='users', status=0).count == 1
+
+    def test_login_stats_endpoint(self, admin_client):
+        """测试登录统计接口读取汇总"""
+        AuditWriter().write([
+            LoginLog(username='alice', ip_address='10.0.0.1', status=0),
+            LoginLog(username='alice', ip_address='10.0.0.1', status=0),
+            LoginLog(username='bob', ip_address='10.0.0.2', status=1),
+        ])
+
+        response = admin_client.get('/api/v1/log-stats/login/')
+        assert response.status_code == 200
+        data = response.data['data']
+        assert (data['success'], data['failure']) == (1, 2)
+        assert data['top_failed_ips'] == [{'key': '10.0.0.1', 'failure_count': 2}]
+        assert data['distinct_ips'] == 2
+
+    def test_rebuild_command(self):
+        """测试从日志表重建汇总（重复执行结果不变）"""
+        created_at = timezone.now() - timedelta(days=3)
+        day = timezone.localdate(created_at).isoformat()
+        LoginLog.objects.create(username='carol', ip_address='10.0.0.3', status=0, created_at=created_at)
+
+        call_command('rebuild_log_rollups', '--targets', 'login_logs', '--start', day, '--end', day, stdout=StringIO())
+        call_command('rebuild_log_rollups', '--targets', 'login_logs', '--start', day, '--end', day, stdout=StringIO())
+
+        row = LoginDailyStat.objects.get(dimension='user', key='carol')
+        assert (row.success_count, row.failure_count) == (0, 1)
+
+    def test_rebuild_refuses_recent_days(self):
+        """测试不允许重建写入器仍在累加的日期"""
+        today = timezone.localdate().isoformat()
+        with pytest.raises(CommandError):
+            call_command('rebuild_log_rollups', '--start', today, '--end', today, stdout=StringIO())
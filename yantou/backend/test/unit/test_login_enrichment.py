@@ -0,0 +1,104 @@
+"""
+登录日志补全测试
+测试 utils/user_agent.py 的 User-Agent 解析、utils/ip_database.py 的离线地址库，
+以及审计日志写入时的补全和 build_ip_database、enrich_login_logs 管理命令
+"""
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.test import RequestFactory
+from apps.common.audit import log_login
+from apps.common.models import LoginLog
+from utils.ip_database import IPDatabase, PRIVATE_LOCATION, build_database, parse_ip
+from utils.user_agent import parse_user_agent
+
+CHROME_WINDOWS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+SAFARI_IPHONE = (
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 '
+    '(KHTML, like Gecko) Version/17.1 Mobile/15E148 Safari/604.1'
+)
+
+
+@pytest.fixture
+def ip_database(settings, tmp_path):
+    source = tmp_path / 'ip.txt'
+    source.write_text(
+        '1.0.1.0|1.0.3.255|中国|0|福建省|福州市|电信\n'
+        '8.8.8.0|8.8.8.255|美国|0|0|0|Google\n',
+        encoding='utf-8'
+    )
+    settings.IP_DATABASE_PATH = str(tmp_path / 'ip_location.db')
+    call_command('build_ip_database', str(source), '--delimiter', '|', stdout=StringIO())
+    return settings.IP_DATABASE_PATH
+
+
+@pytest.mark.unit
+class TestUserAgentParser:
+    """User-Agent 解析测试"""
+
+    def test_desktop_and_mobile(self):
+        """测试识别设备类型、浏览器和操作系统"""
+        assert parse_user_agent(CHROME_WINDOWS) == {'device': 'Desktop', 'browser': 'Chrome 120', 'os': 'Windows 10'}
+        assert parse_user_agent(SAFARI_IPHONE) == {'device': 'Mobile', 'browser': 'Safari 17', 'os': 'iOS 17'}
+        assert parse_user_agent('curl/8.4.0')['device'] == 'Bot'
+
+    def test_cached(self):
+        """测试相同的 User-Agent 命中缓存"""
+        parse_user_agent(CHROME_WINDOWS)
+        hits = parse_user_agent.cache_info().hits
+        parse_user_agent(CHROME_WINDOWS)
+        assert parse_user_agent.cache_info().hits == hits + 1
+
+
+@pytest.mark.unit
+class TestIPDatabase:
+    """离线地址库测试"""
+
+    def test_lookup(self, tmp_path):
+        """测试区间边界、区间之间、私有地址和无效地址"""
+        path = str(tmp_path / 'ip.db')
+        build_database([
+            (parse_ip('9.0.0.0'), parse_ip('9.255.255.255'), 'B'),
+            (parse_ip('1.0.0.0'), parse_ip('1.0.0.255'), 'A'),
+        ], path)
+        database = IPDatabase(path)
+        assert len(database) == 2
+        assert database.lookup('1.0.0.0') == 'A'
+        assert database.lookup('1.0.0.255') == 'A'
+        assert database.lookup('::ffff:9.1.2.3') == 'B'
+        assert database.lookup('1.0.1.0') is None
+        assert database.lookup('192.168.1.1') == PRIVATE_LOCATION
+        assert database.lookup('2001:db8::1') is None
+        assert database.lookup('not-an-ip') is None
+        database.close()
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestLoginLogEnrichment:
+    """登录日志补全测试"""
+
+    def test_enriched_on_write(self, ip_database, django_capture_on_commit_callbacks):
+        """测试写入时补全设备、浏览器、操作系统和登录地点"""
+        request = RequestFactory().post('/api/v1/auth/login/', HTTP_USER_AGENT=CHROME_WINDOWS, REMOTE_ADDR='1.0.2.3')
+        with django_capture_on_commit_callbacks(execute=True):
+            log_login(username='alice', request=request)
+
+        log = LoginLog.objects.get()
+        assert (log.device, log.browser, log.os) == ('Desktop', 'Chrome 120', 'Windows 10')
+        assert log.location == '中国 福建省 福州市 电信'
+
+    def test_backfill_command(self, ip_database):
+        """测试补全历史登录日志，已有的值不覆盖"""
+        LoginLog.objects.bulk_create([
+            LoginLog(username='a', ip_address='8.8.8.8', user_agent=SAFARI_IPHONE),
+            LoginLog(username='b', ip_address='8.8.4.4', user_agent=CHROME_WINDOWS, browser='Custom'),
+        ])
+        call_command('enrich_login_logs', '--sleep', '0', stdout=StringIO())
+
+        first, second = LoginLog.objects.order_by('id')
+        assert (first.os, first.location) == ('iOS 17', '美国 Google')
+        assert (second.browser, second.location) == ('Custom', None)
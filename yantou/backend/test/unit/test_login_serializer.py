@@ -0,0 +1,59 @@
+"""
+登录序列化器测试
+测试 LoginSerializer.validate 中的失败限制和批量缓存访问
+"""
+import pytest
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import RequestFactory
+from apps.auth.serializers import LoginSerializer
+from apps.common.exceptions import AuthenticationException, RateLimitException
+
+
+def validate_login(username, password, captcha=''):
+    """使用测试请求执行登录校验"""
+    request = RequestFactory().post('/api/v1/auth/login/', REMOTE_ADDR='10.0.0.1')
+    serializer = LoginSerializer(context={'request': request})
+    return serializer.validate({'username': username, 'password': password, 'captcha': captcha})
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestLoginSerializerValidate:
+    """登录校验测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_success_reads_state_in_one_batch(self, user):
+        """测试登录成功时认证前状态只读取一次缓存"""
+        with patch('apps.auth.serializers.cache', wraps=cache) as mock_cache:
+            attrs = validate_login('testuser', 'testpass123')
+
+        assert attrs['user'] == user
+        assert mock_cache.get_many.call_count == 1
+        assert mock_cache.get.call_count == 0
+        assert mock_cache.delete_many.call_count == 0
+
+    def test_failure_records_attempt(self, user):
+        """测试密码错误时记录失败并返回剩余次数"""
+        with pytest.raises(AuthenticationException) as exc_info:
+            validate_login('testuser', 'wrong')
+
+        assert '4' in str(exc_info.value.detail)
+        assert cache.get('login_attempts:10.0.0.1:testuser')['count'] == 1
+
+    def test_lockout_after_max_attempts(self, user):
+        """测试达到最大失败次数后锁定"""
+        cache.set('login_attempts:10.0.0.1:testuser', {'count': 5, 'first_attempt': 0, 'last_attempt': 0})
+        with patch('apps.auth.security.time.time', return_value=100):
+            with pytest.raises(RateLimitException):
+                validate_login('testuser', 'testpass123')
+
+    def test_success_clears_failures(self, user):
+        """测试登录成功后清除失败记录"""
+        with pytest.raises(AuthenticationException):
+            validate_login('testuser', 'wrong')
+        validate_login('testuser', 'testpass123')
+
+        assert cache.get('login_attempts:10.0.0.1:testuser') is None
@@ -0,0 +1,58 @@
+"""
+日志表分区测试
+测试 apps/common/partitions.py 中的月份计算和非 PostgreSQL 数据库下的行为
+（分区 DDL 需要 PostgreSQL，测试环境为 SQLite）
+"""
+import pytest
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+from django.core.management import call_command
+from apps.common.partitions import (
+    add_months,
+    default_partition_name,
+    drop_partitions_before,
+    ensure_partitions,
+    month_start,
+    parse_partition_month,
+    partition_name,
+)
+
+
+@pytest.mark.unit
+class TestPartitionHelpers:
+    """分区辅助函数测试"""
+
+    def test_month_start_uses_utc(self):
+        """测试按 UTC 取月份"""
+        value = datetime(2026, 10, 31, 23, 30, tzinfo=dt_timezone.utc)
+        assert month_start(value) == date(2026, 10, 1)
+
+    def test_add_months_across_years(self):
+        """测试跨年加减月份"""
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name_round_trip(self):
+        """测试分区表名与月份互相转换"""
+        name = partition_name('sys_audit_log', date(2026, 3, 1))
+        assert name == 'sys_audit_log_p202603'
+        assert parse_partition_month('sys_audit_log', name) == date(2026, 3, 1)
+        assert parse_partition_month('sys_audit_log', default_partition_name('sys_audit_log')) is None
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestPartitionsOnOtherDatabases:
+    """非 PostgreSQL 数据库测试"""
+
+    def test_functions_are_noops(self):
+        """测试非 PostgreSQL 数据库下不做任何处理"""
+        now = datetime.now(dt_timezone.utc)
+        assert ensure_partitions('sys_audit_log') == []
+        assert drop_partitions_before('sys_audit_log', now) == []
+
+    def test_command_skips(self):
+        """测试分区维护命令跳过"""
+        out = StringIO()
+        call_command('manage_log_partitions', '--drop', stdout=out)
+        assert '跳过' in out.getvalue()
@@ -0,0 +1,49 @@
+"""
+泄露密码校验测试
+测试 build_breached_password_index 命令和 BreachedPasswordValidator
+"""
+import hashlib
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from apps.auth.password_validation import BreachedPasswordValidator, get_breached_password_index
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    """生成包含明文和 SHA-1 格式记录的索引文件"""
+    source = tmp_path / 'breached.txt'
+    sha1 = hashlib.sha1('Summer2024!'.encode()).hexdigest().upper()
+    rare = hashlib.sha1('RareSecret9#'.encode()).hexdigest().upper()
+    source.write_text(f'password123\nqwerty\n{sha1}:120\n{rare}:1\npassword123\n', encoding='utf-8')
+    path = tmp_path / 'breached.idx'
+    call_command('build_breached_password_index', str(source), output=str(path), min_count=2, chunk_size=2)
+    return str(path)
+
+
+@pytest.mark.unit
+class TestBreachedPasswordValidator:
+    """泄露密码校验测试"""
+
+    def test_index_deduplicates_and_filters(self, index_path):
+        """测试索引去重并过滤低频记录"""
+        assert len(get_breached_password_index(index_path)) == 3
+
+    def test_rejects_breached_password(self, index_path):
+        """测试拒绝泄露密码"""
+        validator = BreachedPasswordValidator(index_path=index_path)
+
+        for password in ['password123', 'qwerty', 'Summer2024!']:
+            with pytest.raises(ValidationError):
+                validator.validate(password)
+
+    def test_accepts_other_password(self, index_path):
+        """测试未泄露的密码和低频记录通过校验"""
+        validator = BreachedPasswordValidator(index_path=index_path)
+
+        validator.validate('Xk9#mP2$vL5q')
+        validator.validate('RareSecret9#')
+
+    def test_missing_index_is_noop(self, tmp_path):
+        """测试索引文件不存在时不做校验"""
+        BreachedPasswordValidator(index_path=str(tmp_path / 'missing.idx')).validate('password123')
@@ -0,0 +1,90 @@
+"""
+过期数据清理命令测试
+测试 purge_expired_data 管理命令的分批删除和断点续删
+"""
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from apps.common.management.commands.purge_expired_data import get_checkpoint_key
+from apps.common.models import AuditLog, LoginLog
+
+
+def create_token(user, jti, expires_at):
+    return OutstandingToken.objects.create(user=user, jti=jti, token=jti, expires_at=expires_at)
+
+
+def age_rows(model, days):
+    """created_at 为 auto_now_add，创建后再修改"""
+    model.objects.update(created_at=timezone.now() - timedelta(days=days))
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestPurgeExpiredData:
+    """过期数据清理命令测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def run(self, *args):
+        out = StringIO()
+        call_command('purge_expired_data', '--sleep', '0', *args, stdout=out)
+        return out.getvalue()
+
+    def test_deletes_expired_tokens_only(self, user):
+        """测试只删除已过期的 Token 及其黑名单记录"""
+        now = timezone.now()
+        expired = [create_token(user, f'expired-{i}', now - timedelta(days=1)) for i in range(5)]
+        valid = create_token(user, 'valid', now + timedelta(days=1))
+        BlacklistedToken.objects.create(token=expired[0])
+        BlacklistedToken.objects.create(token=valid)
+
+        self.run('--targets', 'blacklisted_tokens', 'outstanding_tokens', '--batch-size', '2')
+
+        assert list(OutstandingToken.objects.values_list('jti', flat=True)) == ['valid']
+        assert list(BlacklistedToken.objects.values_list('token__jti', flat=True)) == ['valid']
+        assert cache.get(get_checkpoint_key('outstanding_tokens')) is None
+
+    def test_log_retention(self, settings):
+        """测试按保留天数清理日志，保留天数为 0 时跳过"""
+        settings.LOGIN_LOG_RETENTION_DAYS = 30
+        settings.AUDIT_LOG_RETENTION_DAYS = 0
+        LoginLog.objects.bulk_create([LoginLog(username=f'u{i}') for i in range(3)])
+        AuditLog.objects.create(action='other', resource_type='test')
+        age_rows(LoginLog, 60)
+        age_rows(AuditLog, 60)
+        LoginLog.objects.create(username='recent')
+
+        output = self.run('--targets', 'login_logs', 'audit_logs')
+
+        assert list(LoginLog.objects.values_list('username', flat=True)) == ['recent']
+        assert AuditLog.objects.count() == 1
+        assert '条/秒' in output
+
+    def test_resumes_from_checkpoint(self, settings):
+        """测试从上次中断的位置继续，已扫描范围不再处理"""
+        settings.LOGIN_LOG_RETENTION_DAYS = 30
+        LoginLog.objects.bulk_create([LoginLog(username=f'u{i}') for i in range(4)])
+        age_rows(LoginLog, 60)
+        ids = list(LoginLog.objects.order_by('pk').values_list('pk', flat=True))
+        cutoff = timezone.now() - timedelta(days=30)
+        cache.set(get_checkpoint_key('login_logs'), {'cursor': ids[1], 'cutoff': cutoff.isoformat()})
+
+        self.run('--targets', 'login_logs')
+
+        assert list(LoginLog.objects.order_by('pk').values_list('pk', flat=True)) == ids[:2]
+
+    def test_dry_run(self, settings):
+        """测试只统计不删除"""
+        settings.LOGIN_LOG_RETENTION_DAYS = 30
+        LoginLog.objects.create(username='old')
+        age_rows(LoginLog, 60)
+
+        output = self.run('--targets', 'login_logs', '--dry-run')
+
+        assert '待删除 1 条' in output
+        assert LoginLog.objects.count() == 1
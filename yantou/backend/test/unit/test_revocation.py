@@ -0,0 +1,118 @@
+"""
+Access Token 吊销测试
+测试 utils/bloom.py 和 apps/auth/revocation.py
+"""
+import pytest
+from django.core.cache import cache
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.auth import revocation
+from apps.auth.revocation import RevocationFilter, is_access_token_revoked, revoke_access_token
+from apps.auth.tokens import RefreshToken
+from utils.bloom import BloomFilter
+
+
+@pytest.mark.unit
+class TestBloomFilter:
+    """布隆过滤器测试"""
+
+    def test_no_false_negatives(self):
+        """测试已添加的元素一定命中"""
+        bloom = BloomFilter(1000, 0.01)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        assert len(bloom) == 1000
+
+    def test_false_positive_rate(self):
+        """测试误判率接近配置值"""
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestAccessTokenRevocation:
+    """Access Token 吊销测试"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_filter(self, monkeypatch):
+        cache.clear()
+        monkeypatch.setattr(revocation, '_revocation_filter', RevocationFilter(capacity=1000, sync_interval=0))
+
+    def test_revoke_access_token(self, user):
+        """测试吊销后的 Access Token 被识别"""
+        token = AccessToken.for_user(user)
+        other = AccessToken.for_user(user)
+        revoke_access_token(token)
+
+        assert is_access_token_revoked(token)
+        assert not is_access_token_revoked(other)
+
+    def test_other_worker_syncs_revocation(self, user):
+        """测试其他进程通过吊销日志增量同步"""
+        token = AccessToken.for_user(user)
+        worker = RevocationFilter(capacity=1000, sync_interval=0)
+        worker.sync()
+        revoke_access_token(token)
+
+        assert not worker.might_contain(token['jti'])
+        assert worker.is_revoked(token['jti'])
+
+    def test_sync_waits_for_unwritten_log_entry(self):
+        """测试版本号已递增但日志条目未写入时，同步停在该版本，条目写入后补上"""
+        worker = RevocationFilter(capacity=1000, sync_interval=0)
+        cache.set(revocation.VERSION_KEY, 2)
+        cache.set(revocation.get_log_key(2), 'jti-2')
+        worker.sync()
+        assert worker.version == 0
+
+        cache.set(revocation.get_log_key(1), 'jti-1')
+        worker.sync()
+        assert worker.version == 2
+        assert worker.might_contain('jti-1') and worker.might_contain('jti-2')
+
+    def test_sync_skips_lost_log_entry(self, monkeypatch):
+        """测试日志条目超时仍未写入时跳过"""
+        monkeypatch.setattr(revocation, 'LOG_GAP_TIMEOUT', 0)
+        worker = RevocationFilter(capacity=1000, sync_interval=0)
+        cache.set(revocation.VERSION_KEY, 2)
+        cache.set(revocation.get_log_key(2), 'jti-2')
+        worker.sync()
+        assert worker.version == 2
+        assert worker.might_contain('jti-2')
+
+    def test_expired_backlog_does_not_delay_new_revocations(self, monkeypatch):
+        """测试大量已过期的日志条目不会推迟新吊销生效，窗口内的缺失条目超时后一次全部跳过"""
+        monkeypatch.setattr(revocation, 'LOG_GAP_WINDOW', 5)
+        clock = [1000.0]
+        monkeypatch.setattr(revocation.time, 'monotonic', lambda: clock[0])
+        worker = RevocationFilter(capacity=1000, sync_interval=0)
+        # 1~29 已过期，只剩最新的一条
+        cache.set(revocation.VERSION_KEY, 30)
+        cache.set(revocation.get_log_key(30), 'jti-30')
+
+        worker.sync()
+        assert worker.might_contain('jti-30')
+        assert worker.version == 25
+
+        clock[0] += revocation.LOG_GAP_TIMEOUT
+        worker.sync()
+        assert worker.version == 30
+        assert worker.gaps == {}
+
+    def test_logout_revokes_access_token(self, api_client, user):
+        """测试登出后当前 Access Token 立即失效"""
+        refresh = RefreshToken.for_user(user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        response = api_client.post('/api/v1/auth/logout/', {'refresh': str(refresh)}, format='json')
+        assert response.status_code == 200
+
+        response = api_client.get('/api/v1/users/me/')
+        assert response.status_code == 401
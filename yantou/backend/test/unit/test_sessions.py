@@ -0,0 +1,66 @@
+"""
+用户会话代数测试
+测试 apps/auth/sessions.py 中的会话吊销
+"""
+import pytest
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from apps.auth.authentication import CachedJWTAuthentication
+from apps.auth.sessions import TOKEN_GENERATION_CLAIM, revoke_user_sessions
+from apps.auth.tokens import RefreshToken
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestRevokeUserSessions:
+    """会话吊销测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_token_carries_generation(self, user):
+        """测试签发的 Token 带有当前会话代数"""
+        revoke_user_sessions(user.id)
+        refresh = RefreshToken.for_user(user)
+
+        assert refresh[TOKEN_GENERATION_CLAIM] == 1
+        assert refresh.access_token[TOKEN_GENERATION_CLAIM] == 1
+
+    def test_revoke_rejects_existing_tokens(self, user):
+        """测试吊销后此前签发的 Access / Refresh Token 均失效"""
+        refresh = RefreshToken.for_user(user)
+        access = refresh.access_token
+        revoke_user_sessions(user.id)
+
+        with pytest.raises(AuthenticationFailed):
+            CachedJWTAuthentication().get_user(access)
+        with pytest.raises(TokenError):
+            RefreshToken(str(refresh))
+
+    def test_new_tokens_valid_after_revoke(self, user):
+        """测试吊销后重新登录签发的 Token 有效"""
+        revoke_user_sessions(user.id)
+        refresh = RefreshToken.for_user(user)
+
+        RefreshToken(str(refresh))
+        assert CachedJWTAuthentication().get_user(refresh.access_token).pk == user.pk
+
+    def test_password_change_revokes_sessions(self, user):
+        """测试修改密码后吊销所有会话"""
+        refresh = RefreshToken.for_user(user)
+        user.set_password('newpass123')
+        user.save()
+
+        with pytest.raises(TokenError):
+            RefreshToken(str(refresh))
+
+    def test_logout_all_endpoint(self, api_client, user):
+        """测试登出所有设备接口"""
+        refresh = RefreshToken.for_user(user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        response = api_client.post('/api/v1/auth/logout-all/')
+        assert response.status_code == 200
+
+        response = api_client.post('/api/v1/auth/refresh/', {'refresh': str(refresh)}, format='json')
+        assert response.status_code == 401
@@ -0,0 +1,64 @@
+"""
+限流测试
+测试 apps/common/throttling.py 中的限流算法和 DRF 限流类
+"""
+import pytest
+from django.core.cache import cache
+from apps.common.throttling import SlidingWindowLimiter, TokenBucketLimiter, parse_rate
+
+
+@pytest.mark.unit
+class TestRateLimiters:
+    """限流算法测试（缓存 API 回退实现）"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        """测试解析限流频率"""
+        assert parse_rate('10/min') == (10, 60)
+        assert parse_rate('5/hour') == (5, 3600)
+        assert parse_rate('1/s') == (1, 1)
+
+    def test_sliding_window_blocks_over_limit(self):
+        """测试滑动窗口超过限制后拒绝并返回等待时间"""
+        limiter = SlidingWindowLimiter()
+        results = [limiter.hit('test', 3, 60) for _ in range(4)]
+
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert 0 < results[-1][1] <= 60
+
+    def test_token_bucket_allows_burst(self):
+        """测试令牌桶允许突发请求，耗尽后返回补充时间"""
+        limiter = TokenBucketLimiter()
+        results = [limiter.hit('test', 60, 60, burst=2) for _ in range(3)]
+
+        assert [allowed for allowed, _ in results] == [True, True, False]
+        assert 0 < results[-1][1] <= 1
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestScopedRateThrottle:
+    """DRF 限流类测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_throttled_response_has_retry_after(self, api_client, settings):
+        """测试超过限制返回 429 和 Retry-After 响应头"""
+        settings.RATE_LIMITS = {'captcha': {'rate': '2/min', 'key': 'ip'}}
+
+        for _ in range(2):
+            assert api_client.get('/api/v1/auth/captcha/').status_code == 200
+        response = api_client.get('/api/v1/auth/captcha/')
+
+        assert response.status_code == 429
+        assert int(response['Retry-After']) > 0
+
+    def test_scope_without_rule_not_throttled(self, api_client, settings):
+        """测试未配置规则的作用域不限流"""
+        settings.RATE_LIMITS = {'register': {'rate': '1/min', 'key': 'ip'}}
+
+        for _ in range(3):
+            assert api_client.get('/api/v1/auth/captcha/').status_code == 200
@@ -0,0 +1,85 @@
+"""
+Token 状态存储测试
+测试 apps/auth/token_store.py 中的数据库和缓存后端
+"""
+import pytest
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from apps.auth.tokens import RefreshToken
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestDatabaseTokenStore:
+    """数据库后端测试"""
+
+    def test_for_user_records_outstanding(self, user, settings):
+        """测试签发 Token 时写入 outstanding 表"""
+        settings.JWT_TOKEN_STATE_BACKEND = 'database'
+        refresh = RefreshToken.for_user(user)
+
+        assert OutstandingToken.objects.filter(jti=refresh['jti']).exists()
+
+    def test_blacklist_rejects_token(self, user, settings):
+        """测试加入黑名单后 Token 无法再使用"""
+        settings.JWT_TOKEN_STATE_BACKEND = 'database'
+        refresh = RefreshToken.for_user(user)
+        refresh.blacklist()
+
+        assert BlacklistedToken.objects.filter(token__jti=refresh['jti']).exists()
+        with pytest.raises(TokenError):
+            RefreshToken(str(refresh))
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestCacheTokenStore:
+    """缓存后端测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_for_user_skips_database(self, user, settings):
+        """测试签发 Token 时不写数据库"""
+        settings.JWT_TOKEN_STATE_BACKEND = 'cache'
+        refresh = RefreshToken.for_user(user)
+
+        assert not OutstandingToken.objects.exists()
+        assert cache.get(f"jwt_outstanding:{refresh['jti']}") == str(user.id)
+
+    def test_blacklist_rejects_token(self, user, settings):
+        """测试加入黑名单后 Token 无法再使用，且不写数据库"""
+        settings.JWT_TOKEN_STATE_BACKEND = 'cache'
+        refresh = RefreshToken.for_user(user)
+        refresh.blacklist()
+
+        assert not BlacklistedToken.objects.exists()
+        with pytest.raises(TokenError):
+            RefreshToken(str(refresh))
+
+    def test_rotate_issues_new_jti(self, user, settings):
+        """测试旋转后生成新的 jti 并保留用户声明"""
+        settings.JWT_TOKEN_STATE_BACKEND = 'cache'
+        refresh = RefreshToken.for_user(user)
+        old_jti = refresh['jti']
+        refresh.blacklist()
+
+        rotated = RefreshToken(str(refresh), verify=False).rotate()
+
+        assert rotated['jti'] != old_jti
+        assert rotated['user_id'] == str(user.id)
+        RefreshToken(str(rotated))
+
+    def test_refresh_endpoint_rotates_without_database(self, api_client, user, settings):
+        """测试刷新接口旋转 Token 且旧 Token 失效"""
+        settings.JWT_TOKEN_STATE_BACKEND = 'cache'
+        refresh = str(RefreshToken.for_user(user))
+
+        response = api_client.post('/api/v1/auth/refresh/', {'refresh': refresh}, format='json')
+        assert response.status_code == 200
+        assert response.json()['data']['refresh'] != refresh
+        assert not OutstandingToken.objects.exists()
+
+        response = api_client.post('/api/v1/auth/refresh/', {'refresh': refresh}, format='json')
+        assert response.status_code in (400, 401)
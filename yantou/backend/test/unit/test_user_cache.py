@@ -0,0 +1,110 @@
+"""
+用户快照缓存测试
+测试 apps/auth/user_cache.py 和 CachedJWTAuthentication
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.auth.authentication import CachedJWTAuthentication
+from apps.auth.user_cache import get_snapshot_key, get_user_snapshot, user_from_snapshot
+from apps.permissions.utils import clear_user_permission_cache
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestUserSnapshot:
+    """用户快照测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_snapshot_cached_after_first_read(self, user):
+        """测试快照首次读取后缓存，再次读取不查询数据库"""
+        get_user_snapshot(user.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            snapshot = get_user_snapshot(user.id)
+
+        assert len(queries) == 0
+        assert snapshot['username'] == user.username
+        assert snapshot['perm_generation'] == 0
+
+    def test_user_loads_deferred_fields_lazily(self, user):
+        """测试访问非快照字段时一次性加载全部字段"""
+        snapshot_user = user_from_snapshot(get_user_snapshot(user.id))
+
+        with CaptureQueriesContext(connection) as queries:
+            assert snapshot_user.email == user.email
+            assert snapshot_user.first_name == user.first_name
+
+        assert len(queries) == 1
+
+    def test_save_invalidates_snapshot(self, user):
+        """测试保存用户后快照失效"""
+        get_user_snapshot(user.id)
+        user.is_active = False
+        user.save()
+
+        assert cache.get(get_snapshot_key(user.id)) is None
+        assert get_user_snapshot(user.id)['is_active'] is False
+
+    def test_stale_snapshot_rejected_by_version(self, user):
+        """测试版本号不一致的快照不会被使用"""
+        stale = dict(get_user_snapshot(user.id), username='stale')
+        user.save()
+        cache.set(get_snapshot_key(user.id), stale)
+
+        assert get_user_snapshot(user.id)['username'] == user.username
+
+    def test_permission_change_bumps_generation(self, user):
+        """测试清除权限缓存后权限代数递增"""
+        get_user_snapshot(user.id)
+        clear_user_permission_cache(user)
+
+        assert get_user_snapshot(user.id)['perm_generation'] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestCachedJWTAuthentication:
+    """快照认证测试"""
+
+    def setup_method(self):
+        cache.clear()
+
+    def test_authenticates_from_snapshot(self, user):
+        """测试从快照认证用户"""
+        authentication = CachedJWTAuthentication()
+        token = AccessToken.for_user(user)
+        authentication.get_user(token)
+
+        with CaptureQueriesContext(connection) as queries:
+            authenticated = authentication.get_user(token)
+
+        assert len(queries) == 0
+        assert authenticated.pk == user.pk
+        assert authenticated.is_authenticated
+
+    def test_inactive_user_rejected(self, user):
+        """测试禁用用户无法认证"""
+        authentication = CachedJWTAuthentication()
+        token = AccessToken.for_user(user)
+        authentication.get_user(token)
+        user.is_active = False
+        user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            authentication.get_user(token)
+
+    def test_deleted_user_rejected(self, user):
+        """测试删除的用户无法认证"""
+        authentication = CachedJWTAuthentication()
+        token = AccessToken.for_user(user)
+        authentication.get_user(token)
+        user.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            authentication.get_user(token)
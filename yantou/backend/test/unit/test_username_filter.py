@@ -0,0 +1,127 @@
+"""
+用户名可用性测试
+测试 apps/auth/username_filter.py 中的布隆过滤器和可用性接口
+"""
+import pytest
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.auth import username_filter as username_filter_module
+from apps.auth.username_filter import UsernameFilter, is_username_taken
+
+
+@pytest.fixture
+def fresh_filter(monkeypatch):
+    """替换为新的过滤器，避免其他测试残留的状态"""
+    instance = UsernameFilter(refresh_interval=3600, rebuild_interval=3600, background=False)
+    monkeypatch.setattr(username_filter_module, 'username_filter', instance)
+    monkeypatch.setattr('apps.auth.signals.username_filter', instance)
+    return instance
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestUsernameFilter:
+    """用户名过滤器测试"""
+
+    def test_builds_lazily_from_database(self, user, fresh_filter):
+        """测试首次使用时从数据库构建"""
+        assert fresh_filter.bloom is None
+        assert fresh_filter.might_exist(user.username)
+        assert fresh_filter.watermark == user.date_joined
+
+    def test_request_thread_does_not_build(self, user, monkeypatch):
+        """测试后台维护模式下请求线程不构建过滤器，构建完成前交给数据库确认"""
+        instance = UsernameFilter(refresh_interval=3600, rebuild_interval=3600)
+        monkeypatch.setattr(instance, 'start', lambda: None)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert instance.might_exist('nobody_here') is True
+        assert len(queries) == 0
+        assert instance.bloom is None
+
+    def test_absent_username_skips_database(self, user, fresh_filter):
+        """测试过滤器判断不存在时不查询数据库"""
+        fresh_filter.ensure_fresh()
+
+        with CaptureQueriesContext(connection) as queries:
+            assert is_username_taken('nobody_here') is False
+        assert len(queries) == 0
+
+    def test_possible_match_confirmed_by_database(self, user, fresh_filter):
+        """测试过滤器判断可能存在时查询数据库确认"""
+        fresh_filter.ensure_fresh()
+
+        with CaptureQueriesContext(connection) as queries:
+            assert is_username_taken(user.username) is True
+        assert len(queries) == 1
+
+    def test_created_user_added_by_signal(self, db, fresh_filter):
+        """测试本进程创建的用户立即加入过滤器"""
+        fresh_filter.ensure_fresh()
+        User.objects.create_user(username='newcomer', password='TestPass123!')
+        assert 'newcomer' in fresh_filter.bloom
+
+    def test_refresh_pulls_users_created_elsewhere(self, user, fresh_filter):
+        """测试增量刷新拉取其他进程创建的用户"""
+        fresh_filter.ensure_fresh()
+        # bulk_create 不发送 post_save，模拟其他进程创建的用户
+        User.objects.bulk_create([User(username='elsewhere')])
+        assert 'elsewhere' not in fresh_filter.bloom
+
+        fresh_filter.refresh()
+        assert 'elsewhere' in fresh_filter.bloom
+        assert fresh_filter.watermark == User.objects.get(username='elsewhere').date_joined
+
+    def test_refresh_overlaps_watermark(self, user, fresh_filter):
+        """测试注册时间略早于水位（较晚提交）的用户仍被拉取"""
+        fresh_filter.ensure_fresh()
+        User.objects.bulk_create([User(username='late_commit', date_joined=user.date_joined - timedelta(seconds=10))])
+
+        fresh_filter.refresh()
+        assert 'late_commit' in fresh_filter.bloom
+
+    def test_rename_reaches_other_workers(self, user, fresh_filter):
+        """测试修改用户名后，其他进程增量刷新时通过改名日志拉取"""
+        cache.clear()
+        other = UsernameFilter(refresh_interval=3600, rebuild_interval=3600, background=False)
+        other.ensure_fresh()
+        user.username = 'renamed_user'
+        user.save()
+        assert 'renamed_user' not in other.bloom
+
+        other.refresh()
+        assert 'renamed_user' in other.bloom
+
+    def test_save_without_rename_not_published(self, user, fresh_filter):
+        """测试保存其他字段（用户名未变更）时不写入改名日志"""
+        cache.clear()
+        user.is_active = False
+        user.save()
+        User.objects.get(pk=user.pk).save()
+        assert cache.get(username_filter_module.RENAME_VERSION_KEY) is None
+
+
+@pytest.mark.unit
+@pytest.mark.requires_db
+class TestUsernameAvailabilityView:
+    """用户名可用性接口测试"""
+
+    url = '/api/v1/auth/username-available/'
+
+    def test_available_and_taken(self, api_client, user, fresh_filter):
+        """测试可用与已占用的用户名"""
+        response = api_client.get(self.url, {'username': 'free_name'})
+        assert response.status_code == 200
+        assert response.data['data']['available'] is True
+
+        response = api_client.get(self.url, {'username': user.username})
+        assert response.data['data']['available'] is False
+
+    def test_invalid_format(self, api_client, fresh_filter):
+        """测试用户名格式不正确"""
+        response = api_client.get(self.url, {'username': 'a'})
+        assert response.status_code == 400
+        assert response.data['code'] == 'E001001'
@@ -0,0 +1,81 @@
+"""
+后台任务工具
+提供按固定间隔在后台线程中执行刷新函数的工具，用于批量写入缓冲数据
+"""
+import atexit
+import os
+import threading
+from typing import Callable
+from django.db import connections
+import logging
+
+logger = logging.getLogger('django.request')
+
+
+class PeriodicFlusher:
+    """
+    周期刷新器
+    在守护线程中每隔 interval 秒调用一次 func，进程退出时再调用一次，确保缓冲数据写入。
+    线程在首次 start() 时启动，fork 后的子进程会重新启动自己的线程。
+    缓冲数据达到阈值时可调用 wake() 立即触发一次刷新，不必等到下一个间隔。
+    """
+
+    def __init__(self, func: Callable[[], None], interval: float, name: str):
+        """
+        Args:
+            func: 刷新函数
+            interval: 刷新间隔（秒）
+            name: 线程名称
+        """
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self._thread = None
+        self._pid = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """启动后台线程（已启动时不做任何操作）"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._stop_event = threading.Event()
+            self._wake_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self):
+        """后台线程主循环"""
+        while True:
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                return
+            self.flush()
+
+    def wake(self):
+        """立即触发一次后台刷新"""
+        self._wake_event.set()
+
+    def flush(self):
+        """执行一次刷新，异常只记录日志不中断线程"""
+        try:
+            self.func()
+        except Exception as e:
+            logger.error(f"{self.name} flush failed: {str(e)}", exc_info=True)
+        finally:
+            # 后台线程使用独立的数据库连接，刷新后关闭，避免长期占用
+            if threading.current_thread() is self._thread:
+                connections.close_all()
+
+    def stop(self):
+        """停止后台线程并执行最后一次刷新"""
+        self._stop_event.set()
+        self._wake_event.set()
+        self.flush()
@@ -0,0 +1,61 @@
+"""
+布隆过滤器
+提供固定内存的集合成员判断：不存在的元素一定返回 False，存在的元素可能误判为 True
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    布隆过滤器
+    位数组使用 bytearray 存储，哈希使用 blake2b 双重哈希（h1 + i * h2）生成 k 个位置
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: 预计容纳的元素数量
+            error_rate: 达到容量时的误判率
+        """
+        if capacity <= 0:
+            raise ValueError('capacity 必须大于 0')
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate 必须在 0 和 1 之间')
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        """计算元素对应的位位置"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        """
+        添加元素
+
+        Args:
+            item: 元素
+        """
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        """清空过滤器"""
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
@@ -0,0 +1,76 @@
+"""
+缓存工具函数
+提供直接访问 Redis 客户端的辅助函数，用于缓存 API 无法表达的原子操作（有序集合、管道、Lua 脚本等）
+"""
+from django.core.cache import caches
+import logging
+
+logger = logging.getLogger('django.request')
+
+
+def get_redis_client(alias: str = 'default'):
+    """
+    获取缓存后端对应的 Redis 客户端
+
+    Args:
+        alias: 缓存别名
+
+    Returns:
+        Redis 客户端，缓存后端不是 django-redis 时返回 None（调用方应回退到缓存 API）
+    """
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        return None
+
+    try:
+        return get_redis_connection(alias)
+    except NotImplementedError:
+        # 非 django-redis 后端（如测试环境的 LocMemCache）
+        return None
+
+
+def make_cache_key(key: str, alias: str = 'default') -> str:
+    """
+    生成带 KEY_PREFIX 和版本号的完整缓存键，与缓存 API 写入的键保持一致
+
+    Args:
+        key: 缓存键
+        alias: 缓存别名
+
+    Returns:
+        str: 完整缓存键
+    """
+    return caches[alias].make_key(key)
+
+
+
+def write_many(items: dict, delete_keys=(), alias: str = 'default'):
+    """
+    批量写入和删除缓存键，Redis 后端在一个管道中完成（一次网络往返）
+
+    Args:
+        items: {缓存键: (值, 超时时间)}，各键可使用不同的超时时间
+        delete_keys: 需要删除的缓存键
+        alias: 缓存别名
+    """
+    backend = caches[alias]
+    client = get_redis_client(alias)
+    if client is None:
+        for key, (value, timeout) in items.items():
+            backend.set(key, value, timeout=timeout)
+        if delete_keys:
+            backend.delete_many(list(delete_keys))
+        return
+
+    # django-redis 的 set/delete 支持传入 client，使用管道时按缓存的序列化和键规则写入
+    pipe = client.pipeline(transaction=False)
+    for key, (value, timeout) in items.items():
+        backend.set(key, value, timeout=timeout, client=pipe)
+    for key in delete_keys:
+        backend.delete(key, client=pipe)
+    try:
+        pipe.execute()
+    except Exception as e:
+        # 与 IGNORE_EXCEPTIONS 行为一致，缓存故障不影响主业务
+        logger.warning(f"Cache pipeline write failed: {str(e)}")
@@ -292,3 +292,22 @@ def get_cache_key(prefix: str, *args, **kwargs) -> str:
     key_parts.extend(f'{k}:{v}' for k, v in sorted(kwargs.items()))
     return ':'.join(key_parts)
 
+
+
+def incr_cache_counter(key: str, timeout: Optional[int] = None) -> int:
+    """
+    原子递增缓存计数器，键不存在时从 0 开始
+    
+    Args:
+        key: 缓存键
+        timeout: 过期时间（秒），None 表示永不过期
+        
+    Returns:
+        int: 递增后的值
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # 键不存在：add 保证并发时只有一个进程初始化
+        cache.add(key, 0, timeout=timeout)
+        return cache.incr(key)
@@ -0,0 +1,78 @@
+"""
+HyperLogLog 基数估计
+用固定大小的寄存器数组估计集合中不同元素的数量，精度 p 时占用 2^p 字节，标准误差约 1.04 / sqrt(2^p)
+（默认 p=12：4 KB，误差约 1.6%）。两个估计器可按寄存器取最大值合并，得到并集的估计。
+"""
+import hashlib
+import math
+
+
+class HyperLogLog:
+    """
+    HyperLogLog 估计器
+    哈希使用 64 位 blake2b，前 p 位选择寄存器，寄存器记录其余位中首个 1 的位置的最大值
+    """
+
+    def __init__(self, precision: int = 12, registers: bytes = None):
+        """
+        Args:
+            precision: 精度（寄存器数为 2^precision，取值 4-16）
+            registers: 已有的寄存器数据（从 to_bytes() 还原）
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError('precision 必须在 4 和 16 之间')
+
+        self.precision = precision
+        self.num_registers = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.num_registers)
+        elif len(registers) != self.num_registers:
+            raise ValueError('寄存器数据长度与精度不匹配')
+        else:
+            self.registers = bytearray(registers)
+
+    def add(self, item: str):
+        """
+        添加元素
+
+        Args:
+            item: 元素
+        """
+        value = int.from_bytes(hashlib.blake2b(str(item).encode('utf-8'), digest_size=8).digest(), 'little')
+        index = value >> (64 - self.precision)
+        remaining = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        """
+        合并另一个估计器（结果为两个集合并集的估计）
+
+        Args:
+            other: 相同精度的估计器
+        """
+        if other.precision != self.precision:
+            raise ValueError('只能合并相同精度的 HyperLogLog')
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self) -> int:
+        """估计不同元素的数量"""
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        # 小基数时使用线性计数修正
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """导出寄存器数据"""
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        """从寄存器数据还原（精度由数据长度确定）"""
+        precision = len(data).bit_length() - 1
+        return cls(precision, data)
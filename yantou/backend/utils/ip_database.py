@@ -0,0 +1,142 @@
+"""
+离线 IP 地址库
+把 (起始 IP, 结束 IP, 地点) 区间表编译为一个二进制文件，查询时 mmap 映射后二分查找，
+不加载到内存、不访问外部服务，多个进程共享操作系统的页缓存。
+
+文件格式（小端序）：
+- 文件头: 魔数 b'YTIP'、版本号 (uint16)、区间数 (uint32)、字符串区偏移 (uint32)
+- 区间表: 按起始 IP 排序的定长记录，每条为起始 IP、结束 IP、地点在字符串区中的偏移（均为 uint32）
+- 字符串区: 去重后的地点，每个为长度 (uint16) + UTF-8 内容
+
+只支持 IPv4（包括 IPv4 映射的 IPv6 地址）；其他 IPv6 地址查询结果为 None。
+"""
+import ipaddress
+import mmap
+import os
+import struct
+from typing import Iterable, Optional, Tuple
+
+MAGIC = b'YTIP'
+VERSION = 1
+HEADER = struct.Struct('<4sHII')
+RECORD = struct.Struct('<III')
+START = struct.Struct('<I')
+LENGTH = struct.Struct('<H')
+
+# 内网、回环等地址不在地址库中，直接返回该地点
+PRIVATE_LOCATION = '内网'
+
+
+def ip_to_int(ip: str) -> Optional[int]:
+    """
+    IPv4 地址转为整数
+
+    Returns:
+        int: 无效地址或非 IPv4 地址时返回 None
+    """
+    try:
+        address = ipaddress.ip_address(ip.strip())
+    except (ValueError, AttributeError):
+        return None
+    if address.version == 6:
+        address = address.ipv4_mapped
+        if address is None:
+            return None
+    return int(address)
+
+
+def parse_ip(value: str) -> int:
+    """解析点分或整数形式的 IPv4 地址（编译地址库时使用）"""
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    number = ip_to_int(value)
+    if number is None:
+        raise ValueError(f'Invalid IPv4 address: {value}')
+    return number
+
+
+def build_database(ranges: Iterable[Tuple[int, int, str]], path: str) -> int:
+    """
+    编译地址库文件（先写临时文件再替换，查询中的进程不受影响）
+
+    Args:
+        ranges: (起始 IP 整数, 结束 IP 整数, 地点) 区间
+        path: 输出文件路径
+
+    Returns:
+        int: 区间数
+    """
+    records = sorted((start, end, location) for start, end, location in ranges if start <= end)
+    strings = bytearray()
+    offsets = {}
+    for _start, _end, location in records:
+        if location not in offsets:
+            data = location.encode('utf-8')[:0xFFFF]
+            offsets[location] = len(strings)
+            strings += LENGTH.pack(len(data)) + data
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), HEADER.size + RECORD.size * len(records)))
+        for start, end, location in records:
+            f.write(RECORD.pack(start, end, offsets[location]))
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+class IPDatabase:
+    """
+    地址库查询（只读，线程安全）
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self._strings = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError(f'Unsupported IP database: {path}')
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._data.close()
+
+    def lookup(self, ip: str) -> Optional[str]:
+        """
+        查询 IP 所在地点
+
+        Args:
+            ip: IP 地址
+
+        Returns:
+            str: 地点，不在地址库中时返回 None
+        """
+        number = ip_to_int(ip) if ip else None
+        if number is None:
+            return None
+        if ipaddress.IPv4Address(number).is_private:
+            return PRIVATE_LOCATION
+
+        # 找到最后一个起始 IP <= number 的区间
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if START.unpack_from(self._data, HEADER.size + middle * RECORD.size)[0] <= number:
+                low = middle + 1
+            else:
+                high = middle
+        if low == 0:
+            return None
+        _start, end, offset = RECORD.unpack_from(self._data, HEADER.size + (low - 1) * RECORD.size)
+        if number > end:
+            return None
+        position = self._strings + offset
+        length = LENGTH.unpack_from(self._data, position)[0]
+        return self._data[position + LENGTH.size:position + LENGTH.size + length].decode('utf-8')
@@ -4,9 +4,11 @@ JWT 工具函数
 """
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import get_user_model
+from apps.auth.tokens import RefreshToken
+from apps.auth.user_cache import get_user_snapshot, user_from_snapshot
 
 User = get_user_model()
 
@@ -35,6 +37,7 @@ def create_token_pair(user) -> Dict[str, str]:
 def get_user_from_token(token: str) -> Optional[User]:
     """
     从 Access Token 中获取用户对象
+    用户从缓存快照构造，其余字段在首次访问时加载
     
     Args:
         token: Access Token 字符串
@@ -44,10 +47,10 @@ def get_user_from_token(token: str) -> Optional[User]:
     """
     try:
         access_token = AccessToken(token)
-        user_id = access_token['user_id']
-        return User.objects.get(id=user_id)
-    except (TokenError, User.DoesNotExist, KeyError):
+        snapshot = get_user_snapshot(access_token['user_id'])
+    except (TokenError, KeyError):
         return None
+    return user_from_snapshot(snapshot) if snapshot is not None else None
 
 
 def refresh_access_token(refresh_token: str) -> Optional[Dict[str, str]]:
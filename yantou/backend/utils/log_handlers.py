@@ -0,0 +1,194 @@
+"""
+日志处理器和格式化器
+- JSONFormatter: JSON 格式化器，安装了 orjson 时使用 orjson 序列化
+- QueueLoggingHandler: 请求线程只把日志记录放入进程内队列，由后台 QueueListener 线程格式化并写入实际的处理器，
+  控制台或磁盘阻塞时不影响请求延迟；队列已满时丢弃并计数，不阻塞请求线程
+- ProcessSafeFileHandler: 多进程安全的文件处理器。多个 worker 以追加方式写同一文件，由 logrotate 等外部工具轮转，
+  检测到文件被轮转后重新打开（WatchedFileHandler）；也可以每个进程写自己的文件（文件名追加进程 ID）
+
+不在进程间共享 RotatingFileHandler：多个 gunicorn worker 各自判断文件大小并改名轮转会互相覆盖。
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时使用标准库 json
+    orjson = None
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    JSON 格式化器
+    将日志记录格式化为 JSON 格式，便于日志聚合和分析
+    """
+    def format(self, record):
+        """
+        格式化日志记录为 JSON
+
+        Args:
+            record: 日志记录对象
+
+        Returns:
+            str: JSON 格式的日志字符串
+        """
+        log_data = {
+            'timestamp': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+        }
+
+        # 添加请求 ID（如果存在）
+        if hasattr(record, 'request_id'):
+            log_data['request_id'] = record.request_id
+
+        # 添加错误 ID（如果存在）
+        if hasattr(record, 'error_id'):
+            log_data['error_id'] = record.error_id
+
+        # 添加异常信息（如果存在）
+        if record.exc_info:
+            log_data['exception'] = self.formatException(record.exc_info)
+
+        # 添加额外字段（如果存在）
+        if hasattr(record, 'extra_data'):
+            log_data.update(record.extra_data)
+
+        return self.dumps(log_data)
+
+    def dumps(self, log_data):
+        """序列化为 JSON 字符串（无法序列化的值转为字符串）"""
+        if orjson is not None:
+            try:
+                return orjson.dumps(log_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+            except TypeError:
+                # 超出 orjson 支持范围（如超过 64 位的整数）时回退到标准库
+                pass
+        return json.dumps(log_data, ensure_ascii=False, default=str)
+
+
+def get_handler_by_name(name):
+    """按名称获取已配置的处理器"""
+    getter = getattr(logging, 'getHandlerByName', None)  # Python 3.12+
+    return getter(name) if getter else logging._handlers.get(name)
+
+
+class QueueLoggingHandler(QueueHandler):
+    """
+    队列日志处理器
+    在 LOGGING 中配置为其他处理器的前端：
+        'queue': {
+            '()': 'utils.log_handlers.QueueLoggingHandler',
+            'targets': ['console', 'file'],
+        }
+    目标处理器在首次写日志时按名称查找，后台线程在首次写日志时启动，fork 后的子进程使用自己的队列和线程，
+    进程退出时写完队列中剩余的日志。
+    """
+
+    def __init__(self, targets, queue_size=10000):
+        """
+        Args:
+            targets: 目标处理器名称列表
+            queue_size: 队列容量
+        """
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.targets = list(targets)
+        self.queue_size = queue_size
+        self.listener = None
+        self.dropped = 0
+        self._pid = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def start(self):
+        """启动后台线程（已启动时不做任何操作）"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # fork 后父进程的线程不存在，队列中可能残留父进程的日志，使用新队列
+                self.queue = queue.Queue(maxsize=self.queue_size)
+            handlers = [handler for handler in map(get_handler_by_name, self.targets) if handler is not None]
+            self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        """写完队列中剩余的日志并停止后台线程"""
+        with self._start_lock:
+            if self.listener is not None and self._pid == os.getpid():
+                self.listener.stop()
+            self.listener = None
+            self._pid = None
+
+    def prepare(self, record):
+        """
+        放入队列前的处理：只合并消息参数，格式化留给后台线程
+        （标准库的实现会在请求线程中调用格式化器）
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        """放入队列，已满时丢弃"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        self.start()
+        super().emit(record)
+
+    def close(self):
+        self.stop()
+        super().close()
+
+
+class ProcessSafeFileHandler(WatchedFileHandler):
+    """
+    多进程安全的文件处理器
+    - per_process 为 False: 所有进程以追加方式写同一文件，由外部工具轮转（如 logrotate），轮转后自动重新打开
+    - per_process 为 True: 每个进程写 <文件名>.<进程 ID><扩展名>，fork 后的子进程自动切换到自己的文件
+    """
+
+    def __init__(self, filename, per_process=False, mode='a', encoding=None, delay=True, errors=None):
+        self.base_filename = os.fspath(filename)
+        self.per_process = per_process
+        self._pid = os.getpid()
+        super().__init__(self.get_filename(), mode, encoding, delay, errors)
+
+    def get_filename(self):
+        """获取当前进程的文件路径"""
+        if not self.per_process:
+            return self.base_filename
+        root, ext = os.path.splitext(self.base_filename)
+        return f'{root}.{os.getpid()}{ext}'
+
+    def emit(self, record):
+        if self.per_process and self._pid != os.getpid():
+            # fork 后不再写父进程的文件
+            self.acquire()
+            try:
+                if self.stream:
+                    self.stream = None
+                self.baseFilename = os.path.abspath(self.get_filename())
+                self.dev, self.ino = -1, -1
+                self._pid = os.getpid()
+            finally:
+                self.release()
+        super().emit(record)
@@ -0,0 +1,119 @@
+"""
+User-Agent 解析
+按规则表从 User-Agent 中识别设备类型、浏览器和操作系统（只取主版本号），不依赖第三方库。
+
+实际出现的 User-Agent 种类很少（同一批浏览器版本反复出现），解析结果用 LRU 缓存，
+批量解析登录日志时绝大多数 User-Agent 直接命中缓存。
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Optional
+
+# 缓存的 User-Agent 数量
+CACHE_SIZE = 4096
+
+# 设备类型
+DEVICE_BOT = 'Bot'
+DEVICE_MOBILE = 'Mobile'
+DEVICE_TABLET = 'Tablet'
+DEVICE_DESKTOP = 'Desktop'
+
+# 浏览器规则（按顺序匹配，基于 Chromium 的浏览器都带 Chrome/ 和 Safari/，须排在 Chrome、Safari 之前）
+BROWSER_RULES = [
+    (re.compile(r'MicroMessenger/(\d+)'), 'WeChat'),
+    (re.compile(r'DingTalk/(\d+)'), 'DingTalk'),
+    (re.compile(r'Edg(?:e|A|iOS)?/(\d+)'), 'Edge'),
+    (re.compile(r'(?:OPR|Opera)/(\d+)'), 'Opera'),
+    (re.compile(r'SamsungBrowser/(\d+)'), 'Samsung Internet'),
+    (re.compile(r'UCBrowser/(\d+)'), 'UC Browser'),
+    (re.compile(r'QQBrowser/(\d+)'), 'QQ Browser'),
+    (re.compile(r'(?:Firefox|FxiOS)/(\d+)'), 'Firefox'),
+    (re.compile(r'(?:Chrome|CriOS)/(\d+)'), 'Chrome'),
+    (re.compile(r'Version/(\d+)[\d.]* (?:Mobile/\S+ )?Safari/'), 'Safari'),
+    (re.compile(r'(?:MSIE |Trident/.*rv:)(\d+)'), 'Internet Explorer'),
+    (re.compile(r'PostmanRuntime/(\d+)'), 'Postman'),
+    (re.compile(r'curl/(\d+)'), 'curl'),
+    (re.compile(r'python-requests/(\d+)'), 'Python Requests'),
+]
+
+# Windows NT 内核版本对应的系统版本
+WINDOWS_VERSIONS = {
+    '10.0': '10',
+    '6.3': '8.1',
+    '6.2': '8',
+    '6.1': '7',
+    '6.0': 'Vista',
+    '5.1': 'XP',
+}
+
+BOT_PATTERN = re.compile(r'bot|crawler|spider|slurp|curl/|python-requests|postman', re.IGNORECASE)
+TABLET_PATTERN = re.compile(r'iPad|Tablet|Android(?!.*Mobile)')
+MOBILE_PATTERN = re.compile(r'Mobile|iPhone|iPod|Android|HarmonyOS|Windows Phone')
+
+
+def _version(name: str, version: Optional[str]) -> str:
+    return f'{name} {version}' if version else name
+
+
+def parse_os(user_agent: str) -> Optional[str]:
+    """识别操作系统"""
+    match = re.search(r'HarmonyOS(?:[ /](\d+))?', user_agent)
+    if match:
+        return _version('HarmonyOS', match.group(1))
+    match = re.search(r'Windows NT (\d+\.\d+)', user_agent)
+    if match:
+        return _version('Windows', WINDOWS_VERSIONS.get(match.group(1)))
+    match = re.search(r'Android(?: (\d+))?', user_agent)
+    if match:
+        return _version('Android', match.group(1))
+    match = re.search(r'(?:iPhone|CPU) OS (\d+)', user_agent)
+    if match:
+        return _version('iPadOS' if 'iPad' in user_agent else 'iOS', match.group(1))
+    match = re.search(r'Mac OS X (\d+)[_.](\d+)', user_agent)
+    if match:
+        return f'macOS {match.group(1)}.{match.group(2)}'
+    if 'CrOS' in user_agent:
+        return 'Chrome OS'
+    if 'Linux' in user_agent:
+        return 'Linux'
+    return None
+
+
+def parse_browser(user_agent: str) -> Optional[str]:
+    """识别浏览器（或客户端）"""
+    for pattern, name in BROWSER_RULES:
+        match = pattern.search(user_agent)
+        if match:
+            return _version(name, match.group(1))
+    return None
+
+
+def parse_device(user_agent: str) -> str:
+    """识别设备类型"""
+    if BOT_PATTERN.search(user_agent):
+        return DEVICE_BOT
+    if TABLET_PATTERN.search(user_agent):
+        return DEVICE_TABLET
+    if MOBILE_PATTERN.search(user_agent):
+        return DEVICE_MOBILE
+    return DEVICE_DESKTOP
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_user_agent(user_agent: str) -> Dict[str, Optional[str]]:
+    """
+    解析 User-Agent（结果缓存，不要修改返回的字典）
+
+    Args:
+        user_agent: User-Agent 字符串
+
+    Returns:
+        dict: {'device': 设备类型, 'browser': 浏览器, 'os': 操作系统}，无法识别的项为 None
+    """
+    if not user_agent:
+        return {'device': None, 'browser': None, 'os': None}
+    return {
+        'device': parse_device(user_agent),
+        'browser': parse_browser(user_agent),
+        'os': parse_os(user_agent),
+    }